@@ -0,0 +1,82 @@
+"""restore_items_fts_sync_triggers
+
+Recreates the items_ai/items_ad/items_au triggers and rebuilds items_fts once.
+
+The batch_alter_table steps in 943070a6d1d8 and 674c9d9d6bd1 recreate the
+items table, which silently drops its triggers, so items_fts stopped following
+changes to items. items_fts is an external content table, so the delete and
+update triggers remove the old row with the FTS5 'delete' command and the old
+values; the plain DELETE used in 9edfb5383e88 corrupts the index.
+
+The SQL is frozen here on purpose; tools/fts_bulk.py keeps its own copy
+(FTS_TRIGGERS) for the bulk-write context.
+
+Revision ID: e115969cccfc
+Revises: 674c9d9d6bd1
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e115969cccfc"
+down_revision: str | Sequence[str] | None = "674c9d9d6bd1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TRIGGERS = {
+    "items_ai": """
+        CREATE TRIGGER items_ai AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts(rowid, id, title, lyrics, first_words, creator_composer)
+            VALUES (new.rowid, new.id, new.title, new.lyrics, new.first_words, new.creator_composer);
+        END
+    """,
+    "items_ad": """
+        CREATE TRIGGER items_ad AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts(
+                items_fts, rowid, id, title, lyrics, first_words, creator_composer
+            )
+            VALUES (
+                'delete', old.rowid, old.id, old.title, old.lyrics, old.first_words,
+                old.creator_composer
+            );
+        END
+    """,
+    "items_au": """
+        CREATE TRIGGER items_au AFTER UPDATE ON items BEGIN
+            INSERT INTO items_fts(
+                items_fts, rowid, id, title, lyrics, first_words, creator_composer
+            )
+            VALUES (
+                'delete', old.rowid, old.id, old.title, old.lyrics, old.first_words,
+                old.creator_composer
+            );
+            INSERT INTO items_fts(rowid, id, title, lyrics, first_words, creator_composer)
+            VALUES (new.rowid, new.id, new.title, new.lyrics, new.first_words, new.creator_composer);
+        END
+    """,
+}
+
+
+def upgrade() -> None:
+    """Recreate the FTS sync triggers and resync items_fts."""
+    conn = op.get_bind()
+
+    for name, sql in TRIGGERS.items():
+        conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {name}"))
+        conn.execute(sa.text(sql))
+
+    conn.execute(sa.text("INSERT INTO items_fts(items_fts) VALUES ('rebuild')"))
+
+
+def downgrade() -> None:
+    """Drop the triggers again, as 674c9d9d6bd1 left the items table."""
+    conn = op.get_bind()
+
+    for name in reversed(list(TRIGGERS)):
+        conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {name}"))
@@ -0,0 +1,60 @@
+"""create_item_genres
+
+Creates genre membership tables, as suggested in GENRE_SCRAPING_FIX.md:
+- genres: Genre/collection lookup (id is the vmrebetiko collection slug)
+- item_genres: Item <-> genre junction, WITHOUT ROWID
+
+The (item_id, genre_id) primary key covers "genres of an item" and
+ix_item_genres_genre_item covers "items of a genre", so genre filters are
+index-only joins.
+
+Schema only: the tables start empty and tools/load_genre_mappings.py fills
+them from database/analysis/genre_mappings.json, so replaying the migration
+does not depend on the scraped file in the working tree.
+
+Revision ID: b4234c169888
+Revises: e115969cccfc
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b4234c169888"
+down_revision: str | Sequence[str] | None = "e115969cccfc"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the genres and item_genres tables."""
+    op.create_table(
+        "genres",
+        sa.Column("id", sa.Text(), nullable=False),
+        sa.Column("name_el", sa.Text(), nullable=False),
+        sa.Column("name_en", sa.String(100), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "item_genres",
+        sa.Column("item_id", sa.Text(), nullable=False),
+        sa.Column("genre_id", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("item_id", "genre_id"),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"]),
+        sa.ForeignKeyConstraint(["genre_id"], ["genres.id"]),
+        sqlite_with_rowid=False,
+    )
+    op.create_index("ix_item_genres_genre_item", "item_genres", ["genre_id", "item_id"])
+
+
+def downgrade() -> None:
+    """Drop genre membership tables."""
+    op.drop_index("ix_item_genres_genre_item", table_name="item_genres")
+    op.drop_table("item_genres")
+    op.drop_table("genres")
@@ -0,0 +1,57 @@
+"""promote_record_label_and_number
+
+Promotes two more metadata_json keys to indexed columns:
+- record_label (Εταιρεία δίσκου) - Record company, for label/catalog browsing
+- record_number (Αριθμός δίσκου) - Catalog number on the label
+
+Both are VIRTUAL generated columns over json_extract(), so no row is
+rewritten, they follow later edits of metadata_json, and only their indexes
+are stored. Unlike d5b976a1f66e there is no per-row Python json.loads and
+UPDATE. The SQL is what tools/db_promote.py generates, frozen here.
+
+Revision ID: 5c1e7a9d2f43
+Revises: b4234c169888
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e7a9d2f43"
+down_revision: str | Sequence[str] | None = "b4234c169888"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+PROMOTED_KEYS = {
+    "record_label": "Εταιρεία δίσκου",
+    "record_number": "Αριθμός δίσκου",
+}
+
+
+def upgrade() -> None:
+    """Add indexed generated columns for the promoted keys."""
+    conn = op.get_bind()
+    for column, key in PROMOTED_KEYS.items():
+        # Malformed metadata_json and empty values give NULL
+        conn.execute(
+            sa.text(
+                f"ALTER TABLE items ADD COLUMN {column} TEXT GENERATED ALWAYS AS ("
+                "CASE WHEN json_valid(metadata_json) "
+                f"THEN NULLIF(json_extract(metadata_json, '$.\"{key}\"'), '') END"
+                ") VIRTUAL"
+            )
+        )
+        conn.execute(sa.text(f"CREATE INDEX ix_items_{column} ON items ({column})"))
+
+
+def downgrade() -> None:
+    """Drop the promoted columns and their indexes."""
+    conn = op.get_bind()
+    for column in reversed(PROMOTED_KEYS):
+        conn.execute(sa.text(f"DROP INDEX IF EXISTS ix_items_{column}"))
+        conn.execute(sa.text(f"ALTER TABLE items DROP COLUMN {column}"))
@@ -0,0 +1,211 @@
+"""add_typed_derived_columns
+
+Adds typed columns parsed from the free-text recording_date, duration and
+matrix_number, so era, length and catalog-range queries are index range
+scans instead of string parsing in Python:
+- recording_year, recording_date_start, recording_date_end - YYYYMMDD bounds
+  of the date or range ("03/1931" -> 19310301..19310331)
+- recording_date_uncertain - 1 for "c. 1928", "[1930]", "1930 ή 1931", ...
+- duration_seconds
+- matrix_series, matrix_base, matrix_suffix - "W 123456-2" -> W, 123456, 2
+- parse_issues - bit flags of the fields that could not be parsed
+  (1 recording_date, 2 duration, 4 matrix_number)
+
+Columns are added with plain ALTER TABLE (no batch table copy) and filled by
+one executemany with the items_au trigger suspended (no indexed column
+changes). The parsers are a frozen copy of tools/field_parsers.py as of this
+revision; tools/field_parsers.py re-derives the columns with the current ones.
+
+Revision ID: 8e4b6d0a3c75
+Revises: 5c1e7a9d2f43
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+import calendar
+import re
+import unicodedata
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4b6d0a3c75"
+down_revision: str | Sequence[str] | None = "5c1e7a9d2f43"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COLUMNS = [
+    sa.Column("recording_year", sa.Integer(), nullable=True),
+    sa.Column("recording_date_start", sa.Integer(), nullable=True),
+    sa.Column("recording_date_end", sa.Integer(), nullable=True),
+    sa.Column("recording_date_uncertain", sa.Integer(), nullable=True),
+    sa.Column("duration_seconds", sa.Integer(), nullable=True),
+    sa.Column("matrix_series", sa.String(20), nullable=True),
+    sa.Column("matrix_base", sa.Integer(), nullable=True),
+    sa.Column("matrix_suffix", sa.Integer(), nullable=True),
+    sa.Column("parse_issues", sa.Integer(), nullable=False, server_default="0"),
+]
+
+INDEXES = {
+    "ix_items_recording_year": ["recording_year"],
+    "ix_items_recording_date_start": ["recording_date_start", "recording_date_end"],
+    "ix_items_duration_seconds": ["duration_seconds"],
+    "ix_items_matrix": ["matrix_series", "matrix_base"],
+}
+
+YEAR_RANGE = (1877, 2030)
+DATE_ISSUE, DURATION_ISSUE, MATRIX_ISSUE = 1, 2, 4
+UNKNOWN_VALUES = {"", "?", ";", "-", "αγνωστη", "αγνωστο", "αγνωστος", "ασαφες", "ασαφης"}
+UNCERTAIN_MARKERS = re.compile(r"\(\s*[;?]\s*\)|[;?]|^\s*(?:c\.|ca\.?|circa|περ\.|περίπου)\s*")
+DATE_PATTERNS = [
+    (re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"), "day"),
+    (re.compile(r"(\d{1,2})/(\d{4})"), "month"),
+    (re.compile(r"(\d{4})\s*(?:-|–|/|ή|or)\s*(\d{4})"), "years"),
+    (re.compile(r"(\d{4})"), "year"),
+]
+DURATION_CLOCK = re.compile(r"(?:(\d{1,2}):)?(\d{1,2}):(\d{2})")
+DURATION_MARKS = re.compile(r"(?:(\d{1,2})\s*['΄′])?\s*(?:(\d{1,2})\s*(?:\"|''|΄΄|″))?")
+MATRIX_PATTERN = re.compile(r"([^\W\d_]*)[\s.-]*0*(\d+)(?:\s*[-/.]\s*([A-Za-z]?\d{0,3}[A-Za-z]?))?")
+
+
+def is_unknown(text):
+    if text is None:
+        return True
+    nfd = unicodedata.normalize("NFD", text)
+    return "".join(c for c in nfd if unicodedata.category(c) != "Mn").lower().strip() in (
+        UNKNOWN_VALUES
+    )
+
+
+def parse_recording_date(text):
+    """(year, start, end, uncertain) with YYYYMMDD bounds, or None if unknown."""
+    if is_unknown(text):
+        return None
+    value = text.strip()
+    uncertain = bool(UNCERTAIN_MARKERS.search(value))
+    value = UNCERTAIN_MARKERS.sub(" ", value).strip()
+    if value.startswith("[") and value.endswith("]"):
+        value, uncertain = value[1:-1].strip(), True
+
+    for pattern, kind in DATE_PATTERNS:
+        match = pattern.fullmatch(value)
+        if match is None:
+            continue
+        if kind == "day":
+            day, month, year = (int(g) for g in match.groups())
+            if not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+                break
+            start = end = year * 10000 + month * 100 + day
+        elif kind == "month":
+            month, year = (int(g) for g in match.groups())
+            if not 1 <= month <= 12:
+                break
+            start = year * 10000 + month * 100 + 1
+            end = year * 10000 + month * 100 + calendar.monthrange(year, month)[1]
+        elif kind == "years":
+            year, last = (int(g) for g in match.groups())
+            if last < year:
+                break
+            start, end = year * 10000 + 101, last * 10000 + 1231
+            uncertain = uncertain or not re.search(r"\d\s*[-–]\s*\d", value)
+        else:
+            year = int(match.group(1))
+            start, end = year * 10000 + 101, year * 10000 + 1231
+        if not YEAR_RANGE[0] <= year <= YEAR_RANGE[1] or end // 10000 > YEAR_RANGE[1]:
+            break
+        return year, start, end, int(uncertain)
+    raise ValueError(text)
+
+
+def parse_duration(text):
+    """Seconds, or None if unknown."""
+    if is_unknown(text):
+        return None
+    value = text.strip()
+    match = DURATION_CLOCK.fullmatch(value)
+    if match:
+        hours, minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    else:
+        match = DURATION_MARKS.fullmatch(value)
+        if match is None or not any(match.groups()):
+            raise ValueError(text)
+        hours = 0
+        minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    if seconds >= 60 or (hours and minutes >= 60):
+        raise ValueError(text)
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_matrix_number(text):
+    """(series, base, numeric suffix), or None if unknown."""
+    if is_unknown(text):
+        return None
+    match = MATRIX_PATTERN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(text)
+    series, number, suffix = match.groups()
+    digits = re.sub(r"\D", "", suffix or "")
+    return series.upper() or None, int(number), int(digits) if digits else None
+
+
+def derive_values(recording_date, duration, matrix_number):
+    """Values of COLUMNS for one item."""
+    issues = 0
+    date, seconds, matrix = (None,) * 4, None, (None,) * 3
+    try:
+        date = parse_recording_date(recording_date) or date
+    except ValueError:
+        issues |= DATE_ISSUE
+    try:
+        seconds = parse_duration(duration)
+    except ValueError:
+        issues |= DURATION_ISSUE
+    try:
+        matrix = parse_matrix_number(matrix_number) or matrix
+    except ValueError:
+        issues |= MATRIX_ISSUE
+    return (*date, seconds, *matrix, issues)
+
+
+def upgrade() -> None:
+    """Add, fill and index the derived columns."""
+    for column in COLUMNS:
+        op.add_column("items", column)
+
+    conn = op.get_bind().connection.driver_connection
+    updates = [
+        (*derive_values(recording_date, duration, matrix_number), rowid)
+        for rowid, recording_date, duration, matrix_number in conn.execute(
+            "SELECT rowid, recording_date, duration, matrix_number FROM items"
+        )
+    ]
+    (items_au,) = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'items_au'"
+    ).fetchone()
+    conn.execute("DROP TRIGGER items_au")
+    assignments = ", ".join(f"{column.name} = ?" for column in COLUMNS)
+    conn.executemany(f"UPDATE items SET {assignments} WHERE rowid = ?", updates)
+    conn.execute(items_au)
+
+    for name, columns in INDEXES.items():
+        op.create_index(name, "items", columns)
+    # Only the few unparsed rows are indexed
+    op.create_index(
+        "ix_items_parse_issues",
+        "items",
+        ["parse_issues"],
+        sqlite_where=sa.text("parse_issues != 0"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the derived columns and their indexes."""
+    op.drop_index("ix_items_parse_issues", table_name="items")
+    for name in reversed(INDEXES):
+        op.drop_index(name, table_name="items")
+    # ALTER TABLE DROP COLUMN (SQLite >= 3.35) keeps the FTS triggers, unlike batch mode
+    for column in reversed(COLUMNS):
+        op.execute(f"ALTER TABLE items DROP COLUMN {column.name}")
@@ -0,0 +1,69 @@
+"""add_table_version_stamps
+
+Adds _table_versions, one change stamp per table, kept by AFTER INSERT /
+UPDATE / DELETE triggers named <table>_version_i/_u/_d. The analysis cache
+(tools/analysis_cache.py) compares the stamps of an analysis' input tables
+to decide whether a stored result is still valid, so only analyses whose
+tables changed are recomputed.
+
+Revision ID: 2b7f4c9e1a06
+Revises: 8e4b6d0a3c75
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2b7f4c9e1a06"
+down_revision: str | Sequence[str] | None = "8e4b6d0a3c75"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+EVENTS = ("INSERT", "UPDATE", "DELETE")
+TRACKED_TABLES = (
+    "items",
+    "files",
+    "genres",
+    "item_genres",
+    "rhythm_types",
+    "recording_places",
+)
+
+
+def upgrade() -> None:
+    """Create the stamp table and triggers."""
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            "CREATE TABLE _table_versions ("
+            "table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+        )
+    )
+    for table in TRACKED_TABLES:
+        conn.execute(
+            sa.text("INSERT INTO _table_versions (table_name, version) VALUES (:table, 0)"),
+            {"table": table},
+        )
+        # One row-level trigger per event (SQLite has no statement triggers)
+        for event in EVENTS:
+            conn.execute(
+                sa.text(
+                    f"CREATE TRIGGER {table}_version_{event[0].lower()} AFTER {event} ON {table} "
+                    "BEGIN UPDATE _table_versions SET version = version + 1 "
+                    f"WHERE table_name = '{table}'; END"
+                )
+            )
+
+
+def downgrade() -> None:
+    """Drop the stamp triggers and table."""
+    conn = op.get_bind()
+    for table in TRACKED_TABLES:
+        for event in EVENTS:
+            conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {table}_version_{event[0].lower()}"))
+    conn.execute(sa.text("DROP TABLE IF EXISTS _table_versions"))
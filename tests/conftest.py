@@ -1,6 +1,52 @@
 """Shared pytest fixtures. Auto-discovered by pytest."""
 
+import json
+import random
+import shutil
+import sqlite3
+from pathlib import Path
+
 import pytest
+from alembic.config import Config
+
+from alembic import command
+
+ROOT = Path(__file__).parent.parent
+
+# Free-text values as found in the archive's metadata_json
+RHYTHMS = [
+    "Ζεϊμπέκικος",
+    "Ζεϊμπέκικος [Απτάλικος]",
+    "Ζεϊμπέκικος [απτάλικος]",
+    "Χασάπικος",
+    "Χασάπικο",
+    "Συρτός [Χασάπικος]",
+    "Τσιφτετέλι",
+    "Καρσιλαμάς Πολίτικος",
+    "Φοξ τροτ",
+    "Fox-trot",
+    "[Βαλς]",
+    "Ταγκό",
+    "Αργός",
+    None,
+]
+PLACES = [
+    "Αθήνα",
+    "Αθήνα (;)",
+    "Θεσσαλονίκη",
+    "Κωσταντινούπολη",
+    "Νέα Υόρκη (;)",
+    "Σικάγο(;)",
+    "Αθήνα ή Σμύρνη",
+    ";",
+    "Πειραιάς",
+    None,
+]
+DATES = ["03/1931", "1932-1933", "[1930]", "1936", "c. 1928", "1930 ή 1931", "12/03/1934"]
+DATES += ["1935 (;)", "Άγνωστη", "Μάιος 1931", None]
+DURATIONS = ["3:12", "03:05", "2'45\"", "?", "1:02:03", None]
+MATRICES = ["W 123456-2", "OA-0123-1", "GO 1234", "12345", "ασαφές", None]
+LABELS = ["Columbia", "His Master's Voice", "Odeon", None]
 
 
 @pytest.fixture
@@ -10,3 +56,88 @@ def sample_fixture():
     data = {"key": "value"}
     yield data
     # Teardown (if needed)
+
+
+def make_archive(path: Path, count: int = 300, seed: int = 7) -> Path:
+    """Pre-migration database (items + files) with archive-like synthetic rows."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE items (id TEXT PRIMARY KEY, url TEXT, title TEXT, item_type TEXT,
+            creator_composer TEXT, lyricist TEXT, publication_date TEXT, publication_place TEXT,
+            publisher TEXT, language TEXT, first_words TEXT, physical_description TEXT,
+            provenance TEXT, identifier TEXT, license TEXT, reference TEXT, scraped_at TEXT,
+            metadata_json TEXT);
+        CREATE TABLE files (id INTEGER PRIMARY KEY, item_id TEXT, file_type TEXT,
+            downloaded INTEGER);
+        """
+    )
+    items, files = [], []
+    for number in range(count):
+        item_id = str(500 + number)
+        metadata = {
+            "Χρονολογία ηχογράφησης": rng.choice(DATES),
+            "Διάρκεια": rng.choice(DURATIONS),
+            "Αριθμός μήτρας": rng.choice(MATRICES),
+            "Χορός / Ρυθμός": rng.choice(RHYTHMS),
+            "Τόπος ηχογράφησης": rng.choice(PLACES),
+            "Εταιρεία δίσκου": rng.choice(LABELS),
+            "Αριθμός δίσκου": rng.choice([f"DG {rng.randint(100, 999)}", None]),
+        }
+        if rng.random() < 0.3:
+            metadata["Στίχοι"] = f"Στίχοι του τραγουδιού {number}\nδεύτερος στίχος"
+        metadata = {key: value for key, value in metadata.items() if value is not None}
+        metadata_json = json.dumps(metadata, ensure_ascii=False)
+        if number % 50 == 49:
+            metadata_json = "{not json"
+        items.append(
+            (
+                item_id,
+                f"https://vmrebetiko.gr/item/?id={item_id}",
+                f"Τραγούδι {number}",
+                rng.choice(["Δίσκος 78 Στροφών"] * 4 + ["Έντυπη Παρτιτούρα"]),
+                rng.choice(["Μάρκος Βαμβακάρης", "Βασίλης Τσιτσάνης", "Παναγιώτης Τούντας"]),
+                rng.choice(["Ελληνικά", "Ελληνικά; Τουρκικά", "Αγγλικά"]),
+                metadata_json,
+            )
+        )
+        for file_type in rng.sample(["audio", "pdfs", "images"], rng.randint(0, 2)):
+            files.append((item_id, file_type, rng.randint(0, 1)))
+    conn.executemany(
+        "INSERT INTO items (id, url, title, item_type, creator_composer, language, metadata_json) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        items,
+    )
+    conn.executemany("INSERT INTO files (item_id, file_type, downloaded) VALUES (?, ?, ?)", files)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def migrate(path: Path, revision: str = "head") -> Path:
+    """Run the Alembic migrations on the database at path."""
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, revision)
+    return path
+
+
+@pytest.fixture
+def archive_db(tmp_path) -> Path:
+    """Unmigrated synthetic archive."""
+    return make_archive(tmp_path / "archive.db")
+
+
+@pytest.fixture(scope="session")
+def migrated_template(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("migrated") / "archive.db"
+    return migrate(make_archive(path))
+
+
+@pytest.fixture
+def migrated_db(tmp_path, migrated_template) -> Path:
+    """Synthetic archive with every migration applied (a fresh copy per test)."""
+    path = tmp_path / "migrated.db"
+    shutil.copyfile(migrated_template, path)
+    return path
@@ -0,0 +1,94 @@
+"""AnalysisCache: results are reused only while their input tables are unchanged."""
+
+import sqlite3
+
+import pytest
+from analysis_cache import ALL_TABLES, AnalysisCache, table_versions
+from fts_bulk import fts_bulk_write, stamp_triggers
+
+
+@pytest.fixture
+def db(migrated_db, tmp_path):
+    """Runs the same analyses in a fresh AnalysisCache each call, like separate runs."""
+    cache_file = tmp_path / "analysis_cache.json"
+
+    def run():
+        conn = sqlite3.connect(migrated_db)
+        with AnalysisCache(conn, migrated_db, cache_file) as cache:
+            cache.run("items", ["items"], lambda: count(conn, "items"))
+            cache.run("files", ["files"], lambda: count(conn, "files"))
+            cache.run("everything", ALL_TABLES, lambda: count(conn, "item_genres"))
+        conn.close()
+        return sorted(cache.reused)
+
+    def write(*statements):
+        conn = sqlite3.connect(migrated_db)
+        for sql in statements:
+            conn.execute(sql)
+        conn.commit()
+        conn.close()
+
+    run.write = write
+    run.path = migrated_db
+    return run
+
+
+def count(conn, table):
+    total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    print(f"{table}: {total}")
+    return total
+
+
+def test_unchanged_database_reuses_everything(db, capsys):
+    assert db() == []
+    first = capsys.readouterr().out
+    assert db() == ["everything", "files", "items"]
+    assert capsys.readouterr().out == first  # printed output is replayed
+
+
+def test_write_recomputes_only_its_table(db):
+    db()
+    db.write("UPDATE items SET title = 'νέος τίτλος' WHERE id = '500'")
+    assert db() == ["files"]
+    assert db() == ["everything", "files", "items"]
+
+    db.write("DELETE FROM files WHERE id = (SELECT MIN(id) FROM files)")
+    assert db() == ["items"]
+
+
+def test_missing_stamp_trigger_means_untracked(db):
+    db.write("DROP TRIGGER items_version_u")
+    conn = sqlite3.connect(db.path)
+    assert "items" not in table_versions(conn)
+    assert "files" in table_versions(conn)
+    conn.close()
+
+    db()
+    db.write("UPDATE items SET title = 'νέος τίτλος' WHERE id = '500'")
+    # The update left the items stamp unchanged; the cache must not trust it
+    assert db() == ["files"]
+
+
+def test_bulk_write_bumps_stamp_once(db):
+    db()
+    conn = sqlite3.connect(db.path)
+    before = table_versions(conn)["items"]
+    triggers = stamp_triggers(conn)
+    with fts_bulk_write(conn, rebuild=False):
+        conn.execute("UPDATE items SET recording_place_uncertain = NULL")
+    assert table_versions(conn)["items"] == before + 1
+    assert stamp_triggers(conn) == triggers
+    conn.close()
+    assert db() == []  # recreating the triggers also changed the schema version
+
+
+def test_rolled_back_bulk_write_keeps_stamp(db):
+    db()
+    conn = sqlite3.connect(db.path)
+    before = table_versions(conn)
+    with pytest.raises(RuntimeError), fts_bulk_write(conn, rebuild=False):
+        conn.execute("UPDATE items SET recording_place_uncertain = NULL")
+        raise RuntimeError
+    assert table_versions(conn) == before
+    conn.close()
+    assert db() == ["everything", "files", "items"]
@@ -0,0 +1,78 @@
+"""cluster_variants: proposals reproduce the hand-written mappings of the migrations."""
+
+import ast
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from cluster_variants import Variant, cluster_variants, load_anchors, matching_key
+from db_normalize import load_proposed_mapping
+
+VERSIONS = Path(__file__).parent.parent / "alembic" / "versions"
+
+# Compound values the migration resolved by hand; the proposal asks for review
+REVIEWED_BY_HAND = {"Συρτός [Χασάπικος]"}
+
+
+def migration_literal(revision: str, name: str):
+    """Value of the literal assigned to `name` in a migration's upgrade()."""
+    (path,) = VERSIONS.glob(f"*{revision}_*.py")
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == name:
+            return ast.literal_eval(node.value)
+    raise LookupError(f"{name} not found in {path.name}")
+
+
+def rhythm_mapping() -> dict[str, int]:
+    return migration_literal("943070a6d1d8", "rhythm_mappings")
+
+
+def place_mapping() -> dict[str, tuple[int, int | None]]:
+    mapping = {
+        value: (place_id, None)
+        for value, place_id in migration_literal("674c9d9d6bd1", "place_mappings").items()
+    }
+    for value, place_id in migration_literal("674c9d9d6bd1", "uncertain_patterns"):
+        mapping[value] = (place_id, 1)
+    for value, place_id, uncertain in migration_literal("674c9d9d6bd1", "compound_patterns"):
+        mapping[value] = (place_id, 1 if uncertain else None)
+    return mapping
+
+
+def propose(tmp_path, conn, lookup, values, **options):
+    variants = [Variant(value, 1, *matching_key(value)) for value in values]
+    proposal = {"lookup": lookup, **cluster_variants(variants, load_anchors(conn, lookup))}
+    path = tmp_path / f"{lookup}.json"
+    path.write_text(json.dumps(proposal, ensure_ascii=False), encoding="utf-8")
+    return proposal, load_proposed_mapping(path, **options)
+
+
+@pytest.fixture
+def conn(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    yield conn
+    conn.close()
+
+
+def test_rhythm_proposal_matches_migration(tmp_path, conn):
+    expected = rhythm_mapping()
+    proposal, mapping = propose(tmp_path, conn, "rhythm_types", expected)
+
+    assert mapping == {v: i for v, i in expected.items() if v not in REVIEWED_BY_HAND}
+    review = {entry["value"]: entry["candidates"] for entry in proposal["unassigned"]}
+    assert review == {"Συρτός [Χασάπικος]": ["Συρτός", "Χασάπικος"]}
+
+
+def test_bracketed_subtype_joins_its_rhythm(tmp_path, conn):
+    values = ["Ζεϊμπέκικος [Απτάλικος]", "Ζεϊμπέκικος [απτάλικος]"]
+    proposal, mapping = propose(tmp_path, conn, "rhythm_types", values)
+    assert mapping == dict.fromkeys(values, 1)
+    (cluster,) = proposal["clusters"]
+    assert {v["method"] for v in cluster["variants"]} == {"contains"}
+
+
+def test_place_proposal_matches_migration(tmp_path, conn):
+    expected = place_mapping()
+    _proposal, mapping = propose(tmp_path, conn, "recording_places", expected, uncertain_flag=True)
+    assert mapping == expected
@@ -0,0 +1,82 @@
+"""normalize_column: one join-based UPDATE gives the per-variant UPDATE loop's result."""
+
+import shutil
+import sqlite3
+
+import pytest
+from db_normalize import normalize_column
+from fts_bulk import fts_bulk_write
+
+RHYTHMS = {"Ζεϊμπέκικος": 1, "Ζεϊμπέκικος [Απτάλικος]": 1, "Χασάπικο": 2, "Fox-trot": 12}
+PLACES = {"Αθήνα": (1, None), "Αθήνα (;)": (1, 1), "Αθήνα ή Σμύρνη": (1, 1), "Σικάγο(;)": (6, 1)}
+COLUMNS = {
+    "dance_rhythm_raw": ["rhythm_type_id"],
+    "recording_place_raw": ["recording_place_id", "recording_place_uncertain"],
+}
+
+
+def per_variant_loop(conn, source, mapping, targets):
+    """The migrations' original approach: one UPDATE per variant."""
+    for variant, values in mapping.items():
+        values = values if isinstance(values, tuple) else (values,)
+        assignments = ", ".join(f"{target} = ?" for target in targets)
+        conn.execute(f"UPDATE items SET {assignments} WHERE {source} = ?", (*values, variant))
+    conn.commit()
+
+
+def snapshot(conn, targets):
+    return conn.execute(f"SELECT id, {', '.join(targets)} FROM items ORDER BY id").fetchall()
+
+
+@pytest.fixture
+def connections(migrated_db, tmp_path):
+    copy = tmp_path / "loop.db"
+    shutil.copyfile(migrated_db, copy)
+    conns = [sqlite3.connect(migrated_db), sqlite3.connect(copy)]
+    for conn in conns:
+        conn.execute(
+            "UPDATE items SET rhythm_type_id = NULL, recording_place_id = NULL, "
+            "recording_place_uncertain = NULL"
+        )
+        conn.commit()
+    yield conns
+    for conn in conns:
+        conn.close()
+
+
+@pytest.mark.parametrize(
+    ("source", "mapping"), [("dance_rhythm_raw", RHYTHMS), ("recording_place_raw", PLACES)]
+)
+def test_equals_per_variant_loop(connections, source, mapping):
+    conn, loop_conn = connections
+    targets = COLUMNS[source]
+    with fts_bulk_write(conn, rebuild=False):
+        result = normalize_column(conn, source, mapping, targets, commit=False)
+    per_variant_loop(loop_conn, source, mapping, targets)
+    assert snapshot(conn, targets) == snapshot(loop_conn, targets)
+
+    census = dict(
+        conn.execute(f"SELECT {source}, COUNT(*) FROM items WHERE {source} IS NOT NULL GROUP BY 1")
+    )
+    assert result.matched_rows == sum(census.get(variant, 0) for variant in mapping)
+    assert result.unmatched_values == {v: n for v, n in census.items() if v not in mapping}
+    assert result.unmatched_rows == sum(result.unmatched_values.values())
+    assert result.unused_variants == [v for v in mapping if v not in census]
+    assert result.matched_rows > 0 and result.unmatched_rows > 0
+
+
+def test_bad_mapping_changes_nothing(connections):
+    conn, _ = connections
+    before = snapshot(conn, COLUMNS["recording_place_raw"])
+    with pytest.raises(ValueError, match="expected 2"):
+        normalize_column(conn, "recording_place_raw", {"Αθήνα": 1}, COLUMNS["recording_place_raw"])
+    assert snapshot(conn, COLUMNS["recording_place_raw"]) == before
+
+
+def test_failed_update_rolls_back(connections):
+    conn, _ = connections
+    before = snapshot(conn, ["rhythm_type_id"])
+    with pytest.raises(sqlite3.OperationalError):
+        normalize_column(conn, "dance_rhythm_raw", RHYTHMS, ["no_such_column"])
+    assert snapshot(conn, ["rhythm_type_id"]) == before
+    assert not conn.in_transaction
@@ -0,0 +1,114 @@
+"""db_promote: a promoted metadata_json key is a backfilled, indexed column until demoted."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from alembic.config import Config
+from db_promote import demote_metadata_key, index_name, promote_metadata_key
+from fts_bulk import fts_bulk_write
+
+from alembic import command
+
+KEY = "Τόπος ηχογράφησης"
+ALEMBIC_INI = Path(__file__).parent.parent / "alembic.ini"
+
+
+@pytest.fixture
+def conn(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    yield conn
+    conn.close()
+
+
+def expected_values(conn):
+    """The key's value per item, parsed in Python (NULL for missing, empty or malformed)."""
+    values = {}
+    for item_id, metadata_json in conn.execute("SELECT id, metadata_json FROM items"):
+        try:
+            value = json.loads(metadata_json).get(KEY)
+        except ValueError:
+            value = None
+        values[item_id] = value or None
+    return values
+
+
+def columns(conn):
+    return {row[1] for row in conn.execute("PRAGMA table_xinfo(items)")}
+
+
+def uses_index(conn, column):
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT id FROM items WHERE {column} = 'Αθήνα'"
+    ).fetchall()
+    return any(index_name(column) in row[-1] for row in plan)
+
+
+@pytest.mark.parametrize("mode", ["virtual", "stored"])
+def test_promote_backfills_and_demote_removes(conn, mode):
+    conn.execute(
+        "UPDATE items SET metadata_json = json_set(metadata_json, ?, '') WHERE id = '501'",
+        (f'$."{KEY}"',),
+    )
+    expected = expected_values(conn)
+    assert None in expected.values() and len(set(expected.values())) > 2
+
+    with fts_bulk_write(conn, rebuild=False):
+        filled = promote_metadata_key(conn, KEY, "place_text", mode=mode)
+    assert dict(conn.execute("SELECT id, place_text FROM items")) == expected
+    assert filled == (None if mode == "virtual" else sum(v is not None for v in expected.values()))
+    assert uses_index(conn, "place_text")
+
+    demote_metadata_key(conn, "place_text")
+    conn.commit()
+    assert "place_text" not in columns(conn)
+    assert index_name("place_text") not in {
+        name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert expected_values(conn) == expected  # the value stays in metadata_json
+
+
+def test_virtual_column_follows_metadata_edits(conn):
+    promote_metadata_key(conn, KEY, "place_text")
+    conn.execute(
+        "UPDATE items SET metadata_json = json_set(metadata_json, ?, 'Σμύρνη') WHERE id = '500'",
+        (f'$."{KEY}"',),
+    )
+    assert conn.execute("SELECT place_text FROM items WHERE id = '500'").fetchone() == ("Σμύρνη",)
+
+
+def test_migrated_columns_match_the_helper(conn):
+    """5c1e7a9d2f43 froze the SQL promote_metadata_key() generates."""
+    for column, key in [("record_label", "Εταιρεία δίσκου"), ("record_number", "Αριθμός δίσκου")]:
+        promote_metadata_key(conn, key, f"{column}_check")
+        mismatches = conn.execute(
+            f"SELECT COUNT(*) FROM items WHERE {column} IS NOT {column}_check"
+        ).fetchone()
+        assert mismatches == (0,)
+        assert uses_index(conn, column)
+
+
+def test_migration_downgrade_drops_promoted_columns(conn, migrated_db):
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{migrated_db}")
+    conn.close()
+
+    command.downgrade(config, "b4234c169888")
+    conn = sqlite3.connect(migrated_db)
+    assert not {"record_label", "record_number"} & columns(conn)
+    conn.close()
+
+    command.upgrade(config, "5c1e7a9d2f43")
+    conn = sqlite3.connect(migrated_db)
+    assert {"record_label", "record_number"} <= columns(conn)
+    assert uses_index(conn, "record_label")
+    conn.close()
+
+
+def test_invalid_arguments(conn):
+    with pytest.raises(ValueError, match="mode"):
+        promote_metadata_key(conn, KEY, "place_text", mode="materialized")
+    with pytest.raises(ValueError, match="Unsupported character"):
+        promote_metadata_key(conn, 'Τόπος "ηχογράφησης"', "place_text")
+    assert "place_text" not in columns(conn)
@@ -0,0 +1,79 @@
+"""db_snapshot: incremental page snapshots restore the database byte for byte."""
+
+import sqlite3
+
+import pytest
+from db_snapshot import list_snapshots, prune_snapshots, restore_snapshot, take_snapshot
+
+
+def dump(path):
+    conn = sqlite3.connect(path)
+    try:
+        return list(conn.iterdump())
+    finally:
+        conn.close()
+
+
+def write(path, sql, *params):
+    conn = sqlite3.connect(path)
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def test_restore_round_trip(archive_db):
+    original_bytes = archive_db.read_bytes()
+    original = dump(archive_db)
+    first = take_snapshot(archive_db, label="before")
+    assert first.generation == 1
+    assert first.new_pages == first.page_count
+
+    write(archive_db, "UPDATE items SET title = 'αλλαγμένο' WHERE id = '500'")
+    second = take_snapshot(archive_db, label="after")
+    assert second.generation == 2
+    assert 0 < second.new_pages < second.page_count  # only the changed pages are stored
+    changed = dump(archive_db)
+
+    restore_snapshot(1, archive_db)
+    assert archive_db.read_bytes() == original_bytes
+    assert dump(archive_db) == original
+
+    restore_snapshot(2, archive_db)
+    assert dump(archive_db) == changed
+
+
+def test_wal_database(archive_db):
+    conn = sqlite3.connect(archive_db)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("DELETE FROM items WHERE id = '501'")
+    conn.commit()
+    expected = list(conn.iterdump())  # the committed delete is still in the WAL
+    take_snapshot(archive_db)
+    conn.execute("DELETE FROM items")
+    conn.commit()
+    conn.close()
+
+    restore_snapshot(1, archive_db)
+    assert dump(archive_db) == expected
+
+
+def test_prune_keeps_newest_generations(archive_db):
+    for number in range(4):
+        write(archive_db, "UPDATE items SET title = ? WHERE id = '500'", f"έκδοση {number}")
+        take_snapshot(archive_db, keep=2)
+    assert [s.generation for s in list_snapshots(archive_db)] == [3, 4]
+    assert prune_snapshots(archive_db, keep=2) == 0  # no unreferenced pages left
+
+    restore_snapshot(3, archive_db)
+    with pytest.raises(FileNotFoundError):
+        restore_snapshot(2, archive_db)
+
+
+@pytest.mark.parametrize("keep", [0, -1])
+def test_keep_must_be_positive(archive_db, keep):
+    take_snapshot(archive_db)
+    with pytest.raises(ValueError, match="keep"):
+        prune_snapshots(archive_db, keep=keep)
+    with pytest.raises(ValueError, match="keep"):
+        take_snapshot(archive_db, keep=keep)
+    assert [s.generation for s in list_snapshots(archive_db)] == [1]
@@ -0,0 +1,125 @@
+"""facet_index: bitmap selections and counts agree with the equivalent SQL."""
+
+import sqlite3
+
+import facet_index
+import pytest
+from facet_index import FacetIndex, open_index
+from load_genre_mappings import load_genre_mappings
+
+
+@pytest.fixture
+def conn(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    ids = [item_id for (item_id,) in conn.execute("SELECT id FROM items ORDER BY rowid")]
+    load_genre_mappings(
+        conn,
+        {
+            "rebetiko": {"name_en": "Rebetiko", "name_el": "Ρεμπέτικο", "items": ids[::2]},
+            "smyrneiko": {"name_en": "Smyrneiko", "name_el": "Σμυρνέικο", "items": ids[::3]},
+        },
+    )
+    yield conn
+    conn.close()
+
+
+def sql_ids(conn, where, params=()):
+    return [
+        item_id
+        for (item_id,) in conn.execute(f"SELECT id FROM items WHERE {where} ORDER BY rowid", params)
+    ]
+
+
+def test_select_matches_sql(conn):
+    index = FacetIndex.build(conn)
+    selection = index.select(genre="rebetiko", rhythm=[1, 2], year=range(1930, 1933))
+    assert index.item_ids(selection) == sql_ids(
+        conn,
+        "id IN (SELECT item_id FROM item_genres WHERE genre_id = 'rebetiko') "
+        "AND rhythm_type_id IN (1, 2) AND recording_year BETWEEN 1930 AND 1932",
+    )
+    assert selection
+
+    composer = "Μάρκος Βαμβακάρης"
+    either_genre = index.select(genre=["rebetiko", "smyrneiko"], composer=composer, place=1)
+    assert index.item_ids(either_genre) == sql_ids(
+        conn,
+        "id IN (SELECT item_id FROM item_genres) AND creator_composer = ? "
+        "AND recording_place_id = 1",
+        (composer,),
+    )
+
+
+def test_counts_match_sql(conn):
+    index = FacetIndex.build(conn)
+    within = index.select(genre="smyrneiko")
+    expected = dict(
+        conn.execute(
+            "SELECT rhythm_type_id, COUNT(*) FROM items "
+            "WHERE rhythm_type_id IS NOT NULL "
+            "AND id IN (SELECT item_id FROM item_genres WHERE genre_id = 'smyrneiko') GROUP BY 1"
+        )
+    )
+    assert index.counts("rhythm", within=within) == expected
+    assert (
+        sum(index.counts("genre").values())
+        == conn.execute("SELECT COUNT(*) FROM item_genres").fetchone()[0]
+    )
+
+
+def test_refresh_after_update_and_new_link(conn):
+    index = FacetIndex.build(conn)
+    (item_id,) = conn.execute(
+        "SELECT id FROM items WHERE id NOT IN (SELECT item_id FROM item_genres) "
+        "AND rhythm_type_id IS NOT 5 LIMIT 1"
+    ).fetchone()
+    conn.execute("UPDATE items SET rhythm_type_id = 5 WHERE id = ?", (item_id,))
+    conn.execute("INSERT INTO item_genres (item_id, genre_id) VALUES (?, 'rebetiko')", (item_id,))
+    conn.execute("DELETE FROM items WHERE id = (SELECT MAX(id) FROM items)")
+    conn.commit()
+
+    stats = index.refresh(conn)
+    assert (stats.added, stats.changed, stats.removed) == (0, 1, 1)
+    assert item_id in index.item_ids(index.select(genre="rebetiko", rhythm=5))
+    fresh = FacetIndex.build(conn)
+    assert (index.bitmaps, index.rows, index.universe) == (
+        fresh.bitmaps,
+        fresh.rows,
+        fresh.universe,
+    )
+
+
+def test_save_load_round_trip(conn, tmp_path):
+    index = FacetIndex.build(conn)
+    path = tmp_path / "facet_index.bin"
+    index.save(path)
+    loaded = FacetIndex.load(path)
+    assert (loaded.bitmaps, loaded.rows, loaded.universe, loaded.stamp) == (
+        index.bitmaps,
+        index.rows,
+        index.universe,
+        index.stamp,
+    )
+    assert index.stamp is not None
+    path.write_bytes(b"not an index")
+    assert FacetIndex.load(path) is None
+
+
+def test_open_index_skips_refresh_when_unchanged(conn, tmp_path, monkeypatch):
+    path = tmp_path / "facet_index.bin"
+    open_index(conn, path)
+    saved = path.read_bytes()
+
+    def fail(conn):
+        raise AssertionError("rescanned an unchanged database")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(facet_index, "read_facet_values", fail)
+        open_index(conn, path)
+    assert path.read_bytes() == saved
+
+    conn.execute("UPDATE items SET recording_place_id = 6 WHERE recording_place_id = 1")
+    conn.commit()
+    index = open_index(conn, path)
+    assert index.counts("place").get(1) is None
+    assert FacetIndex.load(path).stamp == index.stamp
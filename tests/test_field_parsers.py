@@ -0,0 +1,124 @@
+"""field_parsers: free-text recording dates, durations and matrix numbers."""
+
+import sqlite3
+
+import pytest
+from facet_index import read_facet_values
+from field_parsers import (
+    DATE_ISSUE,
+    DERIVED_COLUMNS,
+    DURATION_ISSUE,
+    MATRIX_ISSUE,
+    RecordingDate,
+    derive_values,
+    parse_duration,
+    parse_matrix_number,
+    parse_recording_date,
+    refresh_derived_columns,
+)
+
+DATES = [
+    ("12/03/1934", RecordingDate(1934, 19340312, 19340312, False)),
+    ("03/1931", RecordingDate(1931, 19310301, 19310331, False)),
+    ("02/1932", RecordingDate(1932, 19320201, 19320229, False)),
+    ("1936", RecordingDate(1936, 19360101, 19361231, False)),
+    ("1932-1933", RecordingDate(1932, 19320101, 19331231, False)),
+    ("1930 ή 1931", RecordingDate(1930, 19300101, 19311231, True)),
+    ("[1930]", RecordingDate(1930, 19300101, 19301231, True)),
+    ("c. 1928", RecordingDate(1928, 19280101, 19281231, True)),
+    ("1935 (;)", RecordingDate(1935, 19350101, 19351231, True)),
+    ("1935;", RecordingDate(1935, 19350101, 19351231, True)),
+    (" 1936 ", RecordingDate(1936, 19360101, 19361231, False)),
+    (None, None),
+    ("", None),
+    ("Άγνωστη", None),
+    ("?", None),
+]
+BAD_DATES = ["Μάιος 1931", "31/02/1934", "13/1931", "1933-1932", "1850", "2031", "19360"]
+
+DURATIONS = [
+    ("3:12", 192),
+    ("03:05", 185),
+    ("1:02:03", 3723),
+    ("2'45\"", 165),
+    ("3΄", 180),
+    ('45"', 45),
+    ("?", None),
+    (None, None),
+]
+BAD_DURATIONS = ["3:75", "τρία λεπτά", "3.12", "1:60:00"]
+
+MATRICES = [
+    ("W 123456-2", ("W", 123456, "2")),
+    ("OA-0123-1", ("OA", 123, "1")),
+    ("GO 1234", ("GO", 1234, None)),
+    ("12345", (None, 12345, None)),
+    ("bw 7/A", ("BW", 7, "A")),
+    ("ασαφές", None),
+    (None, None),
+]
+BAD_MATRICES = ["W-", "χωρίς αριθμό", "12 34 56"]
+
+
+@pytest.mark.parametrize(("text", "expected"), DATES)
+def test_parse_recording_date(text, expected):
+    assert parse_recording_date(text) == expected
+
+
+@pytest.mark.parametrize("text", BAD_DATES)
+def test_unrecognized_recording_date(text):
+    with pytest.raises(ValueError):
+        parse_recording_date(text)
+
+
+@pytest.mark.parametrize(("text", "expected"), DURATIONS)
+def test_parse_duration(text, expected):
+    assert parse_duration(text) == expected
+
+
+@pytest.mark.parametrize("text", BAD_DURATIONS)
+def test_unrecognized_duration(text):
+    with pytest.raises(ValueError):
+        parse_duration(text)
+
+
+@pytest.mark.parametrize(("text", "expected"), MATRICES)
+def test_parse_matrix_number(text, expected):
+    assert parse_matrix_number(text) == expected
+
+
+@pytest.mark.parametrize("text", BAD_MATRICES)
+def test_unrecognized_matrix_number(text):
+    with pytest.raises(ValueError):
+        parse_matrix_number(text)
+
+
+def test_derive_values_sets_issue_bits():
+    assert derive_values("03/1931", "3:12", "W 123456-2") == (
+        1931, 19310301, 19310331, 0, 192, "W", 123456, 2, 0
+    )  # fmt: skip
+    values = derive_values("Μάιος 1931", "τρία λεπτά", "χωρίς αριθμό")
+    assert values == (None,) * 8 + (DATE_ISSUE | DURATION_ISSUE | MATRIX_ISSUE,)
+
+
+def test_migrated_columns_are_current(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    columns = ", ".join(DERIVED_COLUMNS)
+    for recording_date, duration, matrix_number, *derived in conn.execute(
+        f"SELECT recording_date, duration, matrix_number, {columns} FROM items"
+    ):
+        assert tuple(derived) == derive_values(recording_date, duration, matrix_number)
+    assert refresh_derived_columns(conn)["updated"] == 0
+    conn.close()
+
+
+def test_facet_years_without_derived_column(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    with_column = read_facet_values(conn)
+    for (index,) in conn.execute(
+        "SELECT name FROM pragma_index_list('items') WHERE name LIKE '%recording_year%'"
+    ).fetchall():
+        conn.execute(f"DROP INDEX {index}")
+    conn.execute("ALTER TABLE items DROP COLUMN recording_year")
+    assert read_facet_values(conn) == with_column
+    conn.close()
@@ -0,0 +1,92 @@
+"""fts_bulk_write: items_fts stays consistent with items, whatever happens in the block."""
+
+import sqlite3
+
+import pytest
+from fts_bulk import FTS_TRIGGERS, fts_bulk_write, sync_triggers
+
+
+def integrity_check(conn):
+    # rank 1 also compares the index with the external content table (items)
+    conn.execute("INSERT INTO items_fts(items_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def search(conn, query):
+    return {
+        row[0] for row in conn.execute("SELECT id FROM items_fts WHERE items_fts MATCH ?", (query,))
+    }
+
+
+@pytest.fixture
+def conn(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    yield conn
+    conn.close()
+
+
+def test_integrity_check_detects_unsynced_writes(conn):
+    for name in FTS_TRIGGERS:
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("UPDATE items SET lyrics = 'ξεχασμένος' WHERE id = '500'")
+    with pytest.raises(sqlite3.DatabaseError):
+        integrity_check(conn)
+
+
+@pytest.mark.parametrize("item_ids", [None, ["500", "501", "501"]])
+def test_writes_are_indexed(conn, item_ids):
+    with fts_bulk_write(conn, item_ids=item_ids):
+        conn.executemany(
+            "UPDATE items SET lyrics = ? WHERE id = ?",
+            [("καινούργιος στίχος", "500"), ("άλλος στίχος", "501")],
+        )
+    assert set(sync_triggers(conn)) == set(FTS_TRIGGERS)
+    integrity_check(conn)
+    assert search(conn, "στίχος") >= {"500", "501"}
+    assert search(conn, "καινούργιος") == {"500"}
+
+
+def test_targeted_refresh_of_many_items(conn):
+    ids = [item_id for (item_id,) in conn.execute("SELECT id FROM items")]
+    with fts_bulk_write(conn, item_ids=ids * 4):  # more than SQLite's variable limit
+        conn.execute("UPDATE items SET lyrics = 'ολοκαίνουργιος στίχος'")
+    integrity_check(conn)
+    assert search(conn, "ολοκαίνουργιος") == set(ids)
+
+
+def test_rollback_keeps_triggers_and_index(conn):
+    before = conn.execute("SELECT lyrics FROM items WHERE id = '500'").fetchone()
+    with pytest.raises(RuntimeError), fts_bulk_write(conn, item_ids=["500"]):
+        conn.execute("UPDATE items SET lyrics = 'χαμένος' WHERE id = '500'")
+        conn.execute("DELETE FROM items WHERE id = '501'")
+        raise RuntimeError("import failed")
+    assert conn.execute("SELECT lyrics FROM items WHERE id = '500'").fetchone() == before
+    assert set(sync_triggers(conn)) == set(FTS_TRIGGERS)
+    integrity_check(conn)
+
+
+def test_other_writers_wait_while_triggers_are_dropped(conn, migrated_db):
+    other = sqlite3.connect(migrated_db, timeout=0)
+    with fts_bulk_write(conn, item_ids=["500"]):
+        conn.execute("UPDATE items SET lyrics = 'καινούργιος' WHERE id = '500'")
+        assert set(sync_triggers(other)) == set(FTS_TRIGGERS)  # drops not visible yet
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("UPDATE items SET lyrics = 'ανεπίδοτο' WHERE id = '502'")
+    other.close()
+    integrity_check(conn)
+    assert search(conn, "καινούργιος") == {"500"}
+
+
+@pytest.mark.parametrize(
+    ("sql", "indexed"),
+    [
+        ("UPDATE items SET title = 'Καινούργιο τραγούδι' WHERE id = '500'", {"500"}),
+        ("DELETE FROM items WHERE id = '500'", set()),
+    ],
+)
+def test_plain_writes_keep_index_in_sync(conn, sql, indexed):
+    assert search(conn, 'title:"0"') == {"500"}
+    conn.execute(sql)
+    conn.commit()
+    integrity_check(conn)
+    assert search(conn, 'title:"0"') == set()  # old tokens are gone
+    assert search(conn, "καινούργιο") == indexed
@@ -0,0 +1,156 @@
+"""import_lyrics: planning and applying reviewed uncertain matches."""
+
+import json
+import sqlite3
+
+import pytest
+from import_lyrics import (
+    apply_review,
+    collect_decisions,
+    load_ids_with_lyrics,
+    load_item_details,
+    load_review,
+    plan_review,
+    write_review,
+)
+from lyrics_store import LyricsIndex
+
+LYRICS = {
+    "Η Φραγκοσυριανή": {"lyrics": "Μια φούντωση μια φλόγα]]\nέχω μέσα στην καρδιά"},
+    "Φραγκοσυριανή": {"lyrics": "Μια φούντωση μια φλόγα (παραλλαγή)"},
+    "Ο Μάγκας": {"lyrics": "Ο μάγκας ο μπαγλαμάς"},
+    "Η Σμυρνιά": {"lyrics": "Σμυρνιά μου, σε αγάπησα"},
+    "Το Χασίσι": {"lyrics": "Στο τεκέ του Καραμπουρνού"},
+}
+
+
+@pytest.fixture
+def conn(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def songs(tmp_path):
+    path = tmp_path / "lyrics_rebet.json"
+    path.write_text(json.dumps(LYRICS, ensure_ascii=False), encoding="utf-8")
+    return LyricsIndex.open(path)
+
+
+@pytest.fixture
+def ids(conn):
+    """Three items without lyrics and one with."""
+    has_lyrics = load_ids_with_lyrics(conn)
+    rows = conn.execute("SELECT id FROM items ORDER BY rowid").fetchall()
+    without = [item_id for (item_id,) in rows if item_id not in has_lyrics]
+    return *without[:3], sorted(has_lyrics)[0]
+
+
+def match(lyric_title, song_id, confidence=0.8):
+    return {
+        "lyric_title": lyric_title,
+        "song_id": song_id,
+        "matched_db_title": f"Τραγούδι {song_id}",
+        "confidence": confidence,
+    }
+
+
+def review_file(path, decisions):
+    """A review CSV with the given {(lyric_title, db_id): decision}."""
+    rows = [
+        {"lyric_title": title, "db_id": song_id, "decision": decision}
+        for (title, song_id), decision in decisions.items()
+    ]
+    write_review(path, [{"confidence": 0.8, **row} for row in rows])
+    return path
+
+
+def lyrics_of(conn, song_id):
+    return conn.execute("SELECT lyrics FROM items WHERE id = ?", (song_id,)).fetchone()[0]
+
+
+def test_item_details_in_one_query(conn):
+    ids = [item_id for (item_id,) in conn.execute("SELECT id FROM items")] * 4 + ["404"]
+    expected = {}
+    for item_id in ids:
+        row = conn.execute(
+            "SELECT creator_composer, recording_date, first_words FROM items WHERE id = ?",
+            (item_id,),
+        ).fetchone()
+        if row:
+            expected[item_id] = row
+    assert len(ids) > 999  # more IDs than SQLite's default bound-variable limit
+    assert load_item_details(conn, ids) == expected
+
+
+def test_plan_keeps_decisions_and_skips_items_with_lyrics(conn, songs, ids, tmp_path):
+    first, second, _third, with_lyrics = ids
+    report = {
+        "uncertain": [
+            match("Η Φραγκοσυριανή", first),
+            match("Ο Μάγκας", second),
+            match("Η Σμυρνιά", with_lyrics),
+            match("Δεν υπάρχει", first),
+        ]
+    }
+    path = tmp_path / "review.csv"
+    assert plan_review(conn, songs, report, load_ids_with_lyrics(conn), path) == 2
+
+    rows = load_review(path)
+    assert set(rows) == {("Η Φραγκοσυριανή", first), ("Ο Μάγκας", second)}
+    assert rows["Η Φραγκοσυριανή", first]["lyric_preview"] == "Μια φούντωση μια φλόγα"
+
+    rows["Ο Μάγκας", second]["decision"] = "YES"
+    write_review(path, list(rows.values()))
+    plan_review(conn, songs, report, load_ids_with_lyrics(conn), path)
+    assert load_review(path)["Ο Μάγκας", second]["decision"] == "YES"
+
+
+def test_conflicting_decisions_are_merged(tmp_path):
+    a = review_file(
+        tmp_path / "a.csv",
+        {("Ο Μάγκας", "501"): "YES", ("Η Σμυρνιά", "502"): "yes", ("Το Χασίσι", "503"): "n"},
+    )
+    b = review_file(
+        tmp_path / "b.csv",
+        {("Ο Μάγκας", "501"): "y", ("Η Σμυρνιά", "502"): "NO", ("Το Χασίσι", "503"): ""},
+    )
+    decisions, conflicts = collect_decisions([a, b])
+    assert decisions == {("Ο Μάγκας", "501"): "YES", ("Το Χασίσι", "503"): "NO"}
+    assert conflicts == [("Η Σμυρνιά", "502")]
+
+
+def test_unknown_decision_names_the_file(tmp_path):
+    path = review_file(tmp_path / "a.csv", {("Ο Μάγκας", "501"): "maybe"})
+    with pytest.raises(ValueError, match="a.csv"):
+        collect_decisions([path])
+
+
+def test_apply_review(conn, songs, ids, tmp_path):
+    first, second, third, with_lyrics = ids
+    kept = lyrics_of(conn, with_lyrics)
+    path = review_file(
+        tmp_path / "review.csv",
+        {
+            ("Η Φραγκοσυριανή", first): "YES",
+            ("Φραγκοσυριανή", first): "YES",  # two lyrics for one song
+            ("Ο Μάγκας", second): "YES",
+            ("Η Σμυρνιά", with_lyrics): "YES",
+            ("Το Χασίσι", second): "NO",
+            ("Το Χασίσι", third): "YES",
+        },
+    )
+    statements = []
+    conn.set_trace_callback(statements.append)
+    stats = apply_review(conn, songs, load_ids_with_lyrics(conn), [path], batch_size=1)
+    conn.set_trace_callback(None)
+
+    assert stats == {"imported": 2, "rejected": 1, "skipped": 2, "already_had": 1}
+    assert lyrics_of(conn, first) is None
+    assert lyrics_of(conn, second) == "Ο μάγκας ο μπαγλαμάς"
+    assert lyrics_of(conn, third) == "Στο τεκέ του Καραμπουρνού"
+    assert lyrics_of(conn, with_lyrics) == kept
+    # Both batches and the reindexing are one transaction
+    transaction = [sql for sql in statements if sql.split()[0] in ("BEGIN", "COMMIT")]
+    assert transaction == ["BEGIN IMMEDIATE", "COMMIT"]
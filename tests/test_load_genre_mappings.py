@@ -0,0 +1,59 @@
+"""load_genre_mappings: genre membership is loaded into the empty migrated tables."""
+
+import json
+import sqlite3
+
+import pytest
+from load_genre_mappings import load_genre_mappings, read_genre_mappings
+
+MAPPINGS = {
+    "rebetiko": {"name_en": "Rebetiko", "name_el": "Ρεμπέτικο", "items": [500, "501", "9999"]},
+    "laiko": {"name_en": "Laiko", "name_el": "Λαϊκό", "items": ["501", "502", "502"]},
+}
+
+
+@pytest.fixture
+def conn(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    yield conn
+    conn.close()
+
+
+def links(conn):
+    return conn.execute("SELECT item_id, genre_id FROM item_genres ORDER BY 1, 2").fetchall()
+
+
+def test_migration_creates_empty_tables(conn):
+    assert conn.execute("SELECT COUNT(*) FROM genres").fetchone() == (0,)
+    assert links(conn) == []
+
+
+def test_load_mapping_file(conn, tmp_path):
+    path = tmp_path / "genre_mappings.json"
+    path.write_text(json.dumps(MAPPINGS, ensure_ascii=False), encoding="utf-8")
+
+    stats = load_genre_mappings(conn, read_genre_mappings(path))
+
+    assert stats == {"genres": 2, "links": 4, "unknown_items": 1}
+    assert links(conn) == [
+        ("500", "rebetiko"),
+        ("501", "laiko"),
+        ("501", "rebetiko"),
+        ("502", "laiko"),
+    ]
+    assert dict(conn.execute("SELECT id, name_el FROM genres")) == {
+        "rebetiko": "Ρεμπέτικο",
+        "laiko": "Λαϊκό",
+    }
+
+
+def test_reload_replaces_membership(conn):
+    load_genre_mappings(conn, MAPPINGS)
+    renamed = {"laiko": {"name_en": "Laiko", "name_el": "Λαϊκό τραγούδι", "items": ["503"]}}
+    stats = load_genre_mappings(conn, renamed)
+
+    assert stats == {"genres": 1, "links": 1, "unknown_items": 0}
+    assert links(conn) == [("503", "laiko")]
+    assert conn.execute("SELECT name_el FROM genres WHERE id = 'laiko'").fetchone() == (
+        "Λαϊκό τραγούδι",
+    )
@@ -0,0 +1,92 @@
+"""match_lyrics: indexed matching and cached rematching give the full-scan results."""
+
+import random
+from itertools import islice
+from pathlib import Path
+
+import pytest
+from lyrics_store import iter_lyrics
+from match_lyrics import (
+    find_stale,
+    load_match_cache,
+    lyric_key,
+    match_all,
+    match_lyric,
+    match_title,
+    save_match_cache,
+    similarity_score,
+    title_candidates,
+)
+from title_corpus import TitleCorpus, normalize_text
+
+LYRICS_FILE = Path(__file__).parent.parent / "database" / "lyrics_rebet.json"
+
+
+def baseline_match_title(lyrics_title, url_slug, db_titles):
+    """The original matcher: every candidate against every title, first best score wins."""
+    best_match, best_score, best_reason = None, 0.0, ""
+    for candidate, source in title_candidates(lyrics_title, url_slug):
+        norm_candidate = normalize_text(candidate)
+        for db_title in db_titles:
+            score = similarity_score(norm_candidate, normalize_text(db_title))
+            if score > best_score:
+                best_match, best_score, best_reason = db_title, score, source
+    return best_match, best_score, best_reason
+
+
+@pytest.fixture(scope="module")
+def entries():
+    return [
+        (title, data["url"].split("/songs/")[-1])
+        for title, data in islice(iter_lyrics(LYRICS_FILE), 120)
+    ]
+
+
+@pytest.fixture(scope="module")
+def db_titles(entries):
+    """Archive-like titles: variants of some lyric titles plus unrelated ones."""
+    rng = random.Random(5)
+    titles = []
+    for title, _slug in entries[::2]:
+        words = title.replace("(", " ").replace(")", " ").split()
+        if rng.random() < 0.5:
+            words = words[:-1] or words
+        titles.append(" ".join(words).upper() if rng.random() < 0.3 else " ".join(words))
+    titles += [title for title, _slug in entries[1::7]]
+    titles += ["Το τραγούδι του δρόμου", "Μινόρε του τεκέ", "Χασάπικο", "Ζεϊμπέκικο"]
+    return sorted(titles)
+
+
+def test_match_title_equals_full_scan(entries, db_titles):
+    corpus = TitleCorpus.from_titles(db_titles)
+    for title, slug in entries:
+        assert match_title(title, slug, corpus) == baseline_match_title(title, slug, db_titles)
+
+
+def test_workers_give_serial_results(entries, db_titles):
+    corpus = TitleCorpus.from_titles(db_titles)
+    assert match_all(entries, corpus, workers=2) == match_all(entries, corpus, workers=1)
+
+
+def test_cached_rematch_equals_full_match(tmp_path, entries, db_titles):
+    cache_file = tmp_path / "cache.json"
+    first = match_all(entries, TitleCorpus.from_titles(db_titles))
+    save_match_cache(cache_file, db_titles, first)
+
+    # Drop some matched titles, add new ones and change one lyric
+    matched = sorted({r["matched_db_title"] for r in first if r["matched_db_title"]})
+    titles = sorted(set(db_titles) - set(matched[::3]) | {"Αγάπη είχα", "Miss Odeon blues"})
+    changed = [*entries[:-1], ("Μινόρε του τεκέ", "minore-tou-teke")]
+
+    corpus = TitleCorpus.from_titles(titles)
+    cache = load_match_cache(cache_file)
+    stale = set(find_stale(changed, titles, cache))
+    assert 0 < len(stale) < len(changed)
+
+    merged = []
+    for i, (title, slug) in enumerate(changed):
+        if i in stale:
+            merged.append(match_lyric(title, slug, corpus))
+        else:
+            merged.append({**cache["entries"][lyric_key(title, slug)], "song_id": None})
+    assert merged == match_all(changed, corpus)
@@ -0,0 +1,52 @@
+"""metadata_pipeline: parallel rowid chunks merge to the sequential result."""
+
+import json
+import sqlite3
+
+import pytest
+from metadata_pipeline import ANALYZERS, Analyzer, run_pipeline
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_workers_give_sequential_result(archive_db, workers):
+    sequential = run_pipeline(archive_db, workers=1)
+    assert run_pipeline(archive_db, workers=workers) == sequential
+
+
+def test_counts_and_malformed_rows(archive_db):
+    conn = sqlite3.connect(archive_db)
+    rows = conn.execute("SELECT id, metadata_json FROM items ORDER BY rowid").fetchall()
+    conn.close()
+    malformed = []
+    with_lyrics = []
+    for item_id, metadata_json in rows:
+        try:
+            metadata = json.loads(metadata_json)
+        except ValueError:
+            malformed.append(item_id)
+            continue
+        if metadata.get("Στίχοι"):
+            with_lyrics.append(item_id)
+
+    result = run_pipeline(archive_db, ["lyrics"], workers=2)
+    assert (result.rows, result.with_metadata) == (len(rows), len(rows))
+    assert result.malformed == len(malformed) > 0
+    assert result.malformed_ids == malformed
+    assert [item["id"] for item in result.results["lyrics"]] == with_lyrics
+
+
+def test_unknown_analyzer(archive_db):
+    with pytest.raises(ValueError, match="nope"):
+        run_pipeline(archive_db, ["fields", "nope"])
+
+
+def test_analyzers_must_implement_every_method():
+    class VisitOnly(Analyzer):
+        name = "visit_only"
+
+        def visit(self, item, metadata):
+            pass
+
+    with pytest.raises(TypeError):
+        VisitOnly()
+    assert all(not cls.__abstractmethods__ for cls in ANALYZERS.values())
@@ -0,0 +1,136 @@
+"""Genre scraper against the local fake vmrebetiko.gr server."""
+
+from pathlib import Path
+
+import pytest
+import scrape_genre_mappings_correct as scraper
+from benchmark_search_parser import load_pages
+from bs4 import BeautifulSoup
+from fake_vmrebetiko_server import FakeSiteConfig, genre_item_ids, render_search_page, start_server
+from http_cache import HttpCache
+from http_pool import RetryPolicy
+from scrape_journal import ScrapeJournal
+
+GENRES = {"rebetiko": "Ρεμπέτικο", "amanes": "Αμανές", "elafro": "Ελαφρό"}
+COUNTS = {"Ρεμπέτικο": 130, "Αμανές": 3, "Ελαφρό": 0}
+EXPECTED = {genre_id: genre_item_ids(name, COUNTS[name]) for genre_id, name in GENRES.items()}
+FAST_RETRY = RetryPolicy(max_attempts=8, base_delay=0.01, max_delay=0.05)
+SAVED_PAGES = sorted((Path(__file__).parent / "fixtures" / "search_pages").glob("*.html"))
+
+
+@pytest.fixture
+def site(request):
+    """Fake site configured by the test's parameters; the scraper is reset afterwards."""
+    options = getattr(request, "param", {})
+    server = start_server(FakeSiteConfig(item_counts=COUNTS, **options))
+    scraper.reset_stats()
+    yield server
+    server.shutdown()
+    server.server_close()
+    scraper.configure()
+    scraper.reset_stats()
+
+
+@pytest.mark.parametrize("window", [2, -1])
+def test_extract_matches_beautifulsoup(window):
+    config = FakeSiteConfig(item_counts=COUNTS, pagination_window=window)
+    for page_num in range(5):
+        html = render_search_page("Ρεμπέτικο", page_num, config)
+        expected = scraper.parse_search_page(BeautifulSoup(html, "lxml"))
+        assert scraper.extract_search_page(html) == expected
+
+
+@pytest.mark.parametrize("path", SAVED_PAGES, ids=lambda path: path.stem)
+def test_extract_matches_beautifulsoup_on_saved_pages(path):
+    html = path.read_text(encoding="utf-8")
+    assert scraper.extract_search_page(html) == scraper.parse_search_page(
+        BeautifulSoup(html, "lxml")
+    )
+
+
+def test_benchmark_does_not_create_the_cache(tmp_path):
+    cache_file = tmp_path / "http_cache.db"
+    assert load_pages([], cache_file, None) == []
+    assert not cache_file.exists()
+    assert len(load_pages(SAVED_PAGES, cache_file, 2)) == 2
+
+
+@pytest.mark.parametrize(
+    "site",
+    [
+        {},
+        {"pagination_window": -1},  # no pagination links: the scraper probes
+        {"error_rate": 0.15, "throttle_rate": 0.1, "retry_after": 0.01, "seed": 3},
+    ],
+    indirect=True,
+)
+def test_scrape_returns_every_item(site):
+    scraper.configure(workers=4, rate=500, search_url=site.search_url, retry=FAST_RETRY)
+    assert scraper.scrape_genres(GENRES, workers=4) == EXPECTED
+
+
+@pytest.mark.parametrize("site", [{"error_rate": 1.0, "retry_after": 0.01}], indirect=True)
+def test_failed_pages_leave_genre_incomplete(site, capsys):
+    scraper.configure(
+        rate=500, search_url=site.search_url, retry=RetryPolicy(max_attempts=2, base_delay=0.01)
+    )
+    assert scraper.scrape_genres(GENRES) == {}
+    assert "incomplete" in capsys.readouterr().out
+
+
+def test_cache_revalidates_and_serves_offline(site, tmp_path):
+    cache = HttpCache(tmp_path / "http_cache.db", ttl=0)
+    scraper.configure(rate=500, cache=cache, search_url=site.search_url)
+    assert scraper.scrape_genres(GENRES) == EXPECTED
+    downloaded = scraper.fetch_stats["downloaded"]
+
+    scraper.reset_stats()
+    assert scraper.scrape_genres(GENRES) == EXPECTED
+    assert scraper.fetch_stats["revalidated"] == downloaded  # all 304, nothing re-downloaded
+    assert scraper.fetch_stats["downloaded"] == 0
+
+    scraper.reset_stats()
+    requests_before = site.counts["requests"]
+    scraper.configure(cache=cache, offline=True, search_url=site.search_url)
+    assert scraper.scrape_genres(GENRES) == EXPECTED
+    assert site.counts["requests"] == requests_before
+    cache.close()
+
+
+def test_resume_from_journal(site, tmp_path):
+    journal_path = tmp_path / "journal.ndjson"
+    scraper.configure(rate=500, search_url=site.search_url)
+    with ScrapeJournal(journal_path) as journal:
+        scraper.scrape_genres(GENRES, journal=journal)
+
+    # An interrupted run: only the first two page records were written
+    lines = journal_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    journal_path.write_text("".join(lines[:2]), encoding="utf-8")
+
+    output = tmp_path / "genre_mappings.json"
+    assert scraper.finish_run(GENRES, output, journal_path)[1] == list(GENRES)
+    assert journal_path.exists()  # unfinished, kept for the next run
+
+    scrapes = scraper.load_scrapes(GENRES, journal_path)
+    assert sum(len(scrape.pages) for scrape in scrapes.values()) == 2
+    requests_before = site.counts["requests"]
+    with ScrapeJournal(journal_path) as journal:
+        assert scraper.scrape_genres(GENRES, journal=journal, scrapes=scrapes) == EXPECTED
+    assert site.counts["requests"] - requests_before == len(lines) - len(GENRES) - 2
+
+    mappings, incomplete = scraper.finish_run(GENRES, output, journal_path)
+    assert {genre_id: data["items"] for genre_id, data in mappings.items()} == EXPECTED
+    assert incomplete == []
+    # A finished run's journal is retired, so the next run starts fresh
+    assert not journal_path.exists()
+    assert journal_path.with_name("journal.ndjson.prev").exists()
+    assert not any(scrape.pages for scrape in scraper.load_scrapes(GENRES, journal_path).values())
+
+
+def test_at_least_one_attempt(monkeypatch, capsys):
+    with pytest.raises(ValueError, match="at least 1"):
+        RetryPolicy(max_attempts=0)
+    monkeypatch.setattr("sys.argv", ["scrape_genre_mappings_correct.py", "--retries", "0"])
+    with pytest.raises(SystemExit):
+        scraper.main()
+    assert "at least 1" in capsys.readouterr().err
@@ -0,0 +1,47 @@
+"""SimilarityEngine scores must equal plain SequenceMatcher ratios."""
+
+import random
+from difflib import SequenceMatcher
+
+import pytest
+from similarity import SimilarityEngine, char_slots, similarity
+
+ALPHABET = "αβγδεζηθικλμνξοπρσςτυφχψω ά"
+
+
+def random_texts(count, seed):
+    rng = random.Random(seed)
+    return ["".join(rng.choices(ALPHABET, k=rng.randint(0, 30))) for _ in range(count)]
+
+
+def test_char_slots_intersection_counts_shared_characters():
+    assert len(char_slots("αββγ") & char_slots("ββββγ")) == 3
+    assert char_slots("") == frozenset()
+
+
+@pytest.mark.parametrize("cutoff", [0.0, 0.5, 0.8, 0.95])
+def test_score_many_matches_sequence_matcher(cutoff):
+    texts = random_texts(300, seed=1)
+    engine = SimilarityEngine(texts)
+    positions = list(range(len(texts)))
+    for query in random_texts(20, seed=2) + texts[:5]:
+        scores = engine.score_many(query, positions, cutoff)
+        for position, score in zip(positions, scores, strict=True):
+            assert score == engine.score(query, position, cutoff)
+            assert score == similarity(query, texts[position], cutoff)
+            ratio = SequenceMatcher(None, query, texts[position]).ratio()
+            # Only pairs certainly below the cutoff may be pruned to 0.0
+            assert score == ratio or (score == 0.0 and ratio < cutoff)
+
+
+def test_best_match_equals_linear_scan():
+    texts = random_texts(300, seed=3)
+    engine = SimilarityEngine(texts)
+    positions = list(range(len(texts)))
+    for query in random_texts(30, seed=4):
+        best_position, best_score = None, 0.2
+        for position in positions:
+            score = SequenceMatcher(None, query, texts[position]).ratio()
+            if score > best_score:
+                best_position, best_score = position, score
+        assert engine.best_match(query, positions, floor=0.2) == (best_position, best_score)
@@ -0,0 +1,214 @@
+"""Cache of analysis results keyed by database change stamps.
+
+A cached analysis is reused, printed output included, while its inputs are
+unchanged:
+
+- Fast path: the file change counter in the database header (bytes 24-27) is
+  the same as when the result was stored, i.e. nothing was written to the
+  database since. (PRAGMA data_version only compares commits seen by one
+  connection, so it cannot tell across runs.)
+- Otherwise the per-table stamps in _table_versions are compared. Triggers
+  installed by migration 2b7f4c9e1a06 add 1 to a table's stamp for every
+  inserted, updated or deleted row, so only analyses reading a table that
+  changed are recomputed.
+
+Schema changes (PRAGMA schema_version) and a different analysis `version`
+always recompute. Without _table_versions, or in WAL mode (where commits do
+not bump the header counter), analyses fall back to the counter alone or
+are always recomputed. A table missing any of its stamp triggers (e.g.
+after op.batch_alter_table()) is treated as untracked. fts_bulk_write()
+suspends the items triggers and bumps the items stamp once instead.
+
+Results are stored as JSON in database/cache/analysis_cache.json, so they
+must be JSON-serializable (tuples come back as lists, int keys as strings).
+
+Usage:
+    with AnalysisCache(conn, DB_PATH) as cache:
+        stats = cache.run("field_census", ["items"], lambda: field_census(conn))
+        structure = cache.run("structure", ALL_TABLES, lambda: describe_tables(conn))
+"""
+
+import io
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Callable, Sequence
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, TypeVar
+
+CACHE_FILE = Path(__file__).parent.parent / "database" / "cache" / "analysis_cache.json"
+CACHE_VERSION = 1
+VERSIONS_TABLE = "_table_versions"
+ALL_TABLES = None  # inputs of an analysis that reads the whole database
+
+T = TypeVar("T")
+
+
+def _trigger_names(table: str) -> dict[str, str]:
+    return {
+        event: f"{table}_version_{event[0].lower()}" for event in ("INSERT", "UPDATE", "DELETE")
+    }
+
+
+def table_versions(conn: sqlite3.Connection) -> dict[str, int] | None:
+    """Current change stamp of every tracked table, None if stamps are not installed.
+
+    A table counts as tracked only while all three of its stamp triggers
+    exist: one dropped trigger (e.g. by op.batch_alter_table()) would let
+    writes through without a new stamp.
+    """
+    try:
+        stamps = dict(conn.execute(f"SELECT table_name, version FROM {VERSIONS_TABLE}"))
+    except sqlite3.OperationalError:
+        return None
+    triggers = {
+        (table, name)
+        for table, name in conn.execute(
+            "SELECT tbl_name, name FROM sqlite_master WHERE type = 'trigger'"
+        )
+    }
+    return {
+        table: version
+        for table, version in stamps.items()
+        if all((table, name) in triggers for name in _trigger_names(table).values())
+    }
+
+
+def change_counter(conn: sqlite3.Connection, db_path: Path | str) -> int | None:
+    """File change counter from the database header, None in WAL mode."""
+    if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+        return None
+    try:
+        with open(db_path, "rb") as f:
+            header = f.read(28)
+    except OSError:
+        return None
+    return int.from_bytes(header[24:28], "big") if len(header) == 28 else None
+
+
+class _Tee(io.StringIO):
+    """Records everything written while passing it through to the real stdout."""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
+
+
+class AnalysisCache:
+    """Reuses analysis results (and their printed output) while their inputs are unchanged."""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        db_path: Path | str,
+        path: Path = CACHE_FILE,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            conn: Connection the analyses read from
+            db_path: Database file (for the header change counter)
+            path: Cache file
+            enabled: False to recompute everything (the results are still stored)
+        """
+        self.path = path
+        self.db = str(Path(db_path).resolve())
+        self.enabled = enabled
+        self.reused: list[str] = []
+        self.computed: list[str] = []
+        self.dirty = False
+        # Stamps are read once, before any analysis runs: a write during the run
+        # leaves older stamps in the cache, so the next run recomputes
+        self.schema = conn.execute("PRAGMA schema_version").fetchone()[0]
+        self.counter = change_counter(conn, db_path)
+        self.tables = table_versions(conn)
+        self.entries = self._load()
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _inputs_key(self, inputs: Sequence[str] | None) -> dict[str, int] | None:
+        """Stamps of the input tables, None if some input is not tracked."""
+        if inputs is ALL_TABLES or self.tables is None:
+            return None
+        if not all(table in self.tables for table in inputs):
+            return None
+        return {table: self.tables[table] for table in inputs}
+
+    def _is_current(self, entry: dict[str, Any], version: int, tables: dict | None) -> bool:
+        if (entry["db"], entry["schema"], entry["version"]) != (self.db, self.schema, version):
+            return False
+        if self.counter is not None and entry["counter"] == self.counter:
+            return True
+        return tables is not None and entry["tables"] == tables
+
+    def run(
+        self, name: str, inputs: Sequence[str] | None, compute: Callable[[], T], version: int = 1
+    ) -> T:
+        """Result of `compute()`, reused from the cache if its input tables are unchanged.
+
+        Args:
+            name: Cache key of the analysis
+            inputs: Tables the analysis reads, or ALL_TABLES
+            compute: Runs the analysis; what it prints is stored and replayed on reuse
+            version: Bump when the analysis code changes its result
+
+        Returns: the (possibly cached) result, after a JSON round trip
+        """
+        tables = self._inputs_key(inputs)
+        entry = self.entries.get(name)
+        if self.enabled and entry is not None and self._is_current(entry, version, tables):
+            sys.stdout.write(entry["output"])
+            if entry["counter"] != self.counter:
+                entry["counter"] = self.counter  # take the fast path next time
+                self.dirty = True
+            self.reused.append(name)
+            return entry["result"]
+
+        tee = _Tee(sys.stdout)
+        with redirect_stdout(tee):
+            result = compute()
+        result = json.loads(json.dumps(result, ensure_ascii=False))
+        self.entries[name] = {
+            "db": self.db,
+            "schema": self.schema,
+            "version": version,
+            "counter": self.counter,
+            "tables": tables,
+            "output": tee.getvalue(),
+            "result": result,
+        }
+        self.dirty = True
+        self.computed.append(name)
+        return result
+
+    def save(self) -> None:
+        """Write the cache file atomically if any entry changed."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": CACHE_VERSION, "entries": self.entries}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def __enter__(self) -> "AnalysisCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.save()
@@ -6,14 +6,24 @@ Analyzes dance_rhythm and recording_place fields to identify variations
 that need normalization. Outputs JSON report for lookup table creation.
 """
 
+import argparse
 import json
 import sqlite3
 from collections import defaultdict
 from pathlib import Path
 
+from analysis_cache import AnalysisCache
+
 DB_PATH = "database/vmrebetiko_all_genres.db"
 OUTPUT_DIR = Path("database/analysis")
 OUTPUT_DIR.mkdir(exist_ok=True)
+CACHE_FILE = Path("database/cache/analysis_cache.json")
+
+
+def source_column(conn, column):
+    """Column holding the original text (renamed to <column>_raw by the normalization migrations)."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(items)")}
+    return f"{column}_raw" if f"{column}_raw" in columns else column
 
 
 def analyze_dance_rhythm(conn):
@@ -21,8 +31,9 @@ def analyze_dance_rhythm(conn):
     cursor = conn.cursor()
 
     # Get all non-null dance_rhythm values
+    column = source_column(conn, "dance_rhythm")
     rhythms = cursor.execute(
-        "SELECT dance_rhythm, COUNT(*) as count FROM items WHERE dance_rhythm IS NOT NULL GROUP BY dance_rhythm ORDER BY count DESC"
+        f"SELECT {column}, COUNT(*) as count FROM items WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY count DESC"
     ).fetchall()
 
     print(f"\n{'=' * 80}")
@@ -97,8 +108,9 @@ def analyze_recording_place(conn):
     """Analyze all recording_place values and their variations."""
     cursor = conn.cursor()
 
+    column = source_column(conn, "recording_place")
     places = cursor.execute(
-        "SELECT recording_place, COUNT(*) as count FROM items WHERE recording_place IS NOT NULL GROUP BY recording_place ORDER BY count DESC"
+        f"SELECT {column}, COUNT(*) as count FROM items WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY count DESC"
     ).fetchall()
 
     print(f"\n\n{'=' * 80}")
@@ -179,12 +191,16 @@ def analyze_recording_place(conn):
     }
 
 
-def main():
+def main(use_cache=True):
     """Run analysis and output JSON report."""
     conn = sqlite3.connect(DB_PATH)
 
-    rhythm_analysis = analyze_dance_rhythm(conn)
-    place_analysis = analyze_recording_place(conn)
+    # Reused from CACHE_FILE until items changes
+    with AnalysisCache(conn, DB_PATH, CACHE_FILE, enabled=use_cache) as cache:
+        rhythm_analysis = cache.run("dance_rhythm", ["items"], lambda: analyze_dance_rhythm(conn))
+        place_analysis = cache.run(
+            "recording_place", ["items"], lambda: analyze_recording_place(conn)
+        )
 
     # Save report
     report = {
@@ -207,4 +223,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Data quality analysis")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="recompute the analyses (refreshes the cache)"
+    )
+    main(use_cache=not parser.parse_args().no_cache)
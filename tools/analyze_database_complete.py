@@ -4,27 +4,47 @@ Comprehensive Kounadis Database Analysis
 Exhaustively examines all fields, extracts all unique values, and documents the complete schema.
 """
 
+import argparse
 import json
 import sqlite3
 from collections import defaultdict
 from pathlib import Path
 
+from analysis_cache import ALL_TABLES, AnalysisCache
+from db_promote import metadata_expression
+from metadata_pipeline import run_pipeline
+
 DB_PATH = "database/vmrebetiko_all_genres.db"
 OUTPUT_DIR = Path("database/analysis")
 OUTPUT_DIR.mkdir(exist_ok=True)
-
-
-def analyze_database():
-    """Comprehensive database analysis"""
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    print("=" * 80)
-    print("COMPREHENSIVE KOUNADIS DATABASE ANALYSIS")
-    print("=" * 80)
-
+CACHE_FILE = Path("database/cache/analysis_cache.json")
+
+REBETIKO_ERA = (1920, 1944)
+
+# Standard items columns of section 2
+ITEM_FIELDS = [
+    "id",
+    "url",
+    "title",
+    "item_type",
+    "creator_composer",
+    "lyricist",
+    "publication_date",
+    "publication_place",
+    "publisher",
+    "language",
+    "first_words",
+    "physical_description",
+    "provenance",
+    "identifier",
+    "license",
+    "reference",
+    "scraped_at",
+]
+
+
+def describe_tables(cursor):
+    """Section 1: columns and row count of every table."""
     # ============================================================================
     # 1. TABLE STRUCTURE
     # ============================================================================
@@ -46,42 +66,36 @@ def analyze_database():
         count = cursor.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
         print(f"\n  Total rows: {count:,}")
 
+
+def field_census(cursor, fields=ITEM_FIELDS):
+    """(non-empty, distinct non-empty) counts of each field, in one table scan.
+
+    NULL and '' count as empty, like the falsy values of a Python loop over the rows.
+    """
+    census_sql = ", ".join(
+        f"COUNT(NULLIF({field}, '')), COUNT(DISTINCT NULLIF({field}, ''))" for field in fields
+    )
+    census = cursor.execute(f"SELECT {census_sql} FROM items").fetchone()
+    return {
+        field: (census[2 * position], census[2 * position + 1])
+        for position, field in enumerate(fields)
+    }
+
+
+def field_analysis(cursor, workers=1):
+    """Sections 2-4: items columns, metadata_json fields and lyrics."""
     # ============================================================================
     # 2. ITEMS TABLE - FIELD ANALYSIS
     # ============================================================================
     print("\n\n### 2. ITEMS TABLE - FIELD-BY-FIELD ANALYSIS ###\n")
 
-    # Get all items
-    items = cursor.execute("SELECT * FROM items").fetchall()
-    total_items = len(items)
-
-    # Analyze each standard field
-    fields = [
-        "id",
-        "url",
-        "title",
-        "item_type",
-        "creator_composer",
-        "lyricist",
-        "publication_date",
-        "publication_place",
-        "publisher",
-        "language",
-        "first_words",
-        "physical_description",
-        "provenance",
-        "identifier",
-        "license",
-        "reference",
-        "scraped_at",
-    ]
+    total_items = cursor.execute("SELECT COUNT(*) FROM items").fetchone()[0]
 
-    field_stats = {}
+    census = field_census(cursor)
 
-    for field in fields:
-        non_null = sum(1 for item in items if item[field])
-        unique_values = len(set(item[field] for item in items if item[field]))
+    field_stats = {}
 
+    for field, (non_null, unique_values) in census.items():
         field_stats[field] = {
             "total": total_items,
             "non_null": non_null,
@@ -99,19 +113,16 @@ def analyze_database():
     # ============================================================================
     print("\n\n### 3. METADATA_JSON - ALL FIELDS FOUND ###\n")
 
-    all_metadata_fields = defaultdict(int)
-    metadata_field_examples = defaultdict(list)
+    # One pass parses every metadata_json once for sections 3 and 4
+    pipeline = run_pipeline(DB_PATH, ["fields", "lyrics"], workers=workers)
+    all_metadata_fields = pipeline.results["fields"]["counts"]
+    metadata_field_examples = defaultdict(list, pipeline.results["fields"]["examples"])
 
-    for item in items:
-        if item["metadata_json"]:
-            try:
-                metadata = json.loads(item["metadata_json"])
-                for key, value in metadata.items():
-                    all_metadata_fields[key] += 1
-                    if len(metadata_field_examples[key]) < 3 and value:
-                        metadata_field_examples[key].append(str(value)[:100])
-            except:
-                pass
+    if pipeline.malformed:
+        print(
+            f"Malformed metadata_json: {pipeline.malformed} of {pipeline.with_metadata} rows "
+            f"(e.g. {', '.join(pipeline.malformed_ids[:5])})\n"
+        )
 
     print("Metadata fields found (sorted by frequency):\n")
     for field, count in sorted(all_metadata_fields.items(), key=lambda x: x[1], reverse=True):
@@ -126,23 +137,7 @@ def analyze_database():
     # ============================================================================
     print("\n\n### 4. LYRICS ANALYSIS (Στίχοι field) ###\n")
 
-    items_with_lyrics = []
-    for item in items:
-        if item["metadata_json"]:
-            try:
-                metadata = json.loads(item["metadata_json"])
-                if "Στίχοι" in metadata and metadata["Στίχοι"]:
-                    items_with_lyrics.append(
-                        {
-                            "id": item["id"],
-                            "title": item["title"],
-                            "type": item["item_type"],
-                            "language": item["language"],
-                            "lyrics_length": len(metadata["Στίχοι"]),
-                        }
-                    )
-            except:
-                pass
+    items_with_lyrics = pipeline.results["lyrics"]
 
     print(f"Total items with Στίχοι: {len(items_with_lyrics)}")
 
@@ -164,7 +159,17 @@ def analyze_database():
     print("\nBreakdown by language:")
     for lang, count in sorted(lyrics_by_language.items(), key=lambda x: x[1], reverse=True):
         print(f"  {lang:40} : {count}")
+    return {
+        "total_items": total_items,
+        "field_stats": field_stats,
+        "metadata_fields": all_metadata_fields,
+        "metadata_examples": dict(metadata_field_examples),
+        "items_with_lyrics": items_with_lyrics,
+    }
 
+
+def item_breakdowns(cursor):
+    """Sections 5-7: item types, languages and top composers."""
     # ============================================================================
     # 5. ITEM TYPES - COMPREHENSIVE BREAKDOWN
     # ============================================================================
@@ -179,6 +184,7 @@ def analyze_database():
 
     for row in type_breakdown:
         print(f"{row['item_type']:40} : {row['count']:5}")
+    type_counts = {row["item_type"]: row["count"] for row in type_breakdown}
 
     # ============================================================================
     # 6. LANGUAGES
@@ -212,7 +218,11 @@ def analyze_database():
 
     for row in composer_breakdown:
         print(f"{row['creator_composer']:40} : {row['count']:5}")
+    return type_counts
+
 
+def file_analysis(cursor):
+    """Section 8: downloaded files per type."""
     # ============================================================================
     # 8. FILES ANALYSIS
     # ============================================================================
@@ -228,43 +238,39 @@ def analyze_database():
 
     for row in file_breakdown:
         print(f"{row['file_type']:15} : {row['downloaded']:6}/{row['total']:6} downloaded")
+    return {row["file_type"]: row["total"] for row in file_breakdown}
+
 
+def era_analysis(cursor):
+    """Section 9: Greek 78rpm recordings of the rebetiko era."""
     # ============================================================================
     # 9. REBETIKO ERA ANALYSIS (1920-1944)
     # ============================================================================
     print("\n\n### 9. REBETIKO ERA (1920-1944) - 78RPM GREEK RECORDINGS ###\n")
 
-    rebetiko_songs = []
-    for item in items:
-        if (
-            item["item_type"] == "Δίσκος 78 Στροφών"
-            and item["language"]
-            and "Ελληνικά" in item["language"]
-        ):
-            if item["metadata_json"]:
-                try:
-                    metadata = json.loads(item["metadata_json"])
-                    rec_date = metadata.get("Χρονολογία ηχογράφησης", "")
-                    year = None
-                    if "/" in rec_date:
-                        parts = rec_date.split("/")
-                        if len(parts) == 3:
-                            year = int(parts[-1])
-                    elif rec_date.isdigit() and len(rec_date) == 4:
-                        year = int(rec_date)
-
-                    if year and 1920 <= year <= 1944:
-                        rebetiko_songs.append(
-                            {
-                                "id": item["id"],
-                                "title": item["title"],
-                                "composer": item["creator_composer"],
-                                "year": year,
-                                "has_lyrics": bool(metadata.get("Στίχοι")),
-                            }
-                        )
-                except:
-                    pass
+    # Range scan on the recording_year index (migration 8e4b6d0a3c75). Lyrics
+    # are the Στίχοι of metadata_json, as in section 4
+    rebetiko_songs = [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "composer": row["creator_composer"],
+            "year": row["recording_year"],
+            "has_lyrics": bool(row["lyrics"]),
+        }
+        for row in cursor.execute(
+            f"""
+            SELECT id, title, creator_composer, recording_year,
+                   {metadata_expression("Στίχοι")} AS lyrics
+            FROM items
+            WHERE recording_year BETWEEN ? AND ?
+              AND item_type = 'Δίσκος 78 Στροφών'
+              AND instr(language, 'Ελληνικά') > 0
+            ORDER BY rowid
+            """,
+            REBETIKO_ERA,
+        )
+    ]
 
     print(f"Total Greek 78rpm recordings (1920-1944): {len(rebetiko_songs)}")
     print(f"With lyrics: {sum(1 for s in rebetiko_songs if s['has_lyrics'])}")
@@ -278,6 +284,35 @@ def analyze_database():
     print("\nBy year:")
     for year in sorted(year_counts.keys()):
         print(f"  {year}: {year_counts[year]:3} recordings")
+    return rebetiko_songs
+
+
+def analyze_database(workers=1, use_cache=True):
+    """Comprehensive database analysis"""
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    print("=" * 80)
+    print("COMPREHENSIVE KOUNADIS DATABASE ANALYSIS")
+    print("=" * 80)
+
+    # Sections are reused from CACHE_FILE while their input tables are unchanged
+    with AnalysisCache(conn, DB_PATH, CACHE_FILE, enabled=use_cache) as cache:
+        cache.run("tables", ALL_TABLES, lambda: describe_tables(cursor))
+        fields = cache.run("fields", ["items"], lambda: field_analysis(cursor, workers))
+        type_counts = cache.run("item_breakdowns", ["items"], lambda: item_breakdowns(cursor))
+        file_counts = cache.run("files", ["files"], lambda: file_analysis(cursor))
+        rebetiko_songs = cache.run(
+            "rebetiko_era", ["items"], lambda: era_analysis(cursor), version=2
+        )
+
+    total_items = fields["total_items"]
+    field_stats = fields["field_stats"]
+    all_metadata_fields = fields["metadata_fields"]
+    metadata_field_examples = defaultdict(list, fields["metadata_examples"])
+    items_with_lyrics = fields["items_with_lyrics"]
 
     # ============================================================================
     # 10. EXPORT DATA TO JSON FILES
@@ -325,21 +360,34 @@ Greek 78rpm (1920-1944): {len(rebetiko_songs)}
   - Without lyrics: {sum(1 for s in rebetiko_songs if not s["has_lyrics"])}
 
 Top item types:
-  - 78rpm records: {sum(1 for item in items if item["item_type"] == "Δίσκος 78 Στροφών"):,}
-  - Sheet music: {sum(1 for item in items if item["item_type"] == "Έντυπη Παρτιτούρα"):,}
-  - Interviews: {sum(1 for item in items if item["item_type"] == "Συνέντευξη"):,}
-  - Artist bios: {sum(1 for item in items if item["item_type"] == "Καλλιτέχνης"):,}
+  - 78rpm records: {type_counts.get("Δίσκος 78 Στροφών", 0):,}
+  - Sheet music: {type_counts.get("Έντυπη Παρτιτούρα", 0):,}
+  - Interviews: {type_counts.get("Συνέντευξη", 0):,}
+  - Artist bios: {type_counts.get("Καλλιτέχνης", 0):,}
 
 Files:
-  - Audio files: {cursor.execute('SELECT COUNT(*) FROM files WHERE file_type = "audio"').fetchone()[0]:,}
-  - PDFs: {cursor.execute('SELECT COUNT(*) FROM files WHERE file_type = "pdfs"').fetchone()[0]:,}
-  - Images: {cursor.execute('SELECT COUNT(*) FROM files WHERE file_type = "images"').fetchone()[0]:,}
+  - Audio files: {file_counts.get("audio", 0):,}
+  - PDFs: {file_counts.get("pdfs", 0):,}
+  - Images: {file_counts.get("images", 0):,}
 
 Analysis files created in: {OUTPUT_DIR}/
 """)
 
+    print(
+        f"Analysis cache: {len(cache.reused)} sections reused, "
+        f"{len(cache.computed)} recomputed ({', '.join(cache.computed) or 'none'})"
+    )
+
     conn.close()
 
 
 if __name__ == "__main__":
-    analyze_database()
+    parser = argparse.ArgumentParser(description="Comprehensive database analysis")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="processes for the metadata_json pass"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="recompute every section (refreshes the cache)"
+    )
+    args = parser.parse_args()
+    analyze_database(args.workers, use_cache=not args.no_cache)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Measure scraper throughput against the local fake vmrebetiko.gr server.
+
+Starts tools/fake_vmrebetiko_server.py in-process, scrapes all genres with
+scrape_genre_mappings_correct (no cache, no journal) and reports pages/s,
+request latency percentiles and retries. The scraped item lists are checked
+against what the fake site serves, so a scrape that stops early on errors
+shows up as a failure.
+
+Usage:
+    python tools/benchmark_scraper.py --workers 8 --rate 50 --latency 80
+    python tools/benchmark_scraper.py --error-rate 0.05 --throttle-rate 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+
+import scrape_genre_mappings_correct as scraper
+from fake_vmrebetiko_server import FakeSiteConfig, genre_item_ids, start_server
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """pct-th percentile (nearest rank) of values, 0.0 if empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def main() -> None:
+    """Run one benchmark scrape and print the report."""
+    parser = argparse.ArgumentParser(description="Benchmark the genre scraper offline")
+    parser.add_argument("--workers", type=int, default=scraper.DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=50.0, help="scraper requests/s limit")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=50.0, help="server delay (ms)")
+    parser.add_argument("--jitter", type=float, default=20.0, help="server delay jitter (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429s")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After seconds")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=0, help="server answers 429 above N in flight"
+    )
+    parser.add_argument(
+        "--pagination-window", type=int, default=2, help="-1 makes the scraper probe pages"
+    )
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's page log")
+    args = parser.parse_args()
+
+    config = FakeSiteConfig(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        max_concurrency=args.max_concurrency,
+        pagination_window=args.pagination_window,
+    )
+    server = start_server(config)
+    scraper.configure(args.workers, args.rate, args.burst, search_url=server.search_url)
+    scraper.reset_stats()
+
+    log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with log, contextlib.redirect_stderr(sys.stdout if args.verbose else io.StringIO()):
+        results = scraper.scrape_genres(scraper.GENRES, args.workers)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    truncated = []
+    for genre_id, genre_name in scraper.GENRES.items():
+        expected = genre_item_ids(genre_name, config.item_counts.get(genre_name, 0))
+        if genre_id not in results:
+            truncated.append(f"{genre_id} (incomplete)")
+        elif results[genre_id] != expected:
+            truncated.append(f"{genre_id} ({len(results[genre_id])}/{len(expected)} items)")
+
+    stats = scraper.fetch_stats
+    latencies = scraper.fetch_latencies
+    requests_sent = len(latencies)
+    pages = stats["downloaded"] + stats["revalidated"]
+
+    print("=" * 60)
+    print("SCRAPER BENCHMARK (fake vmrebetiko.gr)")
+    print("=" * 60)
+    print(
+        f"Workers: {args.workers}, rate limit: {args.rate:g}/s, server latency: {args.latency:g} ms"
+    )
+    print(f"Elapsed:        {elapsed:8.2f} s")
+    print(f"Pages:          {pages:8d} ({pages / elapsed:.1f} pages/s)")
+    print(f"Requests:       {requests_sent:8d} (server: {server.counts})")
+    print(f"Retries:        {stats['retries']:8d}")
+    print(f"Failed pages:   {stats['failed']:8d}")
+    if latencies:
+        print(
+            f"Latency:        p50 {statistics.median(latencies) * 1000:.0f} ms, "
+            f"p95 {percentile(latencies, 95) * 1000:.0f} ms, "
+            f"max {max(latencies) * 1000:.0f} ms"
+        )
+    if truncated:
+        print(f"WRONG RESULTS:  {', '.join(truncated)}")
+    else:
+        print("Results:        all genres complete")
+    print("=" * 60)
+
+    if truncated:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark the search page extractors against saved pages.
+
+Compares the BeautifulSoup path (parse_search_page) with the streaming lxml
+extractor the scraper uses (extract_search_page): both must return the same
+item IDs and page links for every page, and the CPU time per page of each is
+reported.
+
+Pages come from the scraper's response cache (read only if it exists), or
+from saved HTML files. --save writes the pages out as HTML files, e.g. to add
+cached pages to the parser tests' fixtures:
+    python tools/benchmark_search_parser.py
+    python tools/benchmark_search_parser.py page1.html page2.html --repeat 20
+    python tools/benchmark_search_parser.py --limit 5 --save tests/fixtures/search_pages
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from http_cache import CACHE_FILE, HttpCache
+from scrape_genre_mappings_correct import SEARCH_URL, extract_search_page, parse_search_page
+
+
+def load_pages(files: list[Path], cache_file: Path, limit: int | None) -> list[tuple[str, str]]:
+    """(name, html) of the pages to benchmark (none if the cache was never created)."""
+    if files:
+        pages = [(str(path), path.read_text(encoding="utf-8")) for path in files]
+    elif not cache_file.exists():
+        pages = []  # HttpCache() would create an empty cache database
+    else:
+        cache = HttpCache(cache_file)
+        pages = [(entry.key, entry.text) for entry in cache.iter_entries(SEARCH_URL)]
+        cache.close()
+    return pages[:limit] if limit else pages
+
+
+def save_pages(pages: list[tuple[str, str]], directory: Path) -> None:
+    """Write each page to directory as <hash of its name>.html."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, html in pages:
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+        (directory / f"{digest}.html").write_text(html, encoding="utf-8")
+
+
+def time_parser(parse, pages: list[tuple[str, str]], repeat: int) -> float:
+    """Best-of-repeat CPU seconds to parse all pages once."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        for _name, html in pages:
+            parse(html)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main() -> None:
+    """Check both extractors agree, then time them."""
+    parser = argparse.ArgumentParser(description="Benchmark search page extraction")
+    parser.add_argument("files", type=Path, nargs="*", help="saved search pages (HTML)")
+    parser.add_argument("--cache", type=Path, default=CACHE_FILE, help="response cache file")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds (best is kept)")
+    parser.add_argument("--limit", type=int, default=None, help="benchmark at most N pages")
+    parser.add_argument("--save", type=Path, help="also write the pages to this directory")
+    args = parser.parse_args()
+
+    pages = load_pages(args.files, args.cache, args.limit)
+    if not pages:
+        print("No pages to benchmark (scrape first, or pass saved HTML files)")
+        sys.exit(1)
+    if args.save:
+        save_pages(pages, args.save)
+        print(f"Saved {len(pages)} pages to {args.save}")
+
+    def soup_path(html: str) -> tuple[list[str], set[int]]:
+        return parse_search_page(BeautifulSoup(html, "lxml"))
+
+    mismatches = [name for name, html in pages if soup_path(html) != extract_search_page(html)]
+    for name in mismatches:
+        print(f"MISMATCH: {name}")
+
+    total_bytes = sum(len(html.encode("utf-8")) for _name, html in pages)
+    print(f"Pages: {len(pages)} ({total_bytes / len(pages) / 1024:.0f} KB average)")
+    soup_time = time_parser(soup_path, pages, args.repeat)
+    fast_time = time_parser(extract_search_page, pages, args.repeat)
+    print(f"BeautifulSoup: {soup_time / len(pages) * 1000:8.2f} ms/page")
+    print(f"lxml target:   {fast_time / len(pages) * 1000:8.2f} ms/page")
+    print(f"Speedup:       {soup_time / fast_time:8.1f}x")
+    print(f"Identical results: {len(pages) - len(mismatches)}/{len(pages)}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Propose canonical mappings for a free-text column by clustering its variants.
+
+Every distinct value of the column is reduced to a matching key: accents
+folded, Latin script transliterated to Greek ("Fox-trot" -> "φοξ τροτ"),
+punctuation dropped, and uncertainty markers ("(;)", "?", a value wrapped in
+brackets) or alternatives ("Αθήνα ή Σμύρνη" -> first place) recorded as an
+uncertain flag instead. Values are then grouped:
+
+1. Equal keys are the same value.
+2. Keys sharing a character trigram are compared (blocking, so the work stays
+   close to linear in the number of distinct values) and pairs scoring at
+   least --threshold are merged (union-find).
+3. Clusters without a lookup name ("Σλόου φοξ", or "Ζεϊμπέκικος [Απτάλικος]"
+   with its "[απτάλικος]" spelling) join the one cluster whose key appears
+   among their words; those matching several clusters ("Συρτός [Χασάπικος]")
+   are left for review.
+
+With a lookup table (rhythm_types, recording_places) its Greek and English
+names take part as anchors, and each variant is assigned the nearest anchor's
+id. The proposal is written as JSON with a confidence per variant, for review
+and for db_normalize.load_proposed_mapping().
+
+Usage:
+    python tools/cluster_variants.py dance_rhythm_raw
+    python tools/cluster_variants.py recording_place_raw --threshold 0.85
+    python tools/cluster_variants.py singers --output singers_clusters.json
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from similarity import SimilarityEngine, similarity
+from title_corpus import normalize_text
+
+DB_PATH = Path(__file__).parent.parent / "database" / "vmrebetiko_all_genres.db"
+OUTPUT_DIR = Path(__file__).parent.parent / "database" / "analysis"
+
+DEFAULT_THRESHOLD = 0.8
+CONTAINMENT_CONFIDENCE = 0.7
+MAX_BLOCK_SIZE = 500  # trigrams shared by more keys than this are too common to block on
+MIN_SHARED_TRIGRAMS = 2  # candidate pairs must share this many trigrams
+
+# Lookup table whose names anchor the clusters of a column
+COLUMN_LOOKUPS = {
+    "dance_rhythm_raw": "rhythm_types",
+    "dance_rhythm": "rhythm_types",
+    "recording_place_raw": "recording_places",
+    "recording_place": "recording_places",
+}
+
+# Latin -> Greek as Greek discographies spell foreign names; digraphs first
+TRANSLITERATION = [
+    ("th", "θ"), ("ch", "χ"), ("ph", "φ"), ("ps", "ψ"), ("sh", "σ"), ("ou", "ου"),
+    ("oo", "ου"), ("ee", "ι"), ("ck", "κ"), ("tz", "τζ"), ("ts", "τσ"),
+    ("a", "α"), ("b", "μπ"), ("c", "κ"), ("d", "ντ"), ("e", "ε"), ("f", "φ"), ("g", "γκ"),
+    ("h", ""), ("i", "ι"), ("j", "τζ"), ("k", "κ"), ("l", "λ"), ("m", "μ"), ("n", "ν"),
+    ("o", "ο"), ("p", "π"), ("q", "κ"), ("r", "ρ"), ("s", "σ"), ("t", "τ"), ("u", "ου"),
+    ("v", "β"), ("w", "ου"), ("x", "ξ"), ("y", "ι"), ("z", "ζ"),
+]  # fmt: skip
+LATIN_PATTERN = re.compile("|".join(latin for latin, _ in TRANSLITERATION))
+GREEK_BY_LATIN = dict(TRANSLITERATION)
+
+UNCERTAIN_PATTERN = re.compile(r"\(\s*[;?]\s*\)|[;?]")
+ALTERNATIVES_PATTERN = re.compile(r"\s+(?:ή|or|/)\s+")
+
+
+def transliterate(text: str) -> str:
+    """Latin letters of lowercase text spelled in Greek."""
+    return LATIN_PATTERN.sub(lambda m: GREEK_BY_LATIN[m.group(0)], text)
+
+
+def matching_key(value: str) -> tuple[str, bool]:
+    """Matching key of a value, and whether the value marks itself as uncertain."""
+    text = value.strip()
+    uncertain = bool(UNCERTAIN_PATTERN.search(text))
+    text = UNCERTAIN_PATTERN.sub(" ", text).strip()
+    if text.startswith("[") and text.endswith("]"):
+        text = text[1:-1]
+        uncertain = True
+    alternatives = ALTERNATIVES_PATTERN.split(text)
+    if len(alternatives) > 1:
+        text = alternatives[0]
+        uncertain = True
+
+    text = transliterate(normalize_text(text)).replace("ς", "σ")
+    text = re.sub(r"[^\w]+", " ", text)
+    return " ".join(text.split()), uncertain
+
+
+def trigrams(key: str) -> set[str]:
+    """Character trigrams of a key padded with word boundaries."""
+    padded = f" {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, node: int) -> int:
+        while self.parent[node] != node:
+            self.parent[node] = self.parent[self.parent[node]]
+            node = self.parent[node]
+        return node
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+@dataclass
+class Variant:
+    """One distinct column value (or lookup name, for anchors)."""
+
+    value: str
+    rows: int
+    key: str
+    uncertain: bool
+    anchor_id: int | None = None  # lookup id if this is a lookup name
+
+
+def load_variants(conn: sqlite3.Connection, column: str) -> list[Variant]:
+    """Distinct non-NULL values of items.<column> with their row counts."""
+    variants = []
+    for value, rows in conn.execute(
+        f'SELECT "{column}", COUNT(*) FROM items WHERE "{column}" IS NOT NULL GROUP BY 1'
+    ):
+        key, uncertain = matching_key(str(value))
+        variants.append(Variant(str(value), rows, key, uncertain))
+    return variants
+
+
+def load_anchors(conn: sqlite3.Connection, lookup: str) -> list[Variant]:
+    """Greek and English names of a lookup table as cluster anchors."""
+    anchors = []
+    for lookup_id, name_el, name_en in conn.execute(f"SELECT id, name_el, name_en FROM {lookup}"):
+        for name in (name_el, name_en):
+            if name:
+                key, _ = matching_key(name)
+                anchors.append(Variant(name, 0, key, False, anchor_id=lookup_id))
+    return anchors
+
+
+def similar_pairs(keys: list[str], threshold: float) -> list[tuple[int, int, float]]:
+    """Pairs of keys (by position) sharing trigrams and scoring at least threshold."""
+    postings: dict[str, list[int]] = defaultdict(list)
+    for position, key in enumerate(keys):
+        for gram in trigrams(key):
+            postings[gram].append(position)
+
+    engine = SimilarityEngine(keys)
+    pairs = []
+    for position, key in enumerate(keys):
+        grams = trigrams(key)
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            block = postings[gram]
+            if len(block) <= MAX_BLOCK_SIZE:
+                shared.update(other for other in block if other > position)
+        # One shared trigram is mostly noise unless the key is very short
+        min_shared = 1 if len(grams) <= MIN_SHARED_TRIGRAMS else MIN_SHARED_TRIGRAMS
+        for other, count in shared.items():
+            if count < min_shared:
+                continue
+            score = engine.score(key, other, cutoff=threshold)
+            if score >= threshold:
+                pairs.append((position, other, score))
+    return pairs
+
+
+def cluster_variants(
+    variants: list[Variant], anchors: list[Variant], threshold: float = DEFAULT_THRESHOLD
+) -> dict:
+    """Group variants (and anchors) into clusters and propose a canonical for each variant.
+
+    Returns: {"clusters": [...], "unassigned": [...]} as written to the proposal JSON
+    """
+    nodes = [v for v in variants + anchors if v.key]
+    anchor_names: dict[int, str] = {}
+    for anchor in anchors:
+        anchor_names.setdefault(anchor.anchor_id, anchor.value)
+    keys = sorted({node.key for node in nodes})
+    key_position = {key: position for position, key in enumerate(keys)}
+
+    sets = UnionFind(len(keys))
+    for a, b, _ in similar_pairs(keys, threshold):
+        sets.union(a, b)
+
+    members: dict[int, list[Variant]] = defaultdict(list)
+    for node in nodes:
+        members[sets.find(key_position[node.key])].append(node)
+
+    # Cluster keys, so multi-word values can be matched by their words
+    cluster_by_key: dict[str, set[int]] = defaultdict(set)
+    for root, cluster in members.items():
+        if len({node.key for node in cluster}) > 1 or _has_anchor(cluster):
+            for node in cluster:
+                cluster_by_key[node.key].add(root)
+
+    # Clusters without a lookup name join the one cluster whose key is part of theirs
+    targets: dict[int, tuple[int, str]] = {}
+    unassigned = [
+        {"value": v.value, "rows": v.rows, "uncertain": v.uncertain, "candidates": []}
+        for v in variants
+        if not v.key
+    ]
+    for root, cluster in members.items():
+        if _has_anchor(cluster):
+            targets[root] = (root, "similar")
+            continue
+        matches = set()
+        for key in {node.key for node in cluster}:
+            matches |= _containing_clusters(key, cluster_by_key)
+        matches.discard(root)
+        if len(matches) > 1:
+            candidates = sorted(_canonical(members[match], anchor_names)[0] for match in matches)
+            unassigned.extend(
+                {
+                    "value": node.value,
+                    "rows": node.rows,
+                    "uncertain": node.uncertain,
+                    "candidates": candidates,
+                }
+                for node in cluster
+            )
+        elif matches:
+            targets[root] = (matches.pop(), "contains")
+        else:
+            targets[root] = (root, "similar")
+
+    assigned: dict[int, list[dict]] = defaultdict(list)
+    for root, (target, method) in targets.items():
+        # Follow containment chains to the cluster that keeps its own members
+        seen = {root}
+        while target not in seen and targets.get(target, (target,))[0] != target:
+            seen.add(target)
+            target = targets[target][0]
+        for node in members[root]:
+            if node.anchor_id is None:
+                assigned[target].append({"node": node, "method": method})
+
+    # Output clusters: one per lookup entry (several key clusters can map to it), else per root
+    groups: dict[tuple, dict] = {}
+    for root, entries in assigned.items():
+        cluster = members[root]
+        cluster_anchors = [node for node in cluster if node.anchor_id is not None]
+        for entry in entries:
+            node = entry["node"]
+            if cluster_anchors:
+                # Several lookup entries can share a cluster: take the nearest one
+                anchor = max(cluster_anchors, key=lambda a: similarity(node.key, a.key))
+                group_key = ("lookup", anchor.anchor_id)
+                canonical, canonical_id = anchor_names[anchor.anchor_id], anchor.anchor_id
+                reference_key = anchor.key
+            else:
+                group_key = ("values", root)
+                canonical, canonical_id = _canonical(cluster, anchor_names)
+                reference_key = matching_key(canonical)[0]
+            if entry["method"] == "contains":
+                confidence = CONTAINMENT_CONFIDENCE
+            else:
+                confidence = similarity(node.key, reference_key)
+            group = groups.setdefault(
+                group_key,
+                {"canonical": canonical, "canonical_id": canonical_id, "rows": 0, "variants": []},
+            )
+            group["rows"] += node.rows
+            group["variants"].append(
+                {
+                    "value": node.value,
+                    "rows": node.rows,
+                    "confidence": round(confidence, 3),
+                    "uncertain": node.uncertain,
+                    "method": "equal" if node.key == reference_key else entry["method"],
+                }
+            )
+
+    clusters = list(groups.values())
+    for cluster in clusters:
+        cluster["variants"].sort(key=lambda v: (-v["confidence"], -v["rows"]))
+    clusters.sort(key=lambda c: -c["rows"])
+    unassigned.sort(key=lambda v: -v["rows"])
+    return {"clusters": clusters, "unassigned": unassigned}
+
+
+def _has_anchor(cluster: list[Variant]) -> bool:
+    return any(node.anchor_id is not None for node in cluster)
+
+
+def _containing_clusters(key: str, cluster_by_key: dict[str, set[int]]) -> set[int]:
+    """Clusters with a key that is a shorter run of words of `key`."""
+    words = key.split()
+    phrases = {
+        " ".join(words[start:end])
+        for start in range(len(words))
+        for end in range(start + 1, len(words) + 1)
+        if end - start < len(words)
+    }
+    return set().union(*(cluster_by_key.get(phrase, set()) for phrase in phrases))
+
+
+def _canonical(cluster: list[Variant], anchor_names: dict[int, str]) -> tuple[str, int | None]:
+    """Display name and lookup id of a cluster: its lookup name, else its most frequent value."""
+    for node in cluster:
+        if node.anchor_id is not None:
+            return anchor_names[node.anchor_id], node.anchor_id
+    return max(cluster, key=lambda node: node.rows).value, None
+
+
+def main() -> None:
+    """Cluster one column and write the proposed mapping."""
+    parser = argparse.ArgumentParser(description="Propose canonical values for a column")
+    parser.add_argument("column", help="items column, e.g. dance_rhythm_raw")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database file")
+    parser.add_argument("--lookup", help="lookup table with id/name_el/name_en to map onto")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--output", type=Path, help="proposal JSON (default: analysis dir)")
+    args = parser.parse_args()
+
+    lookup = args.lookup or COLUMN_LOOKUPS.get(args.column)
+    output = args.output or OUTPUT_DIR / f"{args.column}_clusters.json"
+
+    conn = sqlite3.connect(args.db)
+    variants = load_variants(conn, args.column)
+    anchors = load_anchors(conn, lookup) if lookup else []
+    conn.close()
+
+    proposal = {
+        "column": args.column,
+        "lookup": lookup,
+        "threshold": args.threshold,
+        "distinct_values": len(variants),
+        **cluster_variants(variants, anchors, args.threshold),
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(proposal, f, ensure_ascii=False, indent=2)
+
+    print(f"{args.column}: {len(variants)} distinct values -> {len(proposal['clusters'])} clusters")
+    for cluster in proposal["clusters"]:
+        label = cluster["canonical"]
+        if cluster["canonical_id"] is not None:
+            label += f" (id {cluster['canonical_id']})"
+        print(f"\n{label} - {cluster['rows']} rows")
+        for variant in cluster["variants"]:
+            flag = " [uncertain]" if variant["uncertain"] else ""
+            print(
+                f"  {variant['confidence']:.2f} {variant['method']:8s} "
+                f"{variant['rows']:5d} | {variant['value']}{flag}"
+            )
+    if proposal["unassigned"]:
+        print("\nNEEDS REVIEW:")
+        for variant in proposal["unassigned"]:
+            candidates = ", ".join(variant["candidates"]) or "no matching key"
+            print(f"  {variant['rows']:5d} | {variant['value']}  ({candidates})")
+    print(f"\nProposal saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Set-based normalization of free-text columns to lookup IDs.
+
+A variant -> canonical mapping is loaded into a temp table and applied to
+items with a single join-based UPDATE ... FROM, so normalizing a column costs
+one pass over the table however many variants the mapping has, instead of
+one UPDATE (and table scan) per variant. Run it inside fts_bulk_write() so
+the items_fts sync triggers do not rewrite an index row per updated item.
+
+Usage:
+    with fts_bulk_write(conn, rebuild=False):
+        result = normalize_column(
+            conn, "dance_rhythm", {"Ζεϊμπέκικος": 1, "Φοξ τροτ": 12}, ["rhythm_type_id"],
+            commit=False,
+        )
+
+Several target columns are written at once by mapping variants to tuples:
+    normalize_column(
+        conn, "recording_place", {"Αθήνα (;)": (1, True)},
+        ["recording_place_id", "recording_place_uncertain"],
+    )
+
+A mapping proposed by tools/cluster_variants.py (after review) is loaded with
+load_proposed_mapping():
+    mapping = load_proposed_mapping(path, uncertain_flag=True)
+    normalize_column(conn, "recording_place_raw", mapping,
+                     ["recording_place_id", "recording_place_uncertain"])
+"""
+
+import json
+import sqlite3
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+MAPPING_TABLE = "temp.normalize_mapping"
+DEFAULT_MIN_CONFIDENCE = 0.7
+
+
+@dataclass
+class NormalizeResult:
+    """Outcome of one normalize_column() call."""
+
+    column: str
+    matched_rows: int = 0  # rows whose value was in the mapping (and were updated)
+    unmatched_rows: int = 0  # rows with a non-NULL value missing from the mapping
+    unmatched_values: dict[str, int] = field(default_factory=dict)  # variant -> rows
+    unused_variants: list[str] = field(default_factory=list)  # mapping entries matching no row
+
+    def summary(self) -> str:
+        """One-line report, e.g. for migration output."""
+        return (
+            f"{self.column}: {self.matched_rows} rows normalized, "
+            f"{self.unmatched_rows} rows ({len(self.unmatched_values)} values) unmatched"
+        )
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def normalize_column(
+    conn: sqlite3.Connection,
+    source: str,
+    mapping: Mapping[str, object],
+    targets: Sequence[str],
+    table: str = "items",
+    commit: bool = True,
+) -> NormalizeResult:
+    """Set target columns from the mapping entry of each row's source value.
+
+    Args:
+        conn: sqlite3 connection to the database
+        source: Column holding the free-text variants
+        mapping: {variant: value} for one target, or {variant: (value, ...)}
+            with one value per target column
+        targets: Columns to write (e.g. a lookup ID and an uncertainty flag)
+        table: Table to normalize
+        commit: Commit the update as one transaction (roll back on error).
+            Pass False to leave transaction control to the caller (e.g. fts_bulk_write).
+
+    Returns: matched and unmatched row counts
+    """
+    rows = []
+    for variant, values in mapping.items():
+        values = values if isinstance(values, tuple) else (values,)
+        if len(values) != len(targets):
+            raise ValueError(
+                f"Mapping for {variant!r} has {len(values)} values, expected {len(targets)}"
+            )
+        rows.append((variant, *values))
+
+    value_columns = [f"v{i}" for i in range(len(targets))]
+    source_sql = f"{_quote(table)}.{_quote(source)}"
+    assignments = ", ".join(
+        f"{_quote(target)} = m.{column}"
+        for target, column in zip(targets, value_columns, strict=True)
+    )
+
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS {MAPPING_TABLE}")
+        conn.execute(
+            f"CREATE TABLE {MAPPING_TABLE} (variant TEXT PRIMARY KEY, {', '.join(value_columns)})"
+        )
+        placeholders = ", ".join("?" * (len(targets) + 1))
+        conn.executemany(f"INSERT INTO {MAPPING_TABLE} VALUES ({placeholders})", rows)
+
+        # Rows per distinct source value, for the matched/unmatched report
+        census = dict(
+            conn.execute(
+                f"SELECT {_quote(source)}, COUNT(*) FROM {_quote(table)} "
+                f"WHERE {_quote(source)} IS NOT NULL GROUP BY {_quote(source)}"
+            )
+        )
+
+        cursor = conn.execute(
+            f"UPDATE {_quote(table)} SET {assignments} "
+            f"FROM {MAPPING_TABLE} AS m WHERE {source_sql} = m.variant"
+        )
+        matched = cursor.rowcount
+        conn.execute(f"DROP TABLE {MAPPING_TABLE}")
+    except BaseException:
+        if commit:
+            conn.rollback()
+        raise
+    if commit:
+        conn.commit()
+
+    unmatched = {value: count for value, count in census.items() if value not in mapping}
+    return NormalizeResult(
+        column=source,
+        matched_rows=matched,
+        unmatched_rows=sum(unmatched.values()),
+        unmatched_values=dict(sorted(unmatched.items(), key=lambda kv: -kv[1])),
+        unused_variants=[variant for variant in mapping if variant not in census],
+    )
+
+
+def load_proposed_mapping(
+    path: Path, min_confidence: float = DEFAULT_MIN_CONFIDENCE, uncertain_flag: bool = False
+) -> dict[str, object]:
+    """Variant mapping from a cluster_variants.py proposal, for normalize_column().
+
+    Variants map to their cluster's lookup id, or to the canonical value when
+    the proposal has no lookup table. Clusters with a lookup but no matching
+    entry, and variants below min_confidence, are left out.
+
+    Args:
+        path: Proposal JSON written by cluster_variants.py
+        min_confidence: Lowest variant confidence to include
+        uncertain_flag: Map to (value, uncertain) pairs for a second target
+            column, with 1 for uncertain variants and NULL otherwise
+
+    Returns: {variant: value} or {variant: (value, uncertain)}
+    """
+    with open(path, encoding="utf-8") as f:
+        proposal = json.load(f)
+
+    mapping: dict[str, object] = {}
+    for cluster in proposal["clusters"]:
+        if proposal.get("lookup"):
+            target = cluster["canonical_id"]
+            if target is None:
+                continue
+        else:
+            target = cluster["canonical"]
+        for variant in cluster["variants"]:
+            if variant["confidence"] < min_confidence:
+                continue
+            if uncertain_flag:
+                mapping[variant["value"]] = (target, 1 if variant["uncertain"] else None)
+            else:
+                mapping[variant["value"]] = target
+    return mapping
@@ -0,0 +1,98 @@
+"""Promote metadata_json keys to indexed columns with SQLite's JSON1 functions.
+
+promote_metadata_key() adds a column computed from one metadata_json key and
+indexes it, entirely in SQL:
+
+- "virtual" (default): a VIRTUAL generated column. Adding it rewrites no rows
+  and it always follows later edits of metadata_json; only the index is
+  materialized, built in one CREATE INDEX.
+- "stored": a plain column filled by one UPDATE ... json_extract(), for keys
+  that should be edited independently of metadata_json afterwards (SQLite
+  cannot add STORED generated columns to an existing table).
+
+Either way a lookup on the key becomes an index seek instead of parsing every
+row's JSON. Rows with malformed metadata_json get NULL, and empty values are
+NULL like in d5b976a1f66e.
+
+Usage (the caller commits):
+    promote_metadata_key(conn, "Εταιρεία δίσκου", "record_label")
+    conn.commit()
+
+Migrations do not import it: print the statements it runs (or
+metadata_expression()) and freeze them in the revision, as 5c1e7a9d2f43 does.
+"""
+
+import sqlite3
+
+MODES = ("virtual", "stored")
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def metadata_expression(key: str, source: str = "metadata_json") -> str:
+    """SQL expression for a metadata_json key's value (NULL if missing, empty or malformed).
+
+    The JSON path is inlined because generated column definitions cannot take
+    bound parameters.
+    """
+    if '"' in key or "\\" in key:
+        raise ValueError(f"Unsupported character in metadata key {key!r}")
+    path = "'$.\"" + key.replace("'", "''") + "\"'"
+    source = _quote(source)
+    return f"CASE WHEN json_valid({source}) THEN NULLIF(json_extract({source}, {path}), '') END"
+
+
+def index_name(column: str, table: str = "items") -> str:
+    """Name of the index created for a promoted column."""
+    return f"ix_{table}_{column}"
+
+
+def promote_metadata_key(
+    conn: sqlite3.Connection,
+    key: str,
+    column: str,
+    mode: str = "virtual",
+    column_type: str = "TEXT",
+    table: str = "items",
+) -> int | None:
+    """Add an indexed column holding the value of one metadata_json key.
+
+    Args:
+        conn: sqlite3 connection (the caller commits)
+        key: metadata_json key, e.g. "Εταιρεία δίσκου"
+        column: New column name
+        mode: "virtual" (generated column) or "stored" (filled once by UPDATE)
+        column_type: Declared SQL type of the column
+        table: Table holding metadata_json
+
+    Returns: rows filled in "stored" mode, None in "virtual" mode
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}, not {mode!r}")
+    expression = metadata_expression(key)
+
+    filled = None
+    if mode == "virtual":
+        conn.execute(
+            f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} {column_type} "
+            f"GENERATED ALWAYS AS ({expression}) VIRTUAL"
+        )
+    else:
+        conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} {column_type}")
+        # Skip rows without the key, so they are not rewritten (or re-indexed by triggers)
+        filled = conn.execute(
+            f"UPDATE {_quote(table)} SET {_quote(column)} = {expression} "
+            f"WHERE {expression} IS NOT NULL"
+        ).rowcount
+    conn.execute(
+        f"CREATE INDEX {_quote(index_name(column, table))} ON {_quote(table)} ({_quote(column)})"
+    )
+    return filled
+
+
+def demote_metadata_key(conn: sqlite3.Connection, column: str, table: str = "items") -> None:
+    """Drop a promoted column and its index (the value stays in metadata_json)."""
+    conn.execute(f"DROP INDEX IF EXISTS {_quote(index_name(column, table))}")
+    conn.execute(f"ALTER TABLE {_quote(table)} DROP COLUMN {_quote(column)}")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Incremental, page-level snapshots of the SQLite database.
+
+Each snapshot is a manifest listing the content hash of every database page.
+Pages are stored once, zlib-compressed and content-addressed, so a snapshot
+only writes the pages that changed since any kept generation. The last N
+generations are kept and any of them can be restored.
+
+The database file is read while holding a read transaction, so no writer can
+commit (rollback journal) or checkpoint into it (WAL, after a truncating
+checkpoint) mid-snapshot.
+
+Usage:
+    python tools/db_snapshot.py create [--label TEXT] [--keep N]
+    python tools/db_snapshot.py list
+    python tools/db_snapshot.py restore GENERATION
+
+From other tools, as a cheap pre-write checkpoint:
+    from db_snapshot import take_snapshot
+    take_snapshot(db_path, label="import_lyrics")
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent.parent / "database" / "vmrebetiko_all_genres.db"
+DEFAULT_KEEP = 5
+
+
+@dataclass
+class Snapshot:
+    """One snapshot generation (the manifest without its page list)."""
+
+    generation: int
+    created_at: str
+    label: str
+    page_size: int
+    page_count: int
+    new_pages: int
+
+
+def snapshot_dir(db_path: Path) -> Path:
+    """Snapshot store of a database: database/snapshots/<db name>/."""
+    return db_path.parent / "snapshots" / db_path.stem
+
+
+def _page_path(store: Path, digest: str) -> Path:
+    return store / "pages" / digest[:2] / digest
+
+
+def _manifest_paths(store: Path) -> list[Path]:
+    manifests = store / "manifests"
+    if not manifests.exists():
+        return []
+    return sorted(manifests.glob("*.json"))
+
+
+def _load_manifest(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def list_snapshots(db_path: Path = DB_PATH) -> list[Snapshot]:
+    """All kept generations, oldest first."""
+    snapshots = []
+    for path in _manifest_paths(snapshot_dir(db_path)):
+        manifest = _load_manifest(path)
+        manifest.pop("pages")
+        snapshots.append(Snapshot(**manifest))
+    return snapshots
+
+
+def take_snapshot(db_path: Path = DB_PATH, label: str = "", keep: int = DEFAULT_KEEP) -> Snapshot:
+    """Snapshot the database, storing only pages not already in the store.
+
+    Raises: ValueError if keep < 1 (the new snapshot would be pruned at once)
+    """
+    _check_keep(keep)
+    store = snapshot_dir(db_path)
+    (store / "manifests").mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            # Move committed WAL frames into the file we are about to read
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        conn.execute("BEGIN")
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # take the read lock
+
+        pages = []
+        new_pages = 0
+        # Closing this descriptor drops the process's POSIX locks on the file,
+        # which is harmless here because it only happens after the last read
+        with open(db_path, "rb") as f:
+            while page := f.read(page_size):
+                digest = hashlib.blake2b(page, digest_size=16).hexdigest()
+                pages.append(digest)
+                page_file = _page_path(store, digest)
+                if not page_file.exists():
+                    page_file.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_file = page_file.with_suffix(".tmp")
+                    tmp_file.write_bytes(zlib.compress(page, 1))
+                    os.replace(tmp_file, page_file)
+                    new_pages += 1
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    existing = _manifest_paths(store)
+    generation = int(existing[-1].stem) + 1 if existing else 1
+    snapshot = Snapshot(
+        generation=generation,
+        created_at=datetime.now().isoformat(timespec="seconds"),
+        label=label,
+        page_size=page_size,
+        page_count=len(pages),
+        new_pages=new_pages,
+    )
+    with open(store / "manifests" / f"{generation:06d}.json", "w") as f:
+        json.dump({**asdict(snapshot), "pages": pages}, f)
+
+    prune_snapshots(db_path, keep)
+    return snapshot
+
+
+def _check_keep(keep: int) -> None:
+    if keep < 1:
+        raise ValueError(f"keep must be at least 1, got {keep}")
+
+
+def prune_snapshots(db_path: Path = DB_PATH, keep: int = DEFAULT_KEEP) -> int:
+    """Drop all but the newest `keep` generations and their unreferenced pages.
+
+    Returns: number of page files removed
+    Raises: ValueError if keep < 1
+    """
+    _check_keep(keep)
+    store = snapshot_dir(db_path)
+    manifests = _manifest_paths(store)
+    for path in manifests[:-keep]:
+        path.unlink()
+
+    referenced = set()
+    for path in _manifest_paths(store):
+        referenced.update(_load_manifest(path)["pages"])
+
+    removed = 0
+    for page_file in (store / "pages").glob("*/*"):
+        if page_file.name not in referenced:
+            page_file.unlink()
+            removed += 1
+    return removed
+
+
+def restore_snapshot(generation: int, db_path: Path = DB_PATH) -> Snapshot:
+    """Rebuild the database file from a kept generation.
+
+    No other connection may be open on the database while restoring.
+    """
+    store = snapshot_dir(db_path)
+    manifest_file = store / "manifests" / f"{generation:06d}.json"
+    if not manifest_file.exists():
+        raise FileNotFoundError(f"No snapshot generation {generation} in {store}")
+    manifest = _load_manifest(manifest_file)
+
+    tmp_path = db_path.with_name(db_path.name + ".restore")
+    with open(tmp_path, "wb") as f:
+        for digest in manifest["pages"]:
+            f.write(zlib.decompress(_page_path(store, digest).read_bytes()))
+        f.flush()
+        os.fsync(f.fileno())
+
+    # A leftover WAL belongs to the current file, not to the restored one
+    for suffix in ("-wal", "-shm", "-journal"):
+        db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+    os.replace(tmp_path, db_path)
+
+    manifest.pop("pages")
+    return Snapshot(**manifest)
+
+
+def _keep_argument(text: str) -> int:
+    keep = int(text)
+    try:
+        _check_keep(keep)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    return keep
+
+
+def main() -> None:
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Incremental database snapshots")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="take a snapshot")
+    create.add_argument("--label", default="", help="free-text note stored with the snapshot")
+    create.add_argument(
+        "--keep", type=_keep_argument, default=DEFAULT_KEEP, help="generations to keep"
+    )
+
+    commands.add_parser("list", help="list kept snapshots")
+
+    restore = commands.add_parser("restore", help="restore a snapshot")
+    restore.add_argument("generation", type=int)
+
+    args = parser.parse_args()
+
+    if args.command == "create":
+        snapshot = take_snapshot(args.db, label=args.label, keep=args.keep)
+        print(
+            f"Snapshot {snapshot.generation} created: {snapshot.page_count} pages, "
+            f"{snapshot.new_pages} new"
+        )
+    elif args.command == "list":
+        for snapshot in list_snapshots(args.db):
+            print(
+                f"{snapshot.generation:6d}  {snapshot.created_at}  "
+                f"{snapshot.page_count * snapshot.page_size / 1_048_576:8.1f} MB  {snapshot.label}"
+            )
+    else:
+        snapshot = restore_snapshot(args.generation, args.db)
+        print(f"Restored snapshot {snapshot.generation} ({snapshot.created_at}) to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
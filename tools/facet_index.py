@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""Bitmap facet index for multi-criteria browsing of the items table.
+
+Every facet value (a genre, rhythm type, recording place, recording year or
+composer) has one bitmap over item rowids, kept as a Python int (bit N set =
+item with rowid N has the value). A compound question such as "rebetiko,
+zeibekiko, recorded in Athens 1932-1936" is then an OR of bitmaps within each
+facet and an AND across facets, and per-facet counts of a selection are
+popcounts, all without touching the database.
+
+The index is persisted zlib-compressed to database/cache/facet_index.bin
+together with each row's facet values. refresh() reads the current facet
+values in one pass and only rewrites the bitmaps of rows that were added,
+changed or removed since the index was saved. open_index() skips even that
+pass while the _table_versions stamps of items and item_genres (see
+analysis_cache.py) and the schema version are those saved with the index.
+
+Usage:
+    python tools/facet_index.py build
+    python tools/facet_index.py query --genre rebetiko --rhythm Ζεϊμπέκικος \\
+        --place Athens --years 1932-1936
+    python tools/facet_index.py counts year --genre rebetiko
+
+From other tools:
+    index = open_index(conn)
+    selection = index.select(genre="rebetiko", year=range(1932, 1937))
+    index.counts("rhythm", within=selection)
+    fetch_items(conn, selection, ["id", "title"])
+
+Only depends on the standard library.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+from analysis_cache import table_versions
+from field_parsers import parse_recording_date
+
+DB_PATH = Path(__file__).parent.parent / "database" / "vmrebetiko_all_genres.db"
+INDEX_FILE = Path(__file__).parent.parent / "database" / "cache" / "facet_index.bin"
+INDEX_VERSION = 1
+
+FACETS = ("genre", "rhythm", "place", "year", "composer")
+FACET_TABLES = ("items", "item_genres")  # tables read by read_facet_values()
+
+# Lookup table holding the display names of facets keyed by id
+LOOKUP_TABLES = {"genre": "genres", "rhythm": "rhythm_types", "place": "recording_places"}
+
+Value = int | str
+FacetValues = tuple[tuple[Value, ...], ...]  # per facet, in FACETS order
+
+
+def recording_year(recording_date: str | None) -> int | None:
+    """Year of a free-text recording date, as field_parsers derives recording_year."""
+    try:
+        date = parse_recording_date(recording_date)
+    except ValueError:
+        return None
+    return date.year if date else None
+
+
+def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def read_facet_values(conn: sqlite3.Connection) -> dict[int, tuple[str, FacetValues]]:
+    """Current facet values of every item, as {rowid: (item id, values per facet)}."""
+    if _table_exists(conn, "item_genres"):
+        genres_sql = (
+            "(SELECT group_concat(genre_id, char(31)) FROM item_genres WHERE item_id = items.id)"
+        )
+    else:
+        genres_sql = "NULL"
+    # Parsed year from migration 8e4b6d0a3c75, else parsed here the same way
+    parsed_year = _column_exists(conn, "items", "recording_year")
+    year_sql = "recording_year" if parsed_year else "recording_date"
+    cursor = conn.execute(
+        f"SELECT rowid, id, {genres_sql}, rhythm_type_id, recording_place_id, "
+        f"{year_sql}, creator_composer FROM items"
+    )
+
+    rows = {}
+    for rowid, item_id, genres, rhythm, place, date, composer in cursor:
+        year = date if parsed_year else recording_year(date)
+        composer = composer.strip() if composer else None
+        values = (
+            tuple(sorted(genres.split("\x1f"))) if genres else (),
+            (rhythm,) if rhythm is not None else (),
+            (place,) if place is not None else (),
+            (year,) if year is not None else (),
+            (composer,) if composer else (),
+        )
+        rows[rowid] = (item_id, values)
+    return rows
+
+
+def database_stamp(conn: sqlite3.Connection) -> list[int] | None:
+    """Schema version and change stamps of FACET_TABLES, None if any table is untracked."""
+    versions = table_versions(conn) or {}
+    if not all(table in versions for table in FACET_TABLES):
+        return None
+    schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+    return [schema_version, *(versions[table] for table in FACET_TABLES)]
+
+
+def iter_rowids(bitmap: int) -> Iterator[int]:
+    """Rowids whose bits are set, in ascending order."""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+@dataclass
+class RefreshStats:
+    """Rows whose bitmaps were updated by FacetIndex.refresh()."""
+
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.added + self.changed + self.removed
+
+
+class FacetIndex:
+    """One bitmap per facet value over item rowids."""
+
+    def __init__(self):
+        self.bitmaps: dict[str, dict[Value, int]] = {facet: {} for facet in FACETS}
+        self.rows: dict[int, tuple[str, FacetValues]] = {}
+        self.universe = 0  # bits of all indexed items
+        self.stamp: list[int] | None = None  # database_stamp() the rows were read at
+
+    @classmethod
+    def build(cls, conn: sqlite3.Connection) -> "FacetIndex":
+        """Index every item from scratch."""
+        index = cls()
+        index.refresh(conn)
+        return index
+
+    def _set_row(self, rowid: int, values: FacetValues, present: bool) -> None:
+        bit = 1 << rowid
+        for facet, facet_values in zip(FACETS, values, strict=True):
+            bitmaps = self.bitmaps[facet]
+            for value in facet_values:
+                if present:
+                    bitmaps[value] = bitmaps.get(value, 0) | bit
+                else:
+                    remaining = bitmaps[value] & ~bit
+                    if remaining:
+                        bitmaps[value] = remaining
+                    else:
+                        del bitmaps[value]
+        if present:
+            self.universe |= bit
+        else:
+            self.universe &= ~bit
+
+    def refresh(self, conn: sqlite3.Connection) -> RefreshStats:
+        """Bring the index in line with the database, touching only changed rows."""
+        # Taken before reading, so a concurrent write leaves an older stamp
+        stamp = database_stamp(conn)
+        current = read_facet_values(conn)
+        stats = RefreshStats()
+
+        for rowid in self.rows.keys() - current.keys():
+            self._set_row(rowid, self.rows.pop(rowid)[1], present=False)
+            stats.removed += 1
+        for rowid, row in current.items():
+            old = self.rows.get(rowid)
+            if old == row:
+                continue
+            if old is None:
+                stats.added += 1
+            else:
+                # Values changed, or VACUUM gave the rowid to another item
+                self._set_row(rowid, old[1], present=False)
+                stats.changed += 1
+            self._set_row(rowid, row[1], present=True)
+            self.rows[rowid] = row
+        self.stamp = stamp
+        return stats
+
+    def bitmap(self, facet: str, values: Value | Iterable[Value]) -> int:
+        """Items having any of the given values of a facet."""
+        if facet not in self.bitmaps:
+            raise ValueError(f"Unknown facet {facet!r} (expected one of {', '.join(FACETS)})")
+        if isinstance(values, int | str):
+            values = (values,)
+        bitmaps = self.bitmaps[facet]
+        result = 0
+        for value in values:
+            result |= bitmaps.get(value, 0)
+        return result
+
+    def select(self, **criteria: Value | Iterable[Value] | None) -> int:
+        """Items matching all criteria; several values of one facet match any of them.
+
+        Example: select(genre="rebetiko", rhythm=[1, 2], year=range(1932, 1937))
+        """
+        result = self.universe
+        for facet, values in criteria.items():
+            if values is not None:
+                result &= self.bitmap(facet, values)
+        return result
+
+    def counts(self, facet: str, within: int | None = None) -> dict[Value, int]:
+        """Number of items per value of a facet, optionally within a selection."""
+        if facet not in self.bitmaps:
+            raise ValueError(f"Unknown facet {facet!r} (expected one of {', '.join(FACETS)})")
+        counts = {}
+        for value, bitmap in self.bitmaps[facet].items():
+            count = (bitmap if within is None else bitmap & within).bit_count()
+            if count:
+                counts[value] = count
+        return counts
+
+    def item_ids(self, bitmap: int) -> list[str]:
+        """Item IDs of a selection, in rowid order."""
+        return [self.rows[rowid][0] for rowid in iter_rowids(bitmap)]
+
+    def save(self, path: Path = INDEX_FILE) -> None:
+        """Write the index zlib-compressed, replacing the file atomically."""
+        data = {
+            "version": INDEX_VERSION,
+            "stamp": self.stamp,
+            "rows": [[rowid, item_id, values] for rowid, (item_id, values) in self.rows.items()],
+            "bitmaps": {
+                facet: [[value, format(bitmap, "x")] for value, bitmap in bitmaps.items()]
+                for facet, bitmaps in self.bitmaps.items()
+            },
+        }
+        payload = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), 6)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_FILE) -> "FacetIndex | None":
+        """Index saved by save(), or None if missing, unreadable or of another version."""
+        try:
+            data = json.loads(zlib.decompress(path.read_bytes()))
+        except (OSError, zlib.error, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+
+        index = cls()
+        index.stamp = data.get("stamp")
+        for rowid, item_id, values in data["rows"]:
+            index.rows[rowid] = (item_id, tuple(tuple(v) for v in values))
+            index.universe |= 1 << rowid
+        for facet, bitmaps in data["bitmaps"].items():
+            index.bitmaps[facet] = {value: int(bitmap, 16) for value, bitmap in bitmaps}
+        return index
+
+
+def open_index(conn: sqlite3.Connection, path: Path = INDEX_FILE, save: bool = True) -> FacetIndex:
+    """Load the saved index, refresh it against the database and save it if it changed.
+
+    The refresh is skipped when the database stamp is the one saved with the index.
+    """
+    index = FacetIndex.load(path)
+    if index is None:
+        index = FacetIndex.build(conn)
+        changed = True
+    elif index.stamp is not None and index.stamp == database_stamp(conn):
+        changed = False
+    else:
+        saved_stamp = index.stamp
+        changed = index.refresh(conn).total > 0 or index.stamp != saved_stamp
+    if save and changed:
+        index.save(path)
+    return index
+
+
+def facet_labels(conn: sqlite3.Connection, facet: str) -> dict[Value, str]:
+    """Display names of a facet's values (Greek name from its lookup table)."""
+    table = LOOKUP_TABLES.get(facet)
+    if table is None or not _table_exists(conn, table):
+        return {}
+    return dict(conn.execute(f"SELECT id, name_el FROM {table}"))
+
+
+def resolve_value(conn: sqlite3.Connection, facet: str, name: str) -> Value:
+    """Facet value for a command-line name: lookup ids by Greek or English name."""
+    if facet == "year":
+        return int(name)
+    table = LOOKUP_TABLES.get(facet)
+    if table is None:
+        return name
+    row = conn.execute(
+        f"SELECT id FROM {table} WHERE id = ? OR name_el = ? OR lower(name_en) = lower(?)",
+        (name, name, name),
+    ).fetchone()
+    if row is None:
+        raise ValueError(f"No {facet} named {name!r} in {table}")
+    return row[0]
+
+
+def fetch_items(
+    conn: sqlite3.Connection,
+    bitmap: int,
+    columns: Iterable[str] = ("id", "title"),
+    limit: int | None = None,
+) -> list[tuple]:
+    """Rows of the selected items from the items table, in rowid order."""
+    rowids = json.dumps(list(islice(iter_rowids(bitmap), limit)))
+    return conn.execute(
+        f"SELECT {', '.join(columns)} FROM items "
+        "WHERE rowid IN (SELECT value FROM json_each(?)) ORDER BY rowid",
+        (rowids,),
+    ).fetchall()
+
+
+def parse_years(text: str) -> range:
+    """'1932-1936' or '1932' as an inclusive range of years."""
+    first, _, last = text.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+def main() -> None:
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Bitmap facet index over items")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database file")
+    parser.add_argument("--index", type=Path, default=INDEX_FILE, help="index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("build", help="rebuild the index from scratch")
+
+    query = commands.add_parser("query", help="list items matching all given facets")
+    counts = commands.add_parser("counts", help="item counts per value of a facet")
+    counts.add_argument("facet", choices=FACETS)
+    for command in (query, counts):
+        command.add_argument("--genre", action="append", help="genre id (repeat for any of)")
+        command.add_argument("--rhythm", action="append", help="rhythm type (name or id)")
+        command.add_argument("--place", action="append", help="recording place (name or id)")
+        command.add_argument("--composer", action="append", help="creator/composer")
+        command.add_argument("--years", type=parse_years, help="year or range, e.g. 1932-1936")
+    query.add_argument("--limit", type=int, default=20, help="items to list")
+
+    args = parser.parse_args()
+    conn = sqlite3.connect(args.db)
+
+    if args.command == "build":
+        index = FacetIndex.build(conn)
+        index.save(args.index)
+        print(f"Indexed {len(index.rows)} items -> {args.index}")
+        for facet in FACETS:
+            print(f"  {facet:10s} {len(index.bitmaps[facet]):6d} values")
+        conn.close()
+        return
+
+    index = open_index(conn, args.index)
+    try:
+        criteria = {
+            facet: [resolve_value(conn, facet, name) for name in names]
+            for facet, names in (
+                ("genre", args.genre),
+                ("rhythm", args.rhythm),
+                ("place", args.place),
+                ("composer", args.composer),
+            )
+            if names
+        }
+    except ValueError as e:
+        conn.close()
+        sys.exit(f"Error: {e}")
+    if args.years:
+        criteria["year"] = args.years
+    selection = index.select(**criteria)
+
+    if args.command == "counts":
+        labels = facet_labels(conn, args.facet)
+        ordered = sorted(index.counts(args.facet, selection).items(), key=lambda kv: -kv[1])
+        for value, count in ordered:
+            print(f"{count:6d}  {labels.get(value, value)}")
+    else:
+        matched = selection.bit_count()
+        print(f"{matched} items match")
+        for item_id, title in fetch_items(conn, selection, limit=args.limit):
+            print(f"  {item_id:>8s}  {title}")
+        if matched > args.limit:
+            print(f"  ... {matched - args.limit} more")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
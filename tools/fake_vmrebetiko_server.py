@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Local stand-in for vmrebetiko.gr's filtered search, for offline scraper runs.
+
+Serves synthetic /search/?fmid=f&pg=N&g=GENRE pages with the site's gallery
+markup (eael-filterable-gallery-item-wrap items linking to /item?id=...) and
+pagination links, PAGE_SIZE items per page. Latency, server errors and 429
+rate-limit responses (with Retry-After) can be injected to exercise the
+scraper's throughput and failure handling.
+
+Usage:
+    python tools/fake_vmrebetiko_server.py --port 8765 --latency 80 --error-rate 0.02
+    python tools/scrape_genre_mappings_correct.py --search-url http://127.0.0.1:8765/search/
+
+From other tools:
+    server = start_server(FakeSiteConfig(latency_ms=50))
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from scrape_genre_mappings_correct import GENRES
+
+PAGE_SIZE = 40
+ITEM_ID_START = 2000
+
+
+def default_item_counts() -> dict[str, int]:
+    """Deterministic item counts per genre name, from a few to a thousand."""
+    rng = random.Random(0)
+    return {name: rng.choice([0, 3, 40, 57, 120, 250, 1000]) for name in GENRES.values()}
+
+
+@dataclass
+class FakeSiteConfig:
+    """Content and misbehaviour of the fake site."""
+
+    item_counts: dict[str, int] = field(default_factory=default_item_counts)
+    latency_ms: float = 0.0  # mean response delay
+    jitter_ms: float = 0.0  # uniform +/- around the mean
+    error_rate: float = 0.0  # share of requests answered 500/502/503
+    throttle_rate: float = 0.0  # share of requests answered 429
+    retry_after: float = 1.0  # Retry-After seconds sent with 429 (and 503)
+    max_concurrency: int = 0  # > 0: answer 429 above this many requests in flight
+    pagination_window: int = 2  # pages linked either side of the current one; -1: none
+    seed: int = 0
+
+
+def genre_item_ids(genre_name: str, count: int) -> list[str]:
+    """Item IDs of a genre; genres overlap since all start from the same range."""
+    offset = int(hashlib.md5(genre_name.encode()).hexdigest()[:4], 16) % 500
+    return [str(ITEM_ID_START + offset + i * 3) for i in range(count)]
+
+
+def render_search_page(genre_name: str, page_num: int, config: FakeSiteConfig) -> str:
+    """HTML of one filtered search page."""
+    ids = genre_item_ids(genre_name, config.item_counts.get(genre_name, 0))
+    page_ids = ids[page_num * PAGE_SIZE : (page_num + 1) * PAGE_SIZE]
+    last_page = max(0, (len(ids) - 1) // PAGE_SIZE)
+
+    parts = [
+        "<!DOCTYPE html><html lang='el'><head><meta charset='utf-8'>",
+        f"<title>Αναζήτηση – {genre_name}</title></head><body>",
+        "<div class='elementor-widget-container'><div class='eael-filter-gallery-container'>",
+    ]
+    for item_id in page_ids:
+        parts.append(
+            "<div class='eael-filterable-gallery-item-wrap eael-cf-genre'>"
+            "<div class='eael-gallery-grid-item'>"
+            f"<div class='gallery-item-thumbnail-wrap'><img src='/img/{item_id}.jpg' alt=''></div>"
+            "<div class='gallery-item-caption-wrap'>"
+            f"<h5 class='fg-item-title'><a href='https://vmrebetiko.gr/item?id={item_id}'>"
+            f"Τραγούδι {item_id}</a></h5>"
+            f"<div class='fg-item-content'><p>{genre_name}</p></div>"
+            "</div></div></div>"
+        )
+    parts.append("</div></div>")
+
+    if config.pagination_window >= 0 and last_page > 0:
+        first = max(0, page_num - config.pagination_window)
+        last = min(last_page, page_num + config.pagination_window)
+        parts.append("<nav class='pagination'>")
+        for pg in range(first, last + 1):
+            parts.append(
+                f"<a href='/search/?fmid=f&amp;pg={pg}&amp;g={quote(genre_name)}'>{pg + 1}</a>"
+            )
+        parts.append("</nav>")
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+class FakeSiteServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the site config and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: FakeSiteConfig):
+        super().__init__(address, FakeSiteHandler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.counts: dict[str, int] = {
+            "requests": 0,
+            "ok": 0,
+            "not_modified": 0,
+            "throttled": 0,
+            "errors": 0,
+        }
+
+    @property
+    def search_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/search/"
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] += 1
+
+
+class FakeSiteHandler(BaseHTTPRequestHandler):
+    """Answers /search/ requests according to the server's FakeSiteConfig."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    server: FakeSiteServer
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+        pass
+
+    def do_GET(self) -> None:
+        server = self.server
+        config = server.config
+        with server.lock:
+            server.counts["requests"] += 1
+            server.in_flight += 1
+            in_flight = server.in_flight
+            roll = server.rng.random()
+            delay = config.latency_ms + server.rng.uniform(-config.jitter_ms, config.jitter_ms)
+        try:
+            time.sleep(max(0.0, delay) / 1000)
+
+            url = urlsplit(self.path)
+            if url.path.rstrip("/") != "/search":
+                self._send(404, "<html><body>Not found</body></html>")
+                return
+
+            overloaded = config.max_concurrency and in_flight > config.max_concurrency
+            if overloaded or roll < config.throttle_rate:
+                server.count("throttled")
+                self._send(429, "Too Many Requests", {"Retry-After": f"{config.retry_after:g}"})
+                return
+            if roll < config.throttle_rate + config.error_rate:
+                server.count("errors")
+                status = server.rng.choice([500, 502, 503])
+                headers = {"Retry-After": f"{config.retry_after:g}"} if status == 503 else {}
+                self._send(status, "Server error", headers)
+                return
+
+            query = parse_qs(url.query)
+            page_num = int(query.get("pg", ["0"])[0])
+            genre_name = query.get("g", [""])[0]
+            body = render_search_page(genre_name, page_num, config)
+
+            etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                server.count("not_modified")
+                self._send(304, None, {"ETag": etag})
+                return
+            server.count("ok")
+            self._send(200, body, {"ETag": etag})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status: int, body: str | None, headers: dict[str, str] | None = None) -> None:
+        data = body.encode("utf-8") if body else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+
+def start_server(
+    config: FakeSiteConfig | None = None, host: str = "127.0.0.1", port: int = 0
+) -> FakeSiteServer:
+    """Serve the fake site from a background thread (port 0 picks a free port)."""
+    server = FakeSiteServer((host, port), config or FakeSiteConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    """Run the fake site in the foreground."""
+    parser = argparse.ArgumentParser(description="Fake vmrebetiko.gr search for offline scraping")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- delay jitter (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=0, help="answer 429 above N requests in flight"
+    )
+    parser.add_argument(
+        "--pagination-window",
+        type=int,
+        default=2,
+        help="pages linked either side of the current one (-1: no pagination links)",
+    )
+    args = parser.parse_args()
+
+    config = FakeSiteConfig(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        max_concurrency=args.max_concurrency,
+        pagination_window=args.pagination_window,
+    )
+    server = FakeSiteServer((args.host, args.port), config)
+    print(f"Serving fake vmrebetiko.gr search at {server.search_url}")
+    for name, count in config.item_counts.items():
+        print(f"  {name:30s} {count:5d} items")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nRequests: {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
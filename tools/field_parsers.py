@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Typed values parsed from the free-text recording_date, duration and matrix_number.
+
+Migration 8e4b6d0a3c75 adds indexed INTEGER columns derived from them, so era,
+length and catalog-range queries are index range scans:
+
+- recording_year, recording_date_start, recording_date_end (YYYYMMDD),
+  recording_date_uncertain: "12/03/1934", "03/1931", "1936", "1932-1933",
+  "1930 ή 1931", "[1930]", "c. 1928", "1935 (;)"
+- duration_seconds: "3:12", "03:05", "1:02:03", "2'45\\""
+- matrix_series / matrix_base / matrix_suffix: "W 123456-2" -> W, 123456, 2
+
+Values that say the field is unknown ("Άγνωστη", "?", "ασαφές") become NULL.
+Anything else that does not parse sets a bit in parse_issues, so those rows
+can be listed and fixed.
+
+After editing these fields (e.g. a re-scrape), re-derive the columns:
+    python tools/field_parsers.py [--db PATH] [--show-issues]
+
+The migration fills the columns with its own frozen copy of these parsers,
+so changes here only reach the database through this tool.
+"""
+
+import argparse
+import calendar
+import json
+import re
+import sqlite3
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent.parent / "database" / "vmrebetiko_all_genres.db"
+
+YEAR_RANGE = (1877, 2030)  # phonograph to present
+
+# parse_issues bits
+DATE_ISSUE = 1
+DURATION_ISSUE = 2
+MATRIX_ISSUE = 4
+ISSUE_NAMES = {
+    DATE_ISSUE: "recording_date",
+    DURATION_ISSUE: "duration",
+    MATRIX_ISSUE: "matrix_number",
+}
+
+# Accent-free, lowercase values meaning "not known"
+UNKNOWN_VALUES = {"", "?", ";", "-", "αγνωστη", "αγνωστο", "αγνωστος", "ασαφες", "ασαφης"}
+
+UNCERTAIN_MARKERS = re.compile(r"\(\s*[;?]\s*\)|[;?]|^\s*(?:c\.|ca\.?|circa|περ\.|περίπου)\s*")
+DATE_PATTERNS = [
+    (re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"), "day"),
+    (re.compile(r"(\d{1,2})/(\d{4})"), "month"),
+    (re.compile(r"(\d{4})\s*(?:-|–|/|ή|or)\s*(\d{4})"), "years"),
+    (re.compile(r"(\d{4})"), "year"),
+]
+DURATION_CLOCK = re.compile(r"(?:(\d{1,2}):)?(\d{1,2}):(\d{2})")
+DURATION_MARKS = re.compile(r"(?:(\d{1,2})\s*['΄′])?\s*(?:(\d{1,2})\s*(?:\"|''|΄΄|″))?")
+MATRIX_PATTERN = re.compile(r"([^\W\d_]*)[\s.-]*0*(\d+)(?:\s*[-/.]\s*([A-Za-z]?\d{0,3}[A-Za-z]?))?")
+
+DERIVED_COLUMNS = (
+    "recording_year",
+    "recording_date_start",
+    "recording_date_end",
+    "recording_date_uncertain",
+    "duration_seconds",
+    "matrix_series",
+    "matrix_base",
+    "matrix_suffix",
+    "parse_issues",
+)
+
+
+def _fold(text: str) -> str:
+    nfd = unicodedata.normalize("NFD", text)
+    return "".join(c for c in nfd if unicodedata.category(c) != "Mn").lower().strip()
+
+
+def is_unknown(text: str | None) -> bool:
+    """Whether a value is missing or says the field is unknown."""
+    return text is None or _fold(text) in UNKNOWN_VALUES
+
+
+@dataclass(frozen=True)
+class RecordingDate:
+    """A recording date or date range as YYYYMMDD integers."""
+
+    year: int
+    start: int
+    end: int
+    uncertain: bool
+
+
+def _ymd(year: int, month: int, day: int) -> int:
+    return year * 10000 + month * 100 + day
+
+
+def parse_recording_date(text: str | None) -> RecordingDate | None:
+    """Parse a free-text recording date.
+
+    Raises: ValueError if the text is neither a date nor an "unknown" marker
+    """
+    if is_unknown(text):
+        return None
+    value = text.strip()
+    uncertain = bool(UNCERTAIN_MARKERS.search(value))
+    value = UNCERTAIN_MARKERS.sub(" ", value).strip()
+    if value.startswith("[") and value.endswith("]"):
+        value, uncertain = value[1:-1].strip(), True
+
+    for pattern, kind in DATE_PATTERNS:
+        match = pattern.fullmatch(value)
+        if match is None:
+            continue
+        if kind == "day":
+            day, month, year = (int(g) for g in match.groups())
+            if not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+                break
+            start = end = _ymd(year, month, day)
+        elif kind == "month":
+            month, year = (int(g) for g in match.groups())
+            if not 1 <= month <= 12:
+                break
+            start = _ymd(year, month, 1)
+            end = _ymd(year, month, calendar.monthrange(year, month)[1])
+        elif kind == "years":
+            year, last = (int(g) for g in match.groups())
+            if last < year:
+                break
+            start, end = _ymd(year, 1, 1), _ymd(last, 12, 31)
+            # "1930 ή 1931" is one of the two, not the span between them
+            uncertain = uncertain or not re.search(r"\d\s*[-–]\s*\d", value)
+        else:
+            year = int(match.group(1))
+            start, end = _ymd(year, 1, 1), _ymd(year, 12, 31)
+        if not YEAR_RANGE[0] <= year <= YEAR_RANGE[1] or end // 10000 > YEAR_RANGE[1]:
+            break
+        return RecordingDate(year, start, end, uncertain)
+    raise ValueError(f"Unrecognized recording date {text!r}")
+
+
+def parse_duration(text: str | None) -> int | None:
+    """Duration in seconds from "m:ss", "h:mm:ss" or m'ss\" notation.
+
+    Raises: ValueError if the text is neither a duration nor an "unknown" marker
+    """
+    if is_unknown(text):
+        return None
+    value = text.strip()
+    match = DURATION_CLOCK.fullmatch(value)
+    if match:
+        hours, minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    else:
+        match = DURATION_MARKS.fullmatch(value)
+        if match is None or not any(match.groups()):
+            raise ValueError(f"Unrecognized duration {text!r}")
+        hours = 0
+        minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    if seconds >= 60 or (hours and minutes >= 60):
+        raise ValueError(f"Unrecognized duration {text!r}")
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_matrix_number(text: str | None) -> tuple[str | None, int, str | None] | None:
+    """(series letters, number, take/suffix) of a matrix number, e.g. "W 123456-2".
+
+    Raises: ValueError if the text is neither a matrix number nor an "unknown" marker
+    """
+    if is_unknown(text):
+        return None
+    match = MATRIX_PATTERN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Unrecognized matrix number {text!r}")
+    series, number, suffix = match.groups()
+    return series.upper() or None, int(number), suffix or None
+
+
+def matrix_suffix_number(suffix: str | None) -> int | None:
+    """Numeric part of a matrix suffix ("2" -> 2, "A" -> None)."""
+    if suffix is None:
+        return None
+    digits = re.sub(r"\D", "", suffix)
+    return int(digits) if digits else None
+
+
+def derive_values(
+    recording_date: str | None, duration: str | None, matrix_number: str | None
+) -> tuple:
+    """Values of DERIVED_COLUMNS for one item."""
+    issues = 0
+    date = seconds = matrix = None
+    try:
+        date = parse_recording_date(recording_date)
+    except ValueError:
+        issues |= DATE_ISSUE
+    try:
+        seconds = parse_duration(duration)
+    except ValueError:
+        issues |= DURATION_ISSUE
+    try:
+        matrix = parse_matrix_number(matrix_number)
+    except ValueError:
+        issues |= MATRIX_ISSUE
+    return (
+        date.year if date else None,
+        date.start if date else None,
+        date.end if date else None,
+        int(date.uncertain) if date else None,
+        seconds,
+        matrix[0] if matrix else None,
+        matrix[1] if matrix else None,
+        matrix_suffix_number(matrix[2]) if matrix else None,
+        issues,
+    )
+
+
+def refresh_derived_columns(
+    conn: sqlite3.Connection, item_ids: Iterable[str] | None = None
+) -> dict[str, int]:
+    """Recompute the derived columns from recording_date, duration and matrix_number.
+
+    Only rows whose derived values change are written, in one executemany. No
+    full-text indexed column is touched, so callers wrap this in
+    fts_bulk_write(conn, rebuild=False) to skip the items_fts sync triggers.
+    The caller commits.
+
+    Args:
+        conn: sqlite3 connection to the database
+        item_ids: Only refresh these items (default: all)
+
+    Returns: counts of rows updated and of rows with each parse issue
+    """
+    columns = ", ".join(DERIVED_COLUMNS)
+    sql = f"SELECT rowid, recording_date, duration, matrix_number, {columns} FROM items"
+    if item_ids is not None:
+        sql += " WHERE id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(list(item_ids), ensure_ascii=False),)
+    else:
+        params = ()
+
+    updates = []
+    stats = {"updated": 0, **dict.fromkeys(ISSUE_NAMES.values(), 0)}
+    for rowid, recording_date, duration, matrix_number, *current in conn.execute(sql, params):
+        values = derive_values(recording_date, duration, matrix_number)
+        for bit, name in ISSUE_NAMES.items():
+            if values[-1] & bit:
+                stats[name] += 1
+        if tuple(current) != values:
+            updates.append((*values, rowid))
+
+    assignments = ", ".join(f"{column} = ?" for column in DERIVED_COLUMNS)
+    conn.executemany(f"UPDATE items SET {assignments} WHERE rowid = ?", updates)
+    stats["updated"] = len(updates)
+    return stats
+
+
+def main() -> None:
+    """Re-derive the typed columns of all items."""
+    parser = argparse.ArgumentParser(description="Re-derive typed date/duration/matrix columns")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database file")
+    parser.add_argument("--show-issues", action="store_true", help="list unparsed values")
+    args = parser.parse_args()
+
+    from fts_bulk import fts_bulk_write  # tools/ is on sys.path when run as a script
+
+    conn = sqlite3.connect(args.db)
+    with fts_bulk_write(conn, rebuild=False):
+        stats = refresh_derived_columns(conn)
+    print(f"Rows updated: {stats['updated']}")
+    for bit, name in ISSUE_NAMES.items():
+        print(f"Unparsed {name + ':':16} {stats[name]}")
+        if args.show_issues and stats[name]:
+            for value, count in conn.execute(
+                f"SELECT {name}, COUNT(*) FROM items WHERE parse_issues & ? "
+                "GROUP BY 1 ORDER BY 2 DESC LIMIT 20",
+                (bit,),
+            ):
+                print(f"  {count:5d} | {value}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Bulk writes to items without per-row items_fts maintenance.
+
+The items_ai/items_ad/items_au triggers (migration e115969cccfc) rewrite an
+items_fts row for every inserted, deleted or updated item, so a bulk load pays
+one FTS index rewrite per row. fts_bulk_write() drops the sync triggers for
+the duration of the writes, brings items_fts back in sync once at the end and
+always restores the triggers, even when the writes fail.
+
+The drop, the writes and the restore are one transaction opened with
+BEGIN IMMEDIATE, so other connections cannot write to items (unindexed)
+while the triggers are missing, and a failed block rolls back to the
+original triggers and index. The block must not commit.
+
+The analysis_cache change-stamp triggers on items (migration 2b7f4c9e1a06)
+are suspended the same way, and the items stamp is bumped once at the end
+instead of once per written row.
+
+Usage:
+    with fts_bulk_write(conn, item_ids=changed_ids):
+        conn.executemany("UPDATE items SET lyrics = ? WHERE id = ?", updates)
+"""
+
+import json
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+FTS_TABLE = "items_fts"
+VERSIONS_TABLE = "_table_versions"  # analysis_cache.VERSIONS_TABLE
+FTS_COLUMNS = ("id", "title", "lyrics", "first_words", "creator_composer")
+
+_COLUMNS = ", ".join(FTS_COLUMNS)
+_NEW_VALUES = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+_OLD_VALUES = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+
+# Same definitions as migration e115969cccfc. items_fts is an external content
+# table, so an old row is removed with the 'delete' command and its old values;
+# a plain DELETE on items_fts would corrupt the index.
+FTS_TRIGGERS = {
+    "items_ai": f"""
+        CREATE TRIGGER items_ai AFTER INSERT ON items BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS})
+            VALUES (new.rowid, {_NEW_VALUES});
+        END
+    """,
+    "items_ad": f"""
+        CREATE TRIGGER items_ad AFTER DELETE ON items BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS})
+            VALUES ('delete', old.rowid, {_OLD_VALUES});
+        END
+    """,
+    "items_au": f"""
+        CREATE TRIGGER items_au AFTER UPDATE ON items BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS})
+            VALUES ('delete', old.rowid, {_OLD_VALUES});
+            INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS})
+            VALUES (new.rowid, {_NEW_VALUES});
+        END
+    """,
+}
+
+
+def fts_exists(conn: sqlite3.Connection) -> bool:
+    """Whether the items_fts table exists."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def _item_triggers(conn: sqlite3.Connection, target: str) -> dict[str, str]:
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'items'"
+    ).fetchall()
+    return {name: sql for name, sql in rows if target in sql}
+
+
+def sync_triggers(conn: sqlite3.Connection) -> dict[str, str]:
+    """Triggers on items that write to items_fts, as {name: CREATE statement}."""
+    return _item_triggers(conn, FTS_TABLE)
+
+
+def stamp_triggers(conn: sqlite3.Connection) -> dict[str, str]:
+    """Triggers on items that bump its change stamp, as {name: CREATE statement}."""
+    return _item_triggers(conn, VERSIONS_TABLE)
+
+
+def rebuild_fts(conn: sqlite3.Connection) -> None:
+    """Rebuild the whole items_fts index from the items table."""
+    conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _indexed_rows(conn: sqlite3.Connection, item_ids: list[str]) -> list[tuple]:
+    """Current (rowid, *FTS columns) of the given items, in one query (IDs as a JSON array)."""
+    return conn.execute(
+        f"SELECT rowid, {_COLUMNS} FROM items WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(item_ids, ensure_ascii=False),),
+    ).fetchall()
+
+
+def _refresh_fts_rows(conn: sqlite3.Connection, old_rows: list[tuple]) -> None:
+    """Replace the index entries of old_rows (captured before the writes) with current values."""
+    placeholders = ", ".join("?" * (len(FTS_COLUMNS) + 1))
+    conn.executemany(
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_COLUMNS}) VALUES ('delete', {placeholders})",
+        old_rows,
+    )
+    conn.execute(
+        f"INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS}) SELECT rowid, {_COLUMNS} FROM items "
+        "WHERE rowid IN (SELECT value FROM json_each(?))",
+        (json.dumps([row[0] for row in old_rows]),),
+    )
+
+
+@contextmanager
+def fts_bulk_write(
+    conn: sqlite3.Connection,
+    item_ids: Iterable[str] | None = None,
+    rebuild: bool = True,
+    commit: bool = True,
+) -> Iterator[None]:
+    """Run bulk writes to items with the items_fts sync and stamp triggers suspended.
+
+    Args:
+        conn: sqlite3 connection to the database
+        item_ids: IDs of the only items the block may update; their index
+            entries are refreshed one by one instead of rebuilding items_fts
+            (existing items only; inserts and deletes need a full rebuild)
+        rebuild: False when the writes touch no indexed column (e.g. lookup
+            IDs), so items_fts needs no refresh at all
+        commit: Commit before the block, run it in one BEGIN IMMEDIATE
+            transaction and commit it (roll back on error). Pass False to
+            leave transaction control to the caller.
+    """
+    if not fts_exists(conn):
+        yield
+        return
+
+    if commit:
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+
+    triggers = sync_triggers(conn)
+    stamps = stamp_triggers(conn)
+    # Targeted refresh relies on items_fts being in sync, i.e. all triggers present
+    old_rows = None
+    if rebuild and item_ids is not None and set(triggers) >= set(FTS_TRIGGERS):
+        old_rows = _indexed_rows(conn, list(dict.fromkeys(item_ids)))
+
+    for name in [*triggers, *stamps]:
+        conn.execute(f"DROP TRIGGER {name}")
+
+    rolled_back = False
+    try:
+        yield
+    except BaseException:
+        if commit:
+            conn.rollback()  # also undoes the trigger drops
+            rolled_back = True
+        raise
+    finally:
+        if not rolled_back:
+            try:
+                if rebuild:
+                    if old_rows is None:
+                        rebuild_fts(conn)
+                    else:
+                        _refresh_fts_rows(conn, old_rows)
+            finally:
+                restored = sync_triggers(conn) | stamp_triggers(conn)
+                for name, sql in (triggers | stamps).items():
+                    if name not in restored:
+                        conn.execute(sql)
+                if stamps:
+                    conn.execute(
+                        f"UPDATE {VERSIONS_TABLE} SET version = version + 1 "
+                        "WHERE table_name = 'items'"
+                    )
+                if commit:
+                    conn.commit()
@@ -0,0 +1,228 @@
+"""Persistent HTTP response cache for the scrapers.
+
+Responses are stored in a SQLite file keyed by URL + query parameters, with
+their ETag/Last-Modified validators. A fresh entry (younger than the TTL) is
+served without touching the network; a stale one is revalidated with a
+conditional request, and a 304 reuses the stored body. The cache is bounded
+by total body size, evicting least recently used entries first.
+
+Derived data (e.g. the item IDs parsed from a page) can be stored next to a
+response with put_extract(); it stays valid as long as the body it was
+computed from is unchanged, so unchanged pages are not parsed again.
+
+Usage:
+    cache = HttpCache(CACHE_FILE, ttl=86400, max_bytes=200 * 1024 * 1024)
+    key = cache_key(url, params)
+    entry = cache.get(key)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlencode
+
+CACHE_FILE = Path(__file__).parent.parent / "database" / "cache" / "http_cache.db"
+DEFAULT_TTL = 24 * 3600  # seconds
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        body BLOB NOT NULL,
+        body_hash TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at REAL NOT NULL,
+        accessed_at REAL NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+    CREATE TABLE IF NOT EXISTS extracts (
+        key TEXT NOT NULL,
+        name TEXT NOT NULL,
+        body_hash TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (key, name)
+    ) WITHOUT ROWID;
+"""
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    """Cache key of a GET request: URL plus sorted query parameters."""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+@dataclass
+class CacheEntry:
+    """A stored response."""
+
+    key: str
+    text: str
+    body_hash: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Whether the entry is younger than ttl seconds."""
+        return time.time() - self.fetched_at < ttl
+
+    def validators(self) -> dict[str, str]:
+        """Headers for a conditional request revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """SQLite-backed response cache, safe to share between threads."""
+
+    def __init__(
+        self,
+        path: Path = CACHE_FILE,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._size = row[0]
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Stored response for key (fresh or not), marking it recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, body_hash, etag, last_modified, fetched_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+        body, body_hash, etag, last_modified, fetched_at = row
+        return CacheEntry(
+            key, zlib.decompress(body).decode("utf-8"), body_hash, etag, last_modified, fetched_at
+        )
+
+    def store(
+        self,
+        key: str,
+        url: str,
+        text: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> CacheEntry:
+        """Store a freshly downloaded response, evicting old entries if over budget."""
+        data = text.encode("utf-8")
+        body_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        body = zlib.compress(data)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(key, url, body, body_hash, etag, last_modified, fetched_at, accessed_at, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, body, body_hash, etag, last_modified, now, now, len(body)),
+                )
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+        return CacheEntry(key, text, body_hash, etag, last_modified, now)
+
+    def refresh(self, key: str) -> None:
+        """Mark an entry as just revalidated (the server answered 304)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (time.time(), time.time(), key),
+            )
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is under 90% of its budget."""
+        target = self.max_bytes * 0.9
+        evicted = []
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        rows.close()
+        with self._conn:
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+            self._conn.executemany("DELETE FROM extracts WHERE key = ?", evicted)
+
+    def get_extract(self, key: str, name: str) -> str | None:
+        """Derived value stored for key, if computed from the currently stored body."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT e.value FROM extracts e JOIN responses r ON r.key = e.key "
+                "WHERE e.key = ? AND e.name = ? AND e.body_hash = r.body_hash",
+                (key, name),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_extract(self, key: str, name: str, value: str) -> None:
+        """Store a value derived from the currently stored body of key."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extracts (key, name, body_hash, value) "
+                "SELECT key, ?, body_hash, ? FROM responses WHERE key = ?",
+                (name, value, key),
+            )
+
+    def iter_entries(self, prefix: str = "") -> Iterator[CacheEntry]:
+        """All stored responses whose key starts with prefix (without marking them used)."""
+        with self._lock:
+            keys = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT key FROM responses WHERE substr(key, 1, ?) = ? ORDER BY key",
+                    (len(prefix), prefix),
+                )
+            ]
+        for key in keys:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT body, body_hash, etag, last_modified, fetched_at "
+                    "FROM responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+            if row:
+                body, body_hash, etag, last_modified, fetched_at = row
+                text = zlib.decompress(body).decode("utf-8")
+                yield CacheEntry(key, text, body_hash, etag, last_modified, fetched_at)
+
+    def stats(self) -> dict[str, int]:
+        """Number of entries and total compressed size."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": count, "bytes": self._size}
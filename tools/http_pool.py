@@ -0,0 +1,240 @@
+"""Pooled HTTP session, polite rate limiting and retries for the scrapers.
+
+One keep-alive session is shared by all worker threads, so requests to the
+same host reuse connections instead of opening a new one per page. Every
+request first takes a token from its host's bucket, which caps the overall
+request rate no matter how many workers are running.
+
+Transient failures (429, 5xx, timeouts, dropped connections) are retried
+with exponential backoff and jitter, honoring Retry-After (RetryPolicy), and
+an AIMD controller (AdaptiveLimiter) adjusts how many requests are in flight
+to what the server tolerates. Failures that are not retried, or still fail
+after the last attempt, raise FetchError.
+
+Usage:
+    session = make_session(pool_size=4)
+    limiter = HostRateLimiter(rate=2.0, burst=2)
+    limiter.acquire(url)
+    response = session.get(url, ...)
+"""
+
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "el-GR,el;q=0.9,en;q=0.8",
+}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def make_session(pool_size: int = 4) -> requests.Session:
+    """Session with a keep-alive connection pool large enough for pool_size workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available.
+
+        Returns: seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds` (e.g. the server's Retry-After)."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._paused_until)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host, created on first use."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Bucket of the URL's host."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """Wait for permission to send one request to the URL's host."""
+        return self.bucket(url).acquire()
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Stop sending requests to the URL's host for `seconds`."""
+        self.bucket(url).pause(seconds)
+
+
+class FetchError(Exception):
+    """A page could not be fetched (permanent error, or retries exhausted)."""
+
+
+@dataclass
+class RetryPolicy:
+    """Which failures are retried, and how long to wait before each retry."""
+
+    max_attempts: int = 5
+    base_delay: float = 0.5  # seconds before the first retry
+    max_delay: float = 60.0
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {self.max_attempts}")
+
+    def is_retryable(self, status: int | None = None, error: Exception | None = None) -> bool:
+        """Transient failures: throttling, server errors, timeouts and dropped connections."""
+        if error is not None:
+            return isinstance(error, requests.ConnectionError | requests.Timeout)
+        return status in RETRYABLE_STATUSES
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait after the attempt-th failed attempt (1-based).
+
+        Exponential backoff with full jitter, but never shorter than the
+        server's Retry-After.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            return max(min(retry_after, self.max_delay), backoff)
+        return backoff
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class AdaptiveLimiter:
+    """AIMD cap on requests in flight.
+
+    The cap grows by about one slot per cap-many successful requests while
+    latency stays within latency_tolerance x the best latency seen, and is
+    halved (at most once per cooldown) when the server pushes back with
+    429/5xx or times out.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial: int | None = None,
+        latency_tolerance: float = 2.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        start = initial if initial is not None else max(self.min_limit, self.max_limit // 2)
+        self.limit = float(min(self.max_limit, max(self.min_limit, start)))
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._best_latency: float | None = None
+        self._avg_latency: float | None = None
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one in-flight slot for the duration of a request."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+
+    def on_success(self, latency: float) -> None:
+        """A request succeeded in latency seconds: grow the cap if latency is healthy."""
+        with self._condition:
+            if self._best_latency is None or latency < self._best_latency:
+                self._best_latency = latency
+            if self._avg_latency is None:
+                self._avg_latency = latency
+            else:
+                self._avg_latency = 0.8 * self._avg_latency + 0.2 * latency
+            if self._avg_latency <= self._best_latency * self.latency_tolerance:
+                old = int(self.limit)
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                if int(self.limit) > old:
+                    self._condition.notify()
+
+    def on_overload(self) -> None:
+        """The server pushed back: halve the cap (once per cooldown period)."""
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
@@ -3,27 +3,65 @@
 
 Handles three confidence levels:
 - >= 0.85 (certain): Direct import
-- 0.70-0.84 (uncertain): Ask user for confirmation
+- 0.70-0.84 (uncertain): Reviewed offline in uncertain_lyrics_REVIEW.csv
 - < 0.70 (wrong): Skip
+
+Uncertain matches are imported in two phases, so no one has to sit through an
+interactive prompt:
+    python tools/import_lyrics.py plan           # write pending matches to the review CSV
+    python tools/import_lyrics.py apply FILE...  # import rows marked YES, in one transaction
+
+Several reviewers can each fill in a copy of the CSV; apply accepts all copies
+and skips matches on which they disagree. Without a command, certain matches
+are imported and the review file is refreshed (certain, then plan).
 """
 
+import argparse
+import csv
 import json
-import shutil
+import re
 import sqlite3
+import time
 from pathlib import Path
 from typing import Any
 
+from db_snapshot import take_snapshot
+from fts_bulk import fts_bulk_write
+from lyrics_store import LYRICS_FILE, LyricsIndex
+
+REVIEW_FILE = Path(__file__).parent.parent / "database" / "analysis" / "uncertain_lyrics_REVIEW.csv"
+REVIEW_FIELDS = [
+    "confidence",
+    "lyric_title",
+    "db_title",
+    "db_id",
+    "creator_composer",
+    "year",
+    "first_words",
+    "lyric_preview",
+    "decision",
+    "notes",
+]
+DECISIONS = {
+    "": "",
+    "yes": "YES",
+    "y": "YES",
+    "no": "NO",
+    "n": "NO",
+    "skip": "SKIP",
+    "s": "SKIP",
+}
+YEAR_PATTERN = re.compile(r"\b1[89]\d\d\b")
+
 
 def clean_lyrics(lyrics: str) -> str:
     """Remove ]] markers from lyrics text."""
     return lyrics.replace("]]", "").replace("[\n", "").strip()
 
 
-def load_songs_data() -> dict[str, dict[str, Any]]:
-    """Load lyrics from JSON file."""
-    json_path = Path(__file__).parent.parent / "database" / "lyrics_rebet.json"
-    with open(json_path) as f:
-        return json.load(f)
+def load_songs_data() -> LyricsIndex:
+    """Open keyed access to the lyrics file (records are parsed on demand)."""
+    return LyricsIndex.open(LYRICS_FILE)
 
 
 def load_match_report() -> dict[str, Any]:
@@ -35,55 +73,97 @@ def load_match_report() -> dict[str, Any]:
         return json.load(f)
 
 
-def get_db_lyrics(db_path: Path, song_id: str) -> str | None:
-    """Get existing lyrics from database, if any."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute("SELECT lyrics FROM items WHERE id = ?", (song_id,))
-    row = cur.fetchone()
-    conn.close()
-    return row["lyrics"] if row else None
+def load_ids_with_lyrics(conn: sqlite3.Connection) -> set[str]:
+    """IDs of items that already have lyrics, in one query."""
+    rows = conn.execute("SELECT id FROM items WHERE lyrics IS NOT NULL AND lyrics != ''")
+    return {row[0] for row in rows}
 
 
-def update_db_lyrics(db_path: Path, song_id: str, lyrics: str) -> None:
-    """Update lyrics in database."""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("UPDATE items SET lyrics = ? WHERE id = ?", (lyrics, song_id))
-    conn.commit()
-    conn.close()
-
+def update_db_lyrics(
+    conn: sqlite3.Connection, updates: list[tuple[str, str]], batch_size: int | None = None
+) -> float:
+    """Write (lyrics, song_id) updates with executemany.
 
-def confirm_match(lyric_title: str, db_title: str) -> str:
-    """Ask user to confirm an uncertain match.
+    Updates go in executemany calls of batch_size rows (None: one call), all
+    in the single transaction of fts_bulk_write(), which suspends the items_fts
+    triggers and only reindexes the updated items at the end.
 
-    Returns: 'y' (confirm), 'n' (reject), 's' (skip rest)
+    Returns: rows written per second
     """
-    print(f"\n  Lyrics file: '{lyric_title}'")
-    print(f"  Database:    '{db_title}'")
-    response = input("  Confirm match? (y/n/s to skip rest): ").strip().lower()
-    return response if response in ["y", "n", "s"] else confirm_match(lyric_title, db_title)
-
-
-def main() -> None:
-    """Main import logic."""
-    db_path = Path(__file__).parent.parent / "database" / "vmrebetiko_all_genres.db"
+    if not updates:
+        return 0.0
 
-    # Create backup
-    backup_path = db_path.with_stem(f"{db_path.stem}_backup")
-    shutil.copy2(db_path, backup_path)
-    print(f"Backup created: {backup_path}")
+    size = batch_size or len(updates)
+    start = time.perf_counter()
+    with fts_bulk_write(conn, item_ids=[song_id for _lyrics, song_id in updates]):
+        for offset in range(0, len(updates), size):
+            conn.executemany(
+                "UPDATE items SET lyrics = ? WHERE id = ?", updates[offset : offset + size]
+            )
+    elapsed = time.perf_counter() - start
+    return len(updates) / elapsed if elapsed > 0 else float("inf")
 
-    # Load data
-    songs_data = load_songs_data()
-    report = load_match_report()
 
-    stats = {"imported": 0, "skipped": 0, "already_had": 0, "rejected": 0}
-    skip_rest = False
+def load_item_details(conn: sqlite3.Connection, song_ids: list[str]) -> dict[str, tuple]:
+    """(creator_composer, recording_date, first_words) of the given items, in one query.
 
-    # Process certain matches (confidence >= 0.85)
-    print("\nProcessing certain matches (confidence >= 0.85)...")
+    The IDs are passed as one JSON array, so any number of them stays under
+    SQLite's bound-variable limit.
+    """
+    rows = conn.execute(
+        "SELECT id, creator_composer, recording_date, first_words FROM items "
+        "WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(song_ids, ensure_ascii=False),),
+    )
+    return {song_id: tuple(details) for song_id, *details in rows}
+
+
+def lyric_preview(lyrics: str) -> str:
+    """First non-empty line of the cleaned lyrics."""
+    for line in clean_lyrics(lyrics).splitlines():
+        if line.strip():
+            return line.strip()
+    return ""
+
+
+def parse_decision(value: str) -> str:
+    """Normalize a review decision to YES/NO/SKIP ('' when not reviewed yet)."""
+    decision = DECISIONS.get(value.strip().lower())
+    if decision is None:
+        raise ValueError(f"Unknown decision {value!r} (expected YES/NO/SKIP)")
+    return decision
+
+
+def load_review(path: Path) -> dict[tuple[str, str], dict[str, str]]:
+    """Rows of a review file keyed by (lyric_title, db_id)."""
+    if not path.exists():
+        return {}
+    with open(path, newline="", encoding="utf-8") as f:
+        return {(row["lyric_title"], row["db_id"]): row for row in csv.DictReader(f)}
+
+
+def write_review(path: Path, rows: list[dict[str, Any]]) -> None:
+    """Write review rows in the existing layout: bare header and numbers, quoted text."""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=REVIEW_FIELDS, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n"
+        )
+        f.write(",".join(REVIEW_FIELDS) + "\n")
+        writer.writerows(rows)
+    tmp_path.replace(path)
+
+
+def import_certain(
+    conn: sqlite3.Connection,
+    songs_data: LyricsIndex,
+    report: dict[str, Any],
+    has_lyrics: set[str],
+    batch_size: int | None,
+) -> dict[str, int]:
+    """Import all certain matches (confidence >= 0.85) in one batch."""
+    stats = {"imported": 0, "already_had": 0}
+    updates = []
     for match in report["certain"]:
         song_id = match["song_id"]
         lyric_title = match["lyric_title"]
@@ -91,44 +171,204 @@ def main() -> None:
         if lyric_title not in songs_data:
             continue
 
-        if get_db_lyrics(db_path, song_id):
+        if song_id in has_lyrics:
             stats["already_had"] += 1
             continue
 
-        lyrics = clean_lyrics(songs_data[lyric_title]["lyrics"])
-        update_db_lyrics(db_path, song_id, lyrics)
-        stats["imported"] += 1
+        updates.append((clean_lyrics(songs_data[lyric_title]["lyrics"]), song_id))
+        has_lyrics.add(song_id)
 
-    print(f"  Imported {stats['imported']} certain matches")
+    rate = update_db_lyrics(conn, updates, batch_size)
+    stats["imported"] = len(updates)
+    print(f"  Imported {len(updates)} certain matches ({rate:,.0f} rows/s)")
+    return stats
 
-    # Process uncertain matches (0.70 <= confidence < 0.85)
-    if not skip_rest:
-        print("\nProcessing uncertain matches (0.70 <= confidence < 0.85)...")
-        for match in report["uncertain"]:
-            if skip_rest:
-                break
 
-            song_id = match["song_id"]
-            lyric_title = match["lyric_title"]
+def plan_review(
+    conn: sqlite3.Connection,
+    songs_data: LyricsIndex,
+    report: dict[str, Any],
+    has_lyrics: set[str],
+    review_path: Path,
+) -> int:
+    """Write pending uncertain matches to the review file.
 
-            if lyric_title not in songs_data:
-                stats["skipped"] += 1
-                continue
+    Decisions and notes already in the file are kept. Matches whose item got
+    lyrics in the meantime, or whose lyrics are gone from the lyrics file,
+    are dropped.
 
-            if get_db_lyrics(db_path, song_id):
-                stats["already_had"] += 1
+    Returns: number of rows written
+    """
+    previous = load_review(review_path)
+    pending = [
+        match
+        for match in report["uncertain"]
+        if match["lyric_title"] in songs_data and match["song_id"] not in has_lyrics
+    ]
+    details = load_item_details(conn, list(dict.fromkeys(m["song_id"] for m in pending)))
+
+    rows = []
+    for match in pending:
+        song_id = match["song_id"]
+        composer, recording_date, first_words = details.get(song_id, (None, None, None))
+        year = YEAR_PATTERN.search(recording_date or "")
+        old = previous.get((match["lyric_title"], song_id), {})
+        rows.append(
+            {
+                "confidence": match["confidence"],
+                "lyric_title": match["lyric_title"],
+                "db_title": match["matched_db_title"],
+                "db_id": int(song_id) if song_id.isdigit() else song_id,
+                "creator_composer": composer or "",
+                "year": year.group(0) if year else "",
+                "first_words": first_words or "",
+                "lyric_preview": lyric_preview(songs_data[match["lyric_title"]]["lyrics"]),
+                "decision": old.get("decision", ""),
+                "notes": old.get("notes", ""),
+            }
+        )
+
+    write_review(review_path, rows)
+    return len(rows)
+
+
+def collect_decisions(
+    review_paths: list[Path],
+) -> tuple[dict[tuple[str, str], str], list[tuple[str, str]]]:
+    """Merge the decisions of one or more review files.
+
+    Returns: ({(lyric_title, db_id): decision}, [conflicting keys])
+    """
+    decisions: dict[tuple[str, str], str] = {}
+    conflicts = set()
+    for path in review_paths:
+        for key, row in load_review(path).items():
+            try:
+                decision = parse_decision(row.get("decision") or "")
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}") from None
+            if not decision:
                 continue
+            if decisions.setdefault(key, decision) != decision:
+                conflicts.add(key)
+
+    for key in conflicts:
+        del decisions[key]
+    return decisions, sorted(conflicts)
+
+
+def apply_review(
+    conn: sqlite3.Connection,
+    songs_data: LyricsIndex,
+    has_lyrics: set[str],
+    review_paths: list[Path],
+    batch_size: int | None,
+) -> dict[str, int]:
+    """Import the matches marked YES in the review files, in one batch."""
+    decisions, conflicts = collect_decisions(review_paths)
+    for lyric_title, song_id in conflicts:
+        print(f"  Conflicting decisions, skipped: '{lyric_title}' -> {song_id}")
+
+    stats = {"imported": 0, "rejected": 0, "skipped": len(conflicts), "already_had": 0}
+    accepted: dict[str, list[str]] = {}
+    for (lyric_title, song_id), decision in decisions.items():
+        if decision == "NO":
+            stats["rejected"] += 1
+        elif decision == "SKIP" or lyric_title not in songs_data:
+            stats["skipped"] += 1
+        elif song_id in has_lyrics:
+            stats["already_had"] += 1
+        else:
+            accepted.setdefault(song_id, []).append(lyric_title)
+
+    updates = []
+    for song_id, lyric_titles in accepted.items():
+        if len(lyric_titles) > 1:
+            print(f"  Several lyrics marked YES for song {song_id}, skipped: {lyric_titles}")
+            stats["skipped"] += len(lyric_titles)
+            continue
+        updates.append((clean_lyrics(songs_data[lyric_titles[0]]["lyrics"]), song_id))
+
+    rate = update_db_lyrics(conn, updates, batch_size)
+    stats["imported"] = len(updates)
+    print(f"  Imported {len(updates)} reviewed matches ({rate:,.0f} rows/s)")
+    return stats
+
+
+def checkpoint(db_path: Path) -> None:
+    """Snapshot the database before writing (only changed pages are stored)."""
+    snapshot = take_snapshot(db_path, label="import_lyrics")
+    print(
+        f"Snapshot {snapshot.generation} created ({snapshot.new_pages} new pages); "
+        f"restore with: python tools/db_snapshot.py restore {snapshot.generation}"
+    )
+
+
+def main() -> None:
+    """Main import logic."""
+    parser = argparse.ArgumentParser(description="Import matched lyrics into the database")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="rows per executemany call (default: all updates in one call)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("certain", help="import certain matches (confidence >= 0.85)")
+    plan = commands.add_parser("plan", help="write pending uncertain matches to a review file")
+    plan.add_argument("--output", type=Path, default=REVIEW_FILE, help="review CSV to (re)write")
+    apply = commands.add_parser("apply", help="import matches marked YES in review files")
+    apply.add_argument("review_files", type=Path, nargs="+", help="reviewed CSV file(s)")
+    args = parser.parse_args()
+
+    db_path = Path(__file__).parent.parent / "database" / "vmrebetiko_all_genres.db"
+    command = args.command
+
+    # Validate decisions before touching the database
+    if command == "apply":
+        try:
+            collect_decisions(args.review_files)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if command in (None, "certain", "apply"):
+        checkpoint(db_path)
+
+    songs_data = load_songs_data()
+    report = load_match_report()
+
+    conn = sqlite3.connect(db_path)
+    has_lyrics = load_ids_with_lyrics(conn)
+
+    stats = {"imported": 0, "skipped": 0, "rejected": 0, "already_had": 0}
+    if command in (None, "certain"):
+        print("\nProcessing certain matches (confidence >= 0.85)...")
+        for key, value in import_certain(
+            conn, songs_data, report, has_lyrics, args.batch_size
+        ).items():
+            stats[key] += value
+
+    if command in (None, "plan"):
+        review_path = args.output if command == "plan" else REVIEW_FILE
+        print("\nWriting uncertain matches (0.70 <= confidence < 0.85) for review...")
+        count = plan_review(conn, songs_data, report, has_lyrics, review_path)
+        print(f"  {count} pending matches in {review_path}")
+        print(
+            "  Fill in 'decision' (YES/NO/SKIP), then run: "
+            f"python tools/import_lyrics.py apply {review_path}"
+        )
+
+    if command == "apply":
+        print("\nApplying reviewed uncertain matches...")
+        for key, value in apply_review(
+            conn, songs_data, has_lyrics, args.review_files, args.batch_size
+        ).items():
+            stats[key] += value
+
+    conn.close()
 
-            response = confirm_match(lyric_title, match["matched_db_title"])
-            if response == "s":
-                skip_rest = True
-                stats["skipped"] += 1
-            elif response == "y":
-                lyrics = clean_lyrics(songs_data[lyric_title]["lyrics"])
-                update_db_lyrics(db_path, song_id, lyrics)
-                stats["imported"] += 1
-            else:  # 'n'
-                stats["rejected"] += 1
+    if command == "plan":
+        return
 
     # Summary
     print("\n" + "=" * 50)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Load genre_mappings.json into the genres / item_genres tables.
+
+The tables are created (empty) by migration b4234c169888. Loading replaces the
+whole genre membership in one transaction: genres are upserted, item_genres
+is cleared and refilled with a single executemany. Item IDs that are not in
+the items table are skipped and counted.
+
+Usage (after `alembic upgrade head` and after each new genre scrape):
+    python tools/load_genre_mappings.py [--file PATH] [--db PATH]
+"""
+
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent.parent / "database" / "vmrebetiko_all_genres.db"
+GENRE_MAPPINGS_FILE = Path(__file__).parent.parent / "database" / "analysis" / "genre_mappings.json"
+
+
+def read_genre_mappings(path: Path = GENRE_MAPPINGS_FILE) -> dict[str, dict]:
+    """Genre mappings as written by scrape_genre_mappings_correct.py."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_genre_mappings(
+    conn: sqlite3.Connection, mappings: dict[str, dict], commit: bool = True
+) -> dict[str, int]:
+    """Replace genre membership with the given mappings.
+
+    Args:
+        conn: sqlite3 connection to the database
+        mappings: {genre_id: {"name_en", "name_el", "items"}}
+        commit: Commit the load as one transaction (roll back on error).
+            Pass False to leave transaction control to the caller.
+
+    Returns: counts of genres, links inserted and unknown item IDs skipped
+    """
+    known_ids = {row[0] for row in conn.execute("SELECT id FROM items")}
+    genres = [(genre_id, data["name_el"], data["name_en"]) for genre_id, data in mappings.items()]
+    links = {
+        (str(item_id), genre_id) for genre_id, data in mappings.items() for item_id in data["items"]
+    }
+    rows = sorted(link for link in links if link[0] in known_ids)
+
+    try:
+        conn.execute("DELETE FROM item_genres")
+        conn.executemany(
+            "INSERT INTO genres (id, name_el, name_en) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name_el = excluded.name_el, name_en = excluded.name_en",
+            genres,
+        )
+        conn.executemany("INSERT INTO item_genres (item_id, genre_id) VALUES (?, ?)", rows)
+    except BaseException:
+        if commit:
+            conn.rollback()
+        raise
+    if commit:
+        conn.commit()
+
+    return {"genres": len(genres), "links": len(rows), "unknown_items": len(links) - len(rows)}
+
+
+def main() -> None:
+    """Reload genre membership from genre_mappings.json."""
+    parser = argparse.ArgumentParser(description="Load genre mappings into the database")
+    parser.add_argument("--file", type=Path, default=GENRE_MAPPINGS_FILE, help="mappings JSON")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database file")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    stats = load_genre_mappings(conn, read_genre_mappings(args.file))
+    conn.close()
+
+    print(f"Genres:           {stats['genres']}")
+    print(f"Item-genre links: {stats['links']}")
+    print(f"Unknown items:    {stats['unknown_items']} (not in items, skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Streaming and keyed access to lyrics_rebet.json.
+
+The lyrics file is one JSON object mapping song title to a record
+({"lyrics": ..., "url": ...}). Instead of json.load-ing the whole object:
+
+- iter_lyrics() yields (title, record) pairs while reading the file in chunks,
+  so memory stays flat however large the scraped corpus grows.
+- LyricsIndex maps each title to the byte range of its record, built once and
+  saved next to the file, so one lyric can be fetched with a seek + small parse.
+
+Usage:
+    for title, record in iter_lyrics(LYRICS_FILE):
+        ...
+
+    index = LyricsIndex.open(LYRICS_FILE)
+    record = index.get("48 χιλιάρικα")
+"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, TextIO
+
+LYRICS_FILE = Path(__file__).parent.parent / "database" / "lyrics_rebet.json"
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class _EntryScanner:
+    """Incremental scanner over the top-level object of a JSON file.
+
+    Yields (key, value, start, end) where start/end are byte offsets of the
+    value's JSON text in the file.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.buffer_offset = 0  # byte offset of buffer[0] in the file
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Drop consumed text and append the next chunk. Returns False at EOF."""
+        if self.eof:
+            return False
+        consumed = self.buffer[: self.pos]
+        self.buffer_offset += len(consumed.encode("utf-8"))
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def _expect(self, *chars: str) -> str:
+        self._skip_whitespace()
+        if self.pos >= len(self.buffer) or self.buffer[self.pos] not in chars:
+            found = self.buffer[self.pos : self.pos + 20] or "end of file"
+            raise ValueError(f"Expected one of {chars!r} in lyrics file, found {found!r}")
+        char = self.buffer[self.pos]
+        self.pos += 1
+        return char
+
+    def _decode_value(self) -> tuple[Any, int, int]:
+        """Decode the JSON value at the current position, reading more text as needed."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Value may continue in the next chunk
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may also continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            start = self.buffer_offset + len(self.buffer[: self.pos].encode("utf-8"))
+            length = len(self.buffer[self.pos : end].encode("utf-8"))
+            self.pos = end
+            return value, start, start + length
+
+    def __iter__(self) -> Iterator[tuple[str, Any, int, int]]:
+        self._expect("{")
+        self._skip_whitespace()
+        if self.buffer[self.pos : self.pos + 1] == "}":
+            return
+        while True:
+            key, _, _ = self._decode_value()
+            self._expect(":")
+            value, start, end = self._decode_value()
+            yield key, value, start, end
+            if self._expect(",", "}") == "}":
+                return
+
+
+def _open_text(path: Path) -> TextIO:
+    # newline="" keeps \r\n intact so byte offsets match the file on disk
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_lyrics(path: Path = LYRICS_FILE) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Yield (title, record) pairs from the lyrics file without loading it whole."""
+    with _open_text(path) as f:
+        for title, record, _start, _end in _EntryScanner(f):
+            yield title, record
+
+
+class LyricsIndex:
+    """Title -> byte range index over the lyrics file for random access.
+
+    The index is saved to `<lyrics file>.idx` and rebuilt automatically when
+    the lyrics file's size or modification time changes.
+    """
+
+    def __init__(self, path: Path, offsets: dict[str, tuple[int, int]]) -> None:
+        self.path = path
+        self.offsets = offsets
+
+    @staticmethod
+    def index_path(path: Path) -> Path:
+        return path.with_name(path.name + ".idx")
+
+    @staticmethod
+    def _stamp(path: Path) -> dict[str, int]:
+        stat = path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    @classmethod
+    def build(cls, path: Path = LYRICS_FILE) -> "LyricsIndex":
+        """Scan the lyrics file once and save the offset index next to it."""
+        offsets: dict[str, tuple[int, int]] = {}
+        with _open_text(path) as f:
+            for title, _record, start, end in _EntryScanner(f):
+                offsets[title] = (start, end - start)
+
+        with open(cls.index_path(path), "w", encoding="utf-8") as f:
+            json.dump({"source": cls._stamp(path), "offsets": offsets}, f, ensure_ascii=False)
+        return cls(path, offsets)
+
+    @classmethod
+    def open(cls, path: Path = LYRICS_FILE) -> "LyricsIndex":
+        """Load the saved index, rebuilding it if missing or stale."""
+        index_file = cls.index_path(path)
+        if index_file.exists():
+            with open(index_file, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("source") == cls._stamp(path):
+                offsets = {
+                    title: (start, size) for title, (start, size) in saved["offsets"].items()
+                }
+                return cls(path, offsets)
+        return cls.build(path)
+
+    def __contains__(self, title: object) -> bool:
+        return title in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, title: str) -> dict[str, Any]:
+        record = self.get(title)
+        if record is None:
+            raise KeyError(title)
+        return record
+
+    def titles(self) -> list[str]:
+        """All titles, in file order."""
+        return list(self.offsets)
+
+    def get(self, title: str) -> dict[str, Any] | None:
+        """Read and parse one record, or None if the title is not in the file."""
+        location = self.offsets.get(title)
+        if location is None:
+            return None
+        start, size = location
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return json.loads(f.read(size))
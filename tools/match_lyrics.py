@@ -5,24 +5,27 @@ Uses fuzzy matching to handle title variations, URL slugs, and accent difference
 Produces a JSON report with match confidence scores.
 """
 
+import argparse
+import hashlib
 import json
+import multiprocessing
 import re
-import sqlite3
-import unicodedata
-from difflib import SequenceMatcher
+import sys
 from pathlib import Path
+from typing import Any
 
-# Common filler words to ignore in fuzzy matching
-COMMON_WORDS = {"και", "αν", "για", "να", "με", "στο", "της", "του", "η", "ο"}
+from lyrics_store import iter_lyrics
+from similarity import similarity
+from title_corpus import TitleCorpus, load_title_rows, meaningful_words, normalize_text
 
+REPORT_FILE = Path("database/analysis/lyrics_match_report.json")
+CACHE_FILE = Path("database/analysis/lyrics_match_cache.json")
 
-def normalize_text(text: str) -> str:
-    """Normalize Greek text for matching (remove accents, lowercase)."""
-    if not text:
-        return ""
-    nfd = unicodedata.normalize("NFD", text)
-    text = "".join(c for c in nfd if unicodedata.category(c) != "Mn")
-    return text.lower().strip()
+# Bump whenever matching/scoring changes so cached results are discarded
+MATCHER_VERSION = 1
+
+# Corpus used by pool workers; inherited through fork, or set by _init_worker
+_worker_corpus: TitleCorpus | None = None
 
 
 def extract_title_parts(title: str) -> list[str]:
@@ -50,8 +53,8 @@ def has_meaningful_overlap(text1: str, text2: str) -> bool:
 
     Requires at least 3-4 char overlap on short titles.
     """
-    words1 = set(text1.split()) - COMMON_WORDS
-    words2 = set(text2.split()) - COMMON_WORDS
+    words1 = meaningful_words(text1)
+    words2 = meaningful_words(text2)
 
     if not words1 or not words2:
         return False
@@ -68,23 +71,20 @@ def has_meaningful_overlap(text1: str, text2: str) -> bool:
     return True
 
 
-def similarity_score(a: str, b: str) -> float:
-    """Calculate similarity with meaningful word overlap check."""
+def similarity_score(a: str, b: str, cutoff: float = 0.0) -> float:
+    """Calculate similarity with meaningful word overlap check.
+
+    Pairs that certainly score below cutoff return 0.0 without a full comparison.
+    """
     # Quick rejection: only common words overlap
     if not has_meaningful_overlap(a, b):
         return 0.0
 
-    matcher = SequenceMatcher(None, a, b)
-    return matcher.ratio()
+    return similarity(a, b, cutoff)
 
 
-def match_title(
-    lyrics_title: str, url_slug: str, db_titles: list[str]
-) -> tuple[str | None, float, str]:
-    """Match a lyrics title against database titles.
-
-    Returns: (best_match_title, confidence_score, match_reason)
-    """
+def title_candidates(lyrics_title: str, url_slug: str) -> list[tuple[str, str]]:
+    """Texts to match for one lyric, as (candidate, source) pairs."""
     # Extract main and subtitle parts from lyrics title
     lyric_parts = extract_title_parts(lyrics_title)
     slug_title = extract_title_from_slug(url_slug)
@@ -95,73 +95,204 @@ def match_title(
     ]
     if len(lyric_parts) > 1:
         candidates.append((lyric_parts[1], "subtitle"))
+    return candidates
+
+
+def match_title(
+    lyrics_title: str, url_slug: str, corpus: TitleCorpus
+) -> tuple[str | None, float, str]:
+    """Match a lyrics title against database titles.
+
+    Only titles sharing a meaningful word are scored, pruned against the best
+    score so far; they are visited in the original title order so ties
+    resolve exactly as in a full scan.
 
+    Returns: (best_match_title, confidence_score, match_reason)
+    """
     best_match = None
     best_score = 0.0
     best_reason = ""
 
-    for candidate, source in candidates:
+    for candidate, source in title_candidates(lyrics_title, url_slug):
         norm_candidate = normalize_text(candidate)
+        mask = corpus.encode(norm_candidate)
 
-        for db_title in db_titles:
-            norm_db = normalize_text(db_title)
-            score = similarity_score(norm_candidate, norm_db)
+        # Same filter as similarity_score(), on precompiled masks
+        positions = [
+            position
+            for position in corpus.candidates(mask)
+            if corpus.overlaps(mask, len(norm_candidate), position)
+        ]
+        position, score = corpus.engine.best_match(norm_candidate, positions, floor=best_score)
 
-            if score > best_score:
-                best_score = score
-                best_match = db_title
-                best_reason = source
+        if position is not None:
+            best_score = score
+            best_match = corpus.titles[position]
+            best_reason = source
 
     return best_match, best_score, best_reason
 
 
-def main() -> None:
-    """Match lyrics to database and generate report."""
-    lyrics_file = Path("database/lyrics_rebet.json")
-    db_file = Path("database/vmrebetiko_all_genres.db")
+def match_lyric(lyric_title: str, url_slug: str, corpus: TitleCorpus) -> dict[str, Any]:
+    """Match one lyric and build its report entry."""
+    best_match, confidence, reason = match_title(lyric_title, url_slug, corpus)
+    return {
+        "lyric_title": lyric_title,
+        "url_slug": url_slug,
+        "matched_db_title": best_match,
+        "confidence": round(confidence, 3),
+        "match_source": reason,
+        "song_id": corpus.title_to_id.get(best_match) if best_match else None,
+    }
 
-    # Load lyrics
-    with open(lyrics_file) as f:
-        lyrics_data = json.load(f)
 
-    # Load database titles
-    conn = sqlite3.connect(db_file)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, title FROM items ORDER BY title")
-    db_items = cursor.fetchall()
-    db_titles = [item[1] for item in db_items]
-    db_title_to_id = {item[1]: item[0] for item in db_items}
-    conn.close()
-
-    # Match each lyric
+def _init_worker(corpus: TitleCorpus | None) -> None:
+    """Pool initializer: install the corpus when it was not inherited via fork."""
+    global _worker_corpus
+    if corpus is not None:
+        _worker_corpus = corpus
+
+
+def _match_chunk(chunk: list[tuple[str, str]]) -> list[dict[str, Any]]:
+    """Match a chunk of (lyric_title, url_slug) pairs in a pool worker."""
+    assert _worker_corpus is not None, "worker started without a corpus"
+    return [match_lyric(title, slug, _worker_corpus) for title, slug in chunk]
+
+
+def match_all(
+    entries: list[tuple[str, str]], corpus: TitleCorpus, workers: int = 1
+) -> list[dict[str, Any]]:
+    """Match (lyric_title, url_slug) pairs, optionally across worker processes.
+
+    With fork the workers inherit the prepared corpus copy-on-write; otherwise
+    it is pickled once per worker through the pool initializer, never per task.
+    Results come back in input order, so the report is identical to a serial run.
+    """
+    if workers <= 1 or len(entries) < 2:
+        return [match_lyric(title, slug, corpus) for title, slug in entries]
+
+    global _worker_corpus
+    corpus.title_to_id  # noqa: B018 - build the cached lookup before workers inherit it
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        _worker_corpus = corpus
+        initargs: tuple[TitleCorpus | None] = (None,)
+    else:
+        context = multiprocessing.get_context("spawn")
+        initargs = (corpus,)
+
+    # A few chunks per worker keeps the load balanced without per-lyric IPC
+    chunk_size = max(1, -(-len(entries) // (workers * 4)))
+    chunks = [entries[i : i + chunk_size] for i in range(0, len(entries), chunk_size)]
+
+    try:
+        with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            chunk_results = pool.map(_match_chunk, chunks)
+    finally:
+        _worker_corpus = None
+
+    return [result for chunk in chunk_results for result in chunk]
+
+
+def lyric_key(lyric_title: str, url_slug: str) -> str:
+    """Cache key of one lyric: a hash of everything match_title() reads from it."""
+    return hashlib.sha1(f"{lyric_title}\0{url_slug}".encode()).hexdigest()
+
+
+def titles_version(titles: list[str]) -> str:
+    """Version stamp of the DB title set (order and duplicates do not matter)."""
+    digest = hashlib.sha256()
+    for title in sorted(set(titles)):
+        digest.update(title.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_match_cache(path: Path) -> dict[str, Any] | None:
+    """Load the match cache, or None if missing or written by another matcher version."""
+    if not path.exists():
+        return None
+    with open(path) as f:
+        cache = json.load(f)
+    if cache.get("matcher_version") != MATCHER_VERSION:
+        return None
+    return cache
+
+
+def save_match_cache(path: Path, titles: list[str], results: list[dict[str, Any]]) -> None:
+    """Save match results keyed by lyric, stamped with the title set they were matched against."""
+    unique_titles = sorted(set(titles))
+    cache = {
+        "matcher_version": MATCHER_VERSION,
+        "titles_version": titles_version(unique_titles),
+        "titles": unique_titles,
+        "entries": {
+            lyric_key(result["lyric_title"], result["url_slug"]): {
+                key: value for key, value in result.items() if key != "song_id"
+            }
+            for result in results
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+
+def find_stale(
+    entries: list[tuple[str, str]], titles: list[str], cache: dict[str, Any] | None
+) -> list[int]:
+    """Indices of entries whose cached result cannot be reused.
+
+    A cached result stays valid unless the lyric is new or changed, its matched
+    title was removed, or a newly added title passes the overlap check against
+    one of its candidates (only such titles can score above zero). Removing
+    other titles never changes the winner among the remaining ones.
+    """
+    if cache is None:
+        return list(range(len(entries)))
+
+    cached = cache["entries"]
+    if cache["titles_version"] == titles_version(titles):
+        return [
+            i for i, (title, slug) in enumerate(entries) if lyric_key(title, slug) not in cached
+        ]
+
+    previous = set(cache["titles"])
+    current = set(titles)
+    removed = previous - current
+    added = TitleCorpus.from_titles(sorted(current - previous))
+
+    stale = []
+    for i, (title, slug) in enumerate(entries):
+        hit = cached.get(lyric_key(title, slug))
+        if (
+            hit is None
+            or hit["matched_db_title"] in removed
+            or any(
+                added.overlaps_any(normalize_text(candidate))
+                for candidate, _source in title_candidates(title, slug)
+            )
+        ):
+            stale.append(i)
+    return stale
+
+
+def build_report(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Bucket match results by confidence (results must be in lyrics file order)."""
     certain = []
     uncertain = []
     wrong = []
 
-    for lyric_title, lyric_data in lyrics_data.items():
-        url_slug = lyric_data["url"].split("/songs/")[-1]
-        best_match, confidence, reason = match_title(lyric_title, url_slug, db_titles)
-
-        result = {
-            "lyric_title": lyric_title,
-            "url_slug": url_slug,
-            "matched_db_title": best_match,
-            "confidence": round(confidence, 3),
-            "match_source": reason,
-            "song_id": db_title_to_id.get(best_match) if best_match else None,
-        }
-
-        if confidence >= 0.85:
+    for result in results:
+        if result["confidence"] >= 0.85:
             certain.append(result)
-        elif confidence >= 0.70:
+        elif result["confidence"] >= 0.70:
             uncertain.append(result)
         else:
             wrong.append(result)
 
-    # Generate report
-    report = {
+    return {
         "metadata": {
-            "total_lyrics": len(lyrics_data),
+            "total_lyrics": len(results),
             "certain": len(certain),
             "uncertain": len(uncertain),
             "likely_wrong": len(wrong),
@@ -171,16 +302,85 @@ def main() -> None:
         "likely_wrong": sorted(wrong, key=lambda x: x["confidence"], reverse=True),
     }
 
+
+def main() -> None:
+    """Match lyrics to database and generate report."""
+    parser = argparse.ArgumentParser(description="Match lyrics to database items by title")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="compare with the saved report instead of overwriting it (exit 1 on differences)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help=f"ignore {CACHE_FILE} and rematch every lyric",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1, matching in-process)",
+    )
+    args = parser.parse_args()
+
+    lyrics_file = Path("database/lyrics_rebet.json")
+    db_file = Path("database/vmrebetiko_all_genres.db")
+
+    # Load database titles
+    title_rows = load_title_rows(db_file)
+    titles = [row[1] for row in title_rows]
+    db_title_to_id = {title: item_id for item_id, title in title_rows}
+
+    # Stream lyrics (only titles and URL slugs are needed for matching)
+    entries = [
+        (lyric_title, lyric_data["url"].split("/songs/")[-1])
+        for lyric_title, lyric_data in iter_lyrics(lyrics_file)
+    ]
+
+    # Rematch only lyrics whose cached result may have changed (--check always rematches)
+    cache = None if args.full or args.check else load_match_cache(CACHE_FILE)
+    stale = find_stale(entries, titles, cache)
+
+    rematched: dict[int, dict[str, Any]] = {}
+    if stale:
+        corpus = TitleCorpus.from_titles(titles, [row[0] for row in title_rows])
+        stale_results = match_all([entries[i] for i in stale], corpus, workers=args.workers)
+        rematched = dict(zip(stale, stale_results, strict=True))
+
+    results = []
+    for i, (lyric_title, url_slug) in enumerate(entries):
+        if i in rematched:
+            results.append(rematched[i])
+            continue
+        assert cache is not None
+        hit = cache["entries"][lyric_key(lyric_title, url_slug)]
+        matched = hit["matched_db_title"]
+        results.append({**hit, "song_id": db_title_to_id.get(matched) if matched else None})
+
+    report = build_report(results)
+
+    if args.check:
+        with open(REPORT_FILE) as f:
+            saved = json.load(f)
+        if saved != report:
+            print(f"Report differs from {REPORT_FILE}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Report matches {REPORT_FILE}")
+        return
+
     # Write report
-    with open("database/analysis/lyrics_match_report.json", "w") as f:
+    with open(REPORT_FILE, "w") as f:
         json.dump(report, f, indent=2, ensure_ascii=False)
+    save_match_cache(CACHE_FILE, titles, results)
 
     print("Match Report:")
+    print(f"  Rematched: {len(stale)} (reused {len(entries) - len(stale)} cached)")
     print(f"  Total lyrics: {report['metadata']['total_lyrics']}")
     print(f"  Certain (>=0.85): {report['metadata']['certain']}")
     print(f"  Uncertain (0.70-0.84): {report['metadata']['uncertain']}")
     print(f"  Likely wrong (<0.70): {report['metadata']['likely_wrong']}")
-    print("\nReport saved to: database/analysis/lyrics_match_report.json")
+    print(f"\nReport saved to: {REPORT_FILE}")
 
 
 if __name__ == "__main__":
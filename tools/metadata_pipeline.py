@@ -0,0 +1,249 @@
+"""Single pass over items.metadata_json feeding a registry of analyzers.
+
+Each row's metadata_json is parsed exactly once and handed to every selected
+analyzer, so adding an analysis never adds another pass over the archive.
+Rows whose metadata_json is not a JSON object are counted as malformed (and
+their IDs sampled) instead of being dropped silently; analyzers see them, and
+rows without metadata, with metadata=None.
+
+An analyzer is a class registered under a name:
+
+    @register
+    class PublisherCensus(Analyzer):
+        name = "publishers"
+        columns = ("publisher",)  # items columns needed besides metadata_json
+
+        def __init__(self):
+            self.counts = Counter()
+
+        def visit(self, item, metadata):
+            ...
+
+        def merge(self, other):  # fold in the result of a later rowid range
+            self.counts.update(other.counts)
+
+        def finish(self):
+            return dict(self.counts)
+
+With workers > 1 the rowid range is split into chunks scanned by a process
+pool; partial analyzers are merged in rowid order, so results are identical
+to a sequential run.
+
+Usage:
+    result = run_pipeline(db_path, ["fields", "lyrics"], workers=4)
+    result.results["lyrics"]
+"""
+
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+FETCH_SIZE = 500
+CHUNKS_PER_WORKER = 4
+MALFORMED_SAMPLE = 20
+
+
+class Analyzer(ABC):
+    """Base class: one instance accumulates results over a range of rows."""
+
+    name: str = ""
+    columns: tuple[str, ...] = ()
+
+    @abstractmethod
+    def visit(self, item: sqlite3.Row, metadata: dict[str, Any] | None) -> None:
+        """Look at one item; metadata is None if missing or malformed."""
+
+    @abstractmethod
+    def merge(self, other: "Analyzer") -> None:
+        """Add the results of `other`, which covered rows after this one's."""
+
+    @abstractmethod
+    def finish(self) -> Any:
+        """Final result."""
+
+
+ANALYZERS: dict[str, type[Analyzer]] = {}
+
+
+def register(cls: type[Analyzer]) -> type[Analyzer]:
+    """Class decorator adding an analyzer to the registry under its name."""
+    ANALYZERS[cls.name] = cls
+    return cls
+
+
+@register
+class FieldCensus(Analyzer):
+    """How many items have each metadata key, with a few example values."""
+
+    name = "fields"
+    examples_per_field = 3
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self.examples: dict[str, list[str]] = {}
+
+    def visit(self, item, metadata):
+        if metadata is None:
+            return
+        for key, value in metadata.items():
+            self.counts[key] += 1
+            examples = self.examples.setdefault(key, [])
+            if len(examples) < self.examples_per_field and value:
+                examples.append(str(value)[:100])
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        for key, values in other.examples.items():
+            examples = self.examples.setdefault(key, [])
+            examples.extend(values[: self.examples_per_field - len(examples)])
+
+    def finish(self):
+        return {"counts": dict(self.counts), "examples": self.examples}
+
+
+@register
+class LyricsCensus(Analyzer):
+    """Items with non-empty Στίχοι (lyrics) in their metadata."""
+
+    name = "lyrics"
+    columns = ("id", "title", "item_type", "language")
+
+    def __init__(self):
+        self.items: list[dict[str, Any]] = []
+
+    def visit(self, item, metadata):
+        if metadata and metadata.get("Στίχοι"):
+            self.items.append(
+                {
+                    "id": item["id"],
+                    "title": item["title"],
+                    "type": item["item_type"],
+                    "language": item["language"],
+                    "lyrics_length": len(metadata["Στίχοι"]),
+                }
+            )
+
+    def merge(self, other):
+        self.items.extend(other.items)
+
+    def finish(self):
+        return self.items
+
+
+@dataclass
+class PipelineResult:
+    """Analyzer results plus row counts of the pass."""
+
+    results: dict[str, Any]
+    rows: int = 0
+    with_metadata: int = 0
+    malformed: int = 0
+    malformed_ids: list[str] = field(default_factory=list)  # first MALFORMED_SAMPLE
+
+
+@dataclass
+class _Chunk:
+    """Partial pass over one rowid range (returned by pool workers)."""
+
+    analyzers: list[Analyzer]
+    rows: int = 0
+    with_metadata: int = 0
+    malformed: int = 0
+    malformed_ids: list[str] = field(default_factory=list)
+
+
+def _scan(db_path: str, names: list[str], rowids: tuple[int, int] | None) -> _Chunk:
+    """Run fresh analyzers over all items, or over rowids lo <= rowid < hi."""
+    analyzers = [ANALYZERS[name]() for name in names]
+    columns = dict.fromkeys(["id", *(c for a in analyzers for c in a.columns), "metadata_json"])
+    sql = f"SELECT {', '.join(columns)} FROM items"
+    params: tuple = ()
+    if rowids is not None:
+        sql += " WHERE rowid >= ? AND rowid < ? ORDER BY rowid"
+        params = rowids
+
+    chunk = _Chunk(analyzers)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute(sql, params)
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            for item in rows:
+                chunk.rows += 1
+                metadata = None
+                if item["metadata_json"]:
+                    chunk.with_metadata += 1
+                    try:
+                        metadata = json.loads(item["metadata_json"])
+                    except ValueError:
+                        metadata = None
+                    if not isinstance(metadata, dict):
+                        metadata = None
+                        chunk.malformed += 1
+                        if len(chunk.malformed_ids) < MALFORMED_SAMPLE:
+                            chunk.malformed_ids.append(item["id"])
+                for analyzer in analyzers:
+                    analyzer.visit(item, metadata)
+    finally:
+        conn.close()
+    return chunk
+
+
+def _rowid_ranges(db_path: str, count: int) -> list[tuple[int, int]]:
+    """Split the items rowid span into up to `count` half-open ranges."""
+    conn = sqlite3.connect(db_path)
+    low, high = conn.execute("SELECT MIN(rowid), MAX(rowid) FROM items").fetchone()
+    conn.close()
+    if low is None:
+        return []
+    step = max(1, -(-(high - low + 1) // count))
+    return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+
+def run_pipeline(
+    db_path: Path | str, names: Iterable[str] | None = None, workers: int = 1
+) -> PipelineResult:
+    """Parse every item's metadata_json once and run the named analyzers over it.
+
+    Args:
+        db_path: Database file
+        names: Registered analyzer names (default: all of them)
+        workers: Processes scanning rowid ranges in parallel (1: scan in-process)
+
+    Returns: {analyzer name: result} with row and malformed counts
+    """
+    names = list(names) if names is not None else list(ANALYZERS)
+    unknown = [name for name in names if name not in ANALYZERS]
+    if unknown:
+        raise ValueError(f"Unknown analyzers: {', '.join(unknown)}")
+    db_path = str(db_path)
+
+    if workers <= 1:
+        chunks = [_scan(db_path, names, None)]
+    else:
+        ranges = _rowid_ranges(db_path, workers * CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_scan, [db_path] * len(ranges), [names] * len(ranges), ranges))
+
+    result = PipelineResult(results={})
+    merged: list[Analyzer] | None = None
+    for chunk in chunks:
+        result.rows += chunk.rows
+        result.with_metadata += chunk.with_metadata
+        result.malformed += chunk.malformed
+        result.malformed_ids.extend(chunk.malformed_ids)
+        if merged is None:
+            merged = chunk.analyzers
+        else:
+            for analyzer, other in zip(merged, chunk.analyzers, strict=True):
+                analyzer.merge(other)
+    del result.malformed_ids[MALFORMED_SAMPLE:]
+    for analyzer in merged or [ANALYZERS[name]() for name in names]:
+        result.results[analyzer.name] = analyzer.finish()
+    return result
@@ -4,20 +4,60 @@
 CORRECT VERSION: Uses /search/?fmid=f&g=GENRE_NAME (filtered search mode).
 
 The key is using fmid=f (filtered search) instead of fmid=p (pagination).
+
+Pages of all genres are fetched concurrently by a small worker pool over one
+keep-alive session. A shared per-host token bucket keeps the overall request
+rate polite (--rate, default 2 requests/s), so a full remap is bounded by that
+budget rather than by one round-trip after another.
+
+Responses are cached on disk (database/cache/http_cache.db). Fresh entries
+are served locally, stale ones are revalidated with ETag/Last-Modified, and
+pages whose body did not change are not parsed again. --offline re-runs the
+parser against cached responses only, without any network access.
+
+Progress is appended to a journal (database/analysis/genre_scrape_journal.ndjson)
+one page at a time, so an interrupted scrape resumes at the next missing page.
+genre_mappings.json is written from the journal once the scrape ends
+(--compact rewrites it without scraping, --fresh starts over). When every
+genre is complete the journal is retired, so the next run scrapes afresh
+instead of reusing it.
 """
 
+import argparse
 import json
 import sys
+import threading
 import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 
 import requests
 import urllib3
 from bs4 import BeautifulSoup
+from http_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, HttpCache, cache_key
+from http_pool import (
+    AdaptiveLimiter,
+    FetchError,
+    HostRateLimiter,
+    RetryPolicy,
+    make_session,
+    parse_retry_after,
+)
+from lxml import etree
+from scrape_journal import JOURNAL_FILE, ScrapeJournal, read_journal, retire_journal
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+SEARCH_URL = "https://vmrebetiko.gr/search/"
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0  # requests per second, same pace as the old 0.5 s sleep
+MAX_EMPTY_PAGES = 3
+GALLERY_ITEM_CLASS = "eael-filterable-gallery-item-wrap"
+
 # Genre names for filtered search
 GENRES = {
     "rebetiko": "Ρεμπέτικο",
@@ -40,46 +80,148 @@ GENRES = {
 }
 
 
-def get_page(url: str, params: dict | None = None) -> BeautifulSoup | None:
-    """Fetch and parse a webpage."""
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "el-GR,el;q=0.9,en;q=0.8",
-        }
-        response = requests.get(url, params=params, headers=headers, verify=False, timeout=30)
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        return BeautifulSoup(response.text, "lxml")
-    except requests.RequestException as e:
-        print(f"\nError fetching {url}: {e}", file=sys.stderr)
-        return None
+_session = make_session(DEFAULT_WORKERS)
+_limiter = HostRateLimiter(DEFAULT_RATE)
+_concurrency = AdaptiveLimiter(DEFAULT_WORKERS)
+_retry = RetryPolicy()
+_cache: HttpCache | None = None
+_offline = False
+_search_url = SEARCH_URL
+_stats_lock = threading.Lock()
+fetch_stats: Counter[str] = Counter()
+fetch_latencies: list[float] = []  # seconds per network request
+
+
+def configure(
+    workers: int = DEFAULT_WORKERS,
+    rate: float = DEFAULT_RATE,
+    burst: int = 1,
+    cache: HttpCache | None = None,
+    offline: bool = False,
+    search_url: str = SEARCH_URL,
+    retry: RetryPolicy | None = None,
+) -> None:
+    """Size the shared connection pool, set the per-host request rate and the cache.
+
+    workers: most requests in flight; the adaptive limiter starts at half
+        and moves between 1 and workers depending on how the server copes
+    offline: serve only cached responses (stale or not), never touch the network
+    search_url: search endpoint, e.g. a local fake_vmrebetiko_server.py
+    """
+    global _session, _limiter, _concurrency, _retry, _cache, _offline, _search_url
+    if offline and cache is None:
+        raise ValueError("offline mode needs a cache")
+    _session = make_session(workers)
+    _limiter = HostRateLimiter(rate, burst)
+    _concurrency = AdaptiveLimiter(workers)
+    _retry = retry or RetryPolicy()
+    _cache = cache
+    _offline = offline
+    _search_url = search_url
 
 
-def get_search_page_items(page_num: int, genre_name: str) -> list[str]:
-    """Get all item IDs from a filtered search page.
+def reset_stats() -> None:
+    """Clear fetch counters and latencies."""
+    with _stats_lock:
+        fetch_stats.clear()
+        fetch_latencies.clear()
 
-    Args:
-        page_num: Page number (0-indexed)
-        genre_name: Greek genre name (e.g., 'Ρεμπέτικο')
 
-    Returns:
-        List of item IDs found on this page
+def _count(event: str) -> None:
+    with _stats_lock:
+        fetch_stats[event] += 1
+
+
+def _request(url: str, params: dict | None, headers: dict | None) -> requests.Response:
+    """GET with retries: 2xx/304 are returned, anything else raises FetchError.
+
+    Throttling, server errors, timeouts and dropped connections are retried
+    (backoff with jitter, at least Retry-After) and shrink the number of
+    requests in flight; other errors fail at once.
     """
-    url = "https://vmrebetiko.gr/search/"
-    params = {
-        "fmid": "f",  # CRITICAL: 'f' = filtered search, 'p' = pagination (no filter)
-        "pg": str(page_num),
-        "g": genre_name,
-    }
+    for attempt in range(1, _retry.max_attempts + 1):
+        _limiter.acquire(url)
+        retry_after = None
+        with _concurrency.slot():
+            start = time.perf_counter()
+            try:
+                response = _session.get(
+                    url, params=params, headers=headers, verify=False, timeout=30
+                )
+                error = None
+            except requests.RequestException as e:
+                response, error = None, e
+            latency = time.perf_counter() - start
+        with _stats_lock:
+            fetch_latencies.append(latency)
+
+        if response is not None and (response.ok or response.status_code == 304):
+            _concurrency.on_success(latency)
+            return response
+
+        if response is not None:
+            reason = f"HTTP {response.status_code}"
+            retryable = _retry.is_retryable(status=response.status_code)
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        else:
+            reason = f"{type(error).__name__}: {error}"
+            retryable = _retry.is_retryable(error=error)
+        if not retryable:
+            raise FetchError(f"{url} {params or ''}: {reason}")
+        if attempt == _retry.max_attempts:
+            break
 
-    soup = get_page(url, params)
-    if not soup:
-        return []
+        _concurrency.on_overload()
+        if retry_after is not None:
+            _limiter.pause(url, retry_after)  # the server asked everyone to wait
+        _count("retries")
+        time.sleep(_retry.delay(attempt, retry_after))
 
+    raise FetchError(f"{url} {params or ''}: {reason} after {_retry.max_attempts} attempts")
+
+
+def fetch_html(url: str, params: dict | None = None) -> str:
+    """Fetch a webpage's HTML through the response cache.
+
+    Raises FetchError if the page cannot be fetched, so a failure is never
+    mistaken for an empty page.
+    """
+    key = cache_key(url, params)
+    entry = _cache.get(key) if _cache else None
+    if entry and (_offline or entry.is_fresh(_cache.ttl)):
+        _count("cached")
+        return entry.text
+    if _offline:
+        _count("failed")
+        raise FetchError(f"Not cached (offline): {key}")
+
+    try:
+        response = _request(url, params, entry.validators() if entry else None)
+    except FetchError:
+        _count("failed")
+        raise
+    if entry and response.status_code == 304:
+        _cache.refresh(key)
+        _count("revalidated")
+        return entry.text
+    response.encoding = response.apparent_encoding
+
+    _count("downloaded")
+    if _cache:
+        _cache.store(
+            key,
+            url,
+            response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    return response.text
+
+
+def parse_search_page(soup: BeautifulSoup) -> tuple[list[str], set[int]]:
+    """Item IDs and linked page numbers (pagination) of a search page."""
     item_ids = []
-    gallery_items = soup.find_all("div", class_="eael-filterable-gallery-item-wrap")
+    gallery_items = soup.find_all("div", class_=GALLERY_ITEM_CLASS)
 
     for item in gallery_items:
         link = item.find("a", href=lambda x: x and "/item?id=" in x)
@@ -89,74 +231,391 @@ def get_search_page_items(page_num: int, genre_name: str) -> list[str]:
                 item_id = href.split("?id=")[-1]
                 item_ids.append(item_id)
 
-    return item_ids
+    linked_pages = set()
+    for link in soup.find_all("a", href=lambda x: x and "pg=" in x):
+        for value in parse_qs(urlsplit(link["href"]).query).get("pg", []):
+            if value.isdigit():
+                linked_pages.add(int(value))
+
+    return item_ids, linked_pages
+
+
+class _SearchPageCollector:
+    """lxml parser target collecting what parse_search_page() finds, without a tree.
+
+    Tracks the open gallery item divs and gives each the first item link inside
+    it; every other element is dropped as soon as it is parsed.
+    """
+
+    def __init__(self) -> None:
+        self.links: list[str | None] = []  # first item link per gallery item, in order
+        self.open_divs: list[int | None] = []  # index into links for gallery item divs
+        self.waiting: list[int] = []  # open gallery items without a link yet
+        self.hrefs_with_pg: list[str] = []
+
+    def start(self, tag: str, attrib: dict) -> None:
+        if tag == "div":
+            if GALLERY_ITEM_CLASS in attrib.get("class", "").split():
+                self.open_divs.append(len(self.links))
+                self.waiting.append(len(self.links))
+                self.links.append(None)
+            else:
+                self.open_divs.append(None)
+        elif tag == "a":
+            href = attrib.get("href")
+            if not href:
+                return
+            if "/item?id=" in href:
+                for index in self.waiting:
+                    self.links[index] = href
+                self.waiting.clear()
+            if "pg=" in href:
+                self.hrefs_with_pg.append(href)
+
+    def end(self, tag: str) -> None:
+        if tag == "div" and self.open_divs:
+            index = self.open_divs.pop()
+            if index is not None and index in self.waiting:
+                self.waiting.remove(index)
+
+    def close(self) -> "_SearchPageCollector":
+        return self
+
+
+def extract_search_page(html: str) -> tuple[list[str], set[int]]:
+    """Same result as parse_search_page(BeautifulSoup(html, "lxml")), without building a DOM."""
+    collector = _SearchPageCollector()
+    parser = etree.HTMLParser(target=collector)
+    parser.feed(html)
+    parser.close()
+
+    item_ids = [href.split("?id=")[-1] for href in collector.links if href and "?id=" in href]
+
+    linked_pages = set()
+    for href in collector.hrefs_with_pg:
+        for value in parse_qs(urlsplit(href).query).get("pg", []):
+            if value.isdigit():
+                linked_pages.add(int(value))
+
+    return item_ids, linked_pages
+
+
+def fetch_search_page(page_num: int, genre_name: str) -> tuple[list[str], set[int]]:
+    """Fetch a filtered search page: (item IDs, linked page numbers).
+
+    Raises FetchError if the page cannot be fetched.
+    """
+    params = {
+        "fmid": "f",  # CRITICAL: 'f' = filtered search, 'p' = pagination (no filter)
+        "pg": str(page_num),
+        "g": genre_name,
+    }
+
+    html = fetch_html(_search_url, params)
 
+    # An unchanged page (fresh, 304 or same body) keeps its earlier parse
+    key = cache_key(_search_url, params)
+    if _cache and (extract := _cache.get_extract(key, "search_page")):
+        parsed = json.loads(extract)
+        return parsed["items"], set(parsed["pages"])
 
-def scrape_genre(genre_id: str, genre_name: str) -> list[str]:
-    """Scrape all item IDs for a given genre.
+    item_ids, linked_pages = extract_search_page(html)
+    if _cache:
+        _cache.put_extract(
+            key, "search_page", json.dumps({"items": item_ids, "pages": sorted(linked_pages)})
+        )
+    return item_ids, linked_pages
+
+
+@dataclass
+class GenreScrape:
+    """Pages fetched and still pending for one genre.
+
+    Pages linked from the pagination of any fetched page are fanned out at
+    once. If page 0 has no pagination links, pages are probed in batches of
+    up to MAX_EMPTY_PAGES until that many consecutive pages come back empty.
+    Pages that could not be fetched are kept in `failed`; a genre with
+    failed pages is never complete.
+    """
+
+    genre_id: str
+    genre_name: str
+    pages: dict[int, list[str]] = field(default_factory=dict)
+    requested: set[int] = field(default_factory=set)
+    linked: set[int] = field(default_factory=set)
+    failed: set[int] = field(default_factory=set)
+    paginated: bool = False
+    done: bool = False
+
+    @property
+    def pending(self) -> int:
+        return len(self.requested) - len(self.pages) - len(self.failed)
+
+    def add_page(self, page_num: int, item_ids: list[str], linked_pages: set[int]) -> None:
+        """Record a fetched page."""
+        self.pages[page_num] = item_ids
+        self.requested.add(page_num)
+        self.linked |= linked_pages
+        if page_num == 0 and linked_pages - {0}:
+            self.paginated = True
+
+    def resume_pages(self) -> list[int]:
+        """Pages still to request after restoring fetched pages from the journal."""
+        if self.done:
+            return []
+        if 0 not in self.pages:
+            return [0]
+        if self.paginated:
+            return sorted(self.linked - self.requested)
+        # Probing: refetch pages lost in the crash before probing further
+        gaps = set(range(max(self.pages))) - set(self.pages)
+        return sorted(gaps) or self.next_pages(set())
+
+    def next_pages(self, linked_pages: set[int]) -> list[int]:
+        """Pages to request next, given the pagination links just seen."""
+        if self.paginated:
+            return sorted(linked_pages - self.requested)
+        if self.pending or self.failed:
+            return []  # where the listing ends is unknown past a failed page
+        # Probing: stop after MAX_EMPTY_PAGES consecutive empty pages
+        top = max(self.requested)
+        empty_run = 0
+        while empty_run <= top and not self.pages[top - empty_run]:
+            empty_run += 1
+        if empty_run >= MAX_EMPTY_PAGES:
+            return []
+        return list(range(top + 1, top + 1 + MAX_EMPTY_PAGES - empty_run))
+
+    def item_ids(self) -> list[str]:
+        """Unique item IDs in page order."""
+        ids = [item_id for page in sorted(self.pages) for item_id in self.pages[page]]
+        return list(dict.fromkeys(ids))
+
+
+def load_scrapes(
+    genres: dict[str, str], journal_path: Path = JOURNAL_FILE
+) -> dict[str, GenreScrape]:
+    """Genre progress replayed from the journal (fresh state for genres not in it)."""
+    scrapes = {genre_id: GenreScrape(genre_id, name) for genre_id, name in genres.items()}
+    for record in read_journal(journal_path):
+        scrape = scrapes.get(record["genre"])
+        if scrape is None:
+            continue
+        if record["type"] == "page":
+            scrape.add_page(record["page"], record["items"], set(record["links"]))
+        elif record["type"] == "genre_done":
+            scrape.done = True
+    return scrapes
+
+
+def scrape_genres(
+    genres: dict[str, str],
+    workers: int = DEFAULT_WORKERS,
+    journal: ScrapeJournal | None = None,
+    scrapes: dict[str, GenreScrape] | None = None,
+) -> dict[str, list[str]]:
+    """Scrape all item IDs of several genres with a bounded worker pool.
+
+    Pages of all genres share the pool and the per-host rate limit. Each
+    fetched page is appended to the journal; pass the scrapes restored by
+    load_scrapes() to continue where an interrupted run stopped. A genre with
+    a page that failed after all retries is left incomplete (and resumes
+    from its missing pages next run) instead of being cut short.
 
     Returns:
-        List of unique item IDs belonging to this genre
+        {genre_id: unique item IDs} of the completed genres, in the order of `genres`
     """
-    print(f"\n{'=' * 60}")
-    print(f"Scraping: {genre_name} ({genre_id})")
-    print(f"{'=' * 60}")
-
-    all_item_ids = []
-    page_num = 0
-    max_empty_pages = 3
-
-    empty_page_count = 0
-
-    while True:
-        print(f"  Page {page_num}...", end=" ", flush=True)
-        item_ids = get_search_page_items(page_num, genre_name)
-
-        if not item_ids:
-            empty_page_count += 1
-            print(f"(empty - {empty_page_count}/{max_empty_pages})")
-            if empty_page_count >= max_empty_pages:
-                print(f"  Stopping after {max_empty_pages} empty pages")
-                break
-        else:
-            empty_page_count = 0
-            all_item_ids.extend(item_ids)
-            print(f"✓ {len(item_ids)} items (total: {len(all_item_ids)})")
+    if scrapes is None:
+        scrapes = {genre_id: GenreScrape(genre_id, name) for genre_id, name in genres.items()}
+    futures: dict[Future, tuple[GenreScrape, int]] = {}
+
+    def finish(scrape: GenreScrape) -> None:
+        if scrape.failed:
+            print(
+                f"✗ {scrape.genre_name}: incomplete, pages {sorted(scrape.failed)} failed "
+                "(rerun to resume)"
+            )
+            return
+        scrape.done = True
+        item_ids = scrape.item_ids()
+        if journal:
+            journal.record_genre_done(scrape.genre_id, len(item_ids))
+        print(f"✓ {scrape.genre_name}: {len(item_ids)} unique items from {len(scrape.pages)} pages")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def submit(scrape: GenreScrape, page_nums: list[int]) -> None:
+            for page_num in page_nums:
+                scrape.requested.add(page_num)
+                future = executor.submit(fetch_search_page, page_num, scrape.genre_name)
+                futures[future] = (scrape, page_num)
+
+        for genre_id in genres:
+            scrape = scrapes[genre_id]
+            if scrape.done:
+                continue
+            submit(scrape, scrape.resume_pages())
+            if not scrape.pending:
+                finish(scrape)
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                scrape, page_num = futures.pop(future)
+                try:
+                    item_ids, linked_pages = future.result()
+                except FetchError as e:
+                    scrape.failed.add(page_num)
+                    print(f"  {scrape.genre_name} page {page_num}: FAILED ({e})", file=sys.stderr)
+                else:
+                    scrape.add_page(page_num, item_ids, linked_pages)
+                    if journal:
+                        journal.record_page(scrape.genre_id, page_num, item_ids, linked_pages)
+                    print(f"  {scrape.genre_name} page {page_num}: {len(item_ids)} items")
+                    submit(scrape, scrape.next_pages(linked_pages))
+
+                if not scrape.pending:
+                    finish(scrape)
+
+    return {genre_id: scrapes[genre_id].item_ids() for genre_id in genres if scrapes[genre_id].done}
+
+
+def compact_journal(
+    genres: dict[str, str], output_file: Path, journal_path: Path = JOURNAL_FILE
+) -> dict[str, dict]:
+    """Write genre_mappings.json from the completed genres in the journal.
+
+    Nothing is written if the journal has no completed genre.
+    """
+    genre_mappings = {}
+    for genre_id, scrape in load_scrapes(genres, journal_path).items():
+        if not scrape.done:
+            continue
+        item_ids = scrape.item_ids()
+        genre_mappings[genre_id] = {
+            "name_en": genre_id.replace("_", " ").title(),
+            "name_el": genres[genre_id],
+            "items": item_ids,
+            "count": len(item_ids),
+        }
+
+    if not genre_mappings:
+        return genre_mappings  # keep the existing file rather than emptying it
+
+    tmp_file = output_file.with_suffix(".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(genre_mappings, f, ensure_ascii=False, indent=2)
+    tmp_file.replace(output_file)
+    return genre_mappings
 
-        page_num += 1
-        time.sleep(0.5)
 
-    unique_ids = list(dict.fromkeys(all_item_ids))
-    print(f"\n  Total unique items: {len(unique_ids)}")
+def finish_run(
+    genres: dict[str, str], output_file: Path, journal_path: Path = JOURNAL_FILE
+) -> tuple[dict[str, dict], list[str]]:
+    """Compact the journal into output_file and retire it if every genre is complete.
 
-    return unique_ids
+    Returns: (genre mappings written, IDs of the incomplete genres)
+    """
+    genre_mappings = compact_journal(genres, output_file, journal_path)
+    incomplete = [genre_id for genre_id in genres if genre_id not in genre_mappings]
+    if not incomplete:
+        retire_journal(journal_path)
+    return genre_mappings, incomplete
+
+
+def _attempts_argument(text: str) -> int:
+    attempts = int(text)
+    try:
+        RetryPolicy(max_attempts=attempts)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    return attempts
 
 
 def main() -> None:
     """Main scraping logic."""
+    parser = argparse.ArgumentParser(description="Scrape genre mappings from vmrebetiko.gr")
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="most concurrent requests in flight"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=DEFAULT_RATE, help="max requests per second to the site"
+    )
+    parser.add_argument("--burst", type=int, default=1, help="requests allowed back to back")
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL / 3600,
+        help="hours a cached page is used without revalidating",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="response cache budget in MB (least recently used pages are evicted)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    parser.add_argument(
+        "--offline", action="store_true", help="use cached responses only (no network)"
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="discard the journal and scrape from scratch"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="only rewrite genre_mappings.json from the journal (no scraping)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=_attempts_argument,
+        default=5,
+        help="attempts per page before it counts as failed (at least 1)",
+    )
+    parser.add_argument(
+        "--search-url", default=SEARCH_URL, help="search endpoint (e.g. a local fake server)"
+    )
+    args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the cache")
+
+    cache = None
+    if not args.no_cache:
+        cache = HttpCache(ttl=args.cache_ttl * 3600, max_bytes=args.cache_size * 1024 * 1024)
+    configure(
+        args.workers,
+        args.rate,
+        args.burst,
+        cache=cache,
+        offline=args.offline,
+        search_url=args.search_url,
+        retry=RetryPolicy(max_attempts=args.retries),
+    )
     output_file = Path(__file__).parent.parent / "database" / "analysis" / "genre_mappings.json"
 
     print("VMRebetiko.gr Genre Mapping Scraper (CORRECTED)")
     print("=" * 60)
     print(f"Genres to scrape: {len(GENRES)}")
     print("Using: fmid=f (filtered search)")
+    print(f"Workers: {args.workers}, rate limit: {args.rate:g} requests/s")
     print(f"Output file: {output_file}")
     print("=" * 60)
 
-    genre_mappings = {}
+    if args.fresh:
+        JOURNAL_FILE.unlink(missing_ok=True)
 
-    for genre_id, genre_name in GENRES.items():
-        item_ids = scrape_genre(genre_id, genre_name)
-        genre_mappings[genre_id] = {
-            "name_en": genre_id.replace("_", " ").title(),
-            "name_el": genre_name,
-            "items": item_ids,
-            "count": len(item_ids),
-        }
+    if not args.compact:
+        scrapes = load_scrapes(GENRES)
+        resumed = [scrape for scrape in scrapes.values() if scrape.pages]
+        if resumed:
+            done = sum(scrape.done for scrape in resumed)
+            pages = sum(len(scrape.pages) for scrape in resumed)
+            print(f"Resuming from journal: {pages} pages fetched, {done} genres complete")
+
+        with ScrapeJournal() as journal:
+            scrape_genres(GENRES, args.workers, journal=journal, scrapes=scrapes)
 
-        # Save incrementally
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(genre_mappings, f, ensure_ascii=False, indent=2)
+    genre_mappings, incomplete = finish_run(GENRES, output_file)
 
     # Print summary
     print("\n" + "=" * 60)
@@ -170,6 +629,13 @@ def main() -> None:
         genre_mappings.items(), key=lambda x: x[1]["count"], reverse=True
     ):
         print(f"  {data['name_el']:30s} {data['count']:5d} items")
+    print(
+        f"\nPages: {fetch_stats['downloaded']} downloaded, "
+        f"{fetch_stats['revalidated']} revalidated (304), {fetch_stats['cached']} from cache, "
+        f"{fetch_stats['failed']} failed, {fetch_stats['retries']} retries"
+    )
+    if incomplete:
+        print(f"Incomplete genres (rerun to resume): {', '.join(incomplete)}")
     print(f"\nSaved to: {output_file}")
     print("=" * 60)
 
@@ -0,0 +1,119 @@
+"""Append-only progress journal for the genre scraper.
+
+Every fetched search page is appended as one NDJSON line, and a marker line
+is written when a genre is complete:
+    {"type": "page", "genre": "amanes", "page": 3, "items": ["10804", ...], "links": [2, 4]}
+    {"type": "genre_done", "genre": "amanes", "count": 250}
+
+Writing a page costs one short append no matter how much was scraped
+before. Lines are flushed immediately and fsync'ed in batches, so a crash
+loses at most the last unsynced batch, which is simply fetched again on the
+next run. A line torn by a crash mid-write is skipped when reading.
+
+Once a run has completed every genre and genre_mappings.json is written,
+retire_journal() moves the journal aside, so only an unfinished run is ever
+resumed and the next scrape starts fresh.
+"""
+
+import json
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+JOURNAL_FILE = (
+    Path(__file__).parent.parent / "database" / "analysis" / "genre_scrape_journal.ndjson"
+)
+
+
+def read_journal(path: Path = JOURNAL_FILE) -> Iterator[dict]:
+    """Records of a journal in write order (nothing if it does not exist)."""
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # line torn by a crash; its page is fetched again
+
+
+def retire_journal(path: Path = JOURNAL_FILE) -> Path | None:
+    """Move a finished run's journal to <name>.prev (replacing the previous one).
+
+    Returns: the retired journal's path, None if there was no journal
+    """
+    if not path.exists():
+        return None
+    retired = path.with_name(path.name + ".prev")
+    path.replace(retired)
+    return retired
+
+
+class ScrapeJournal:
+    """Appends scrape progress records, fsync'ing every sync_every records or sync_interval s."""
+
+    def __init__(self, path: Path = JOURNAL_FILE, sync_every: int = 32, sync_interval: float = 2.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115 - closed in close()
+        if self._file.tell() and not self._ends_with_newline():
+            # Terminate a torn line left by a crash so new records start clean
+            self._file.write("\n")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def record_page(
+        self, genre_id: str, page_num: int, item_ids: list[str], linked_pages: set[int]
+    ) -> None:
+        """Journal one fetched search page."""
+        self._append(
+            {
+                "type": "page",
+                "genre": genre_id,
+                "page": page_num,
+                "items": item_ids,
+                "links": sorted(linked_pages),
+            }
+        )
+
+    def record_genre_done(self, genre_id: str, count: int) -> None:
+        """Journal that all pages of a genre were fetched."""
+        self._append({"type": "genre_done", "genre": genre_id, "count": count})
+        self.sync()
+
+    def _append(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.sync_every
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Force journaled records to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sync and close the journal."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self) -> "ScrapeJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
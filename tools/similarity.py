@@ -0,0 +1,142 @@
+"""Cutoff-aware string similarity on top of difflib.SequenceMatcher.
+
+Scores are always exactly `SequenceMatcher(None, a, b).ratio()`. A cutoff only
+lets hopeless pairs be rejected early using cheap upper bounds on the ratio:
+
+1. Length bound: 2 * min(len(a), len(b)) / (len(a) + len(b))
+2. Multiset bound: SequenceMatcher.quick_ratio() (shared characters, ignoring order)
+
+Both are computed with the same formula as ratio() from a match count that is
+never smaller than the real one, so a pair whose bound is below the cutoff can
+never score at or above it.
+"""
+
+from difflib import SequenceMatcher
+
+
+def length_bound(len_a: int, len_b: int) -> float:
+    """Upper bound on ratio() from the string lengths alone."""
+    total = len_a + len_b
+    return 2.0 * min(len_a, len_b) / total if total else 1.0
+
+
+def char_slots(text: str) -> frozenset[tuple[str, int]]:
+    """The characters of text as a set: the k-th occurrence of c is (c, k).
+
+    The size of the intersection of two such sets is the number of characters
+    the texts share as multisets, i.e. the match count behind quick_ratio().
+    """
+    seen: dict[str, int] = {}
+    slots = []
+    for char in text:
+        occurrence = seen.get(char, 0)
+        seen[char] = occurrence + 1
+        slots.append((char, occurrence))
+    return frozenset(slots)
+
+
+def similarity(a: str, b: str, cutoff: float = 0.0) -> float:
+    """SequenceMatcher ratio of a and b, or 0.0 if it is certainly below cutoff."""
+    if cutoff > 0.0 and length_bound(len(a), len(b)) < cutoff:
+        return 0.0
+    matcher = SequenceMatcher(None, a, b)
+    if cutoff > 0.0 and matcher.quick_ratio() < cutoff:
+        return 0.0
+    return matcher.ratio()
+
+
+class SimilarityEngine:
+    """Scores one query against many fixed texts (e.g. normalized DB titles).
+
+    Keeps one SequenceMatcher per text with the text as the second sequence,
+    so difflib's index of it (b2j) and its character counts are built once
+    per run instead of once per comparison.
+    """
+
+    def __init__(self, texts: list[str]) -> None:
+        self.texts = texts
+        self.lengths = [len(text) for text in texts]
+        self._matchers: dict[int, SequenceMatcher] = {}
+        self._slots: dict[int, frozenset[tuple[str, int]]] = {}
+
+    def _char_slots(self, position: int) -> frozenset[tuple[str, int]]:
+        slots = self._slots.get(position)
+        if slots is None:
+            slots = char_slots(self.texts[position])
+            self._slots[position] = slots
+        return slots
+
+    def _matcher(self, position: int, query: str) -> SequenceMatcher:
+        matcher = self._matchers.get(position)
+        if matcher is None:
+            matcher = SequenceMatcher(None, "", self.texts[position])
+            self._matchers[position] = matcher
+        matcher.set_seq1(query)
+        return matcher
+
+    def score(self, query: str, position: int, cutoff: float = 0.0) -> float:
+        """Same as similarity(query, texts[position], cutoff)."""
+        if cutoff > 0.0 and length_bound(len(query), self.lengths[position]) < cutoff:
+            return 0.0
+        matcher = self._matcher(position, query)
+        if cutoff > 0.0 and matcher.quick_ratio() < cutoff:
+            return 0.0
+        return matcher.ratio()
+
+    def score_many(self, query: str, positions: list[int], cutoff: float = 0.0) -> list[float]:
+        """Score query against every position; pairs below cutoff score 0.0.
+
+        Same results as score() per position, but the query is preprocessed
+        once for the whole batch: quick_ratio()'s bound becomes one C-level set
+        intersection of the query's char_slots() with each text's cached slots,
+        instead of difflib rebuilding its query-side counts per candidate. Only
+        pairs passing both bounds reach a SequenceMatcher.
+        """
+        if cutoff <= 0.0:
+            return [self._matcher(position, query).ratio() for position in positions]
+
+        query_length = len(query)
+        query_slots = char_slots(query)
+        scores = []
+        for position in positions:
+            text_length = self.lengths[position]
+            if length_bound(query_length, text_length) < cutoff:
+                scores.append(0.0)
+                continue
+            shared = len(query_slots & self._char_slots(position))
+            total = query_length + text_length
+            if total and 2.0 * shared / total < cutoff:
+                scores.append(0.0)
+                continue
+            scores.append(self._matcher(position, query).ratio())
+        return scores
+
+    def best_match(
+        self, query: str, positions: list[int], floor: float = 0.0
+    ) -> tuple[int | None, float]:
+        """First position (in the given order) with the highest score above floor.
+
+        Equivalent to a linear scan keeping the first strictly better score,
+        but every pair is pruned against the best score found so far (with the
+        same batched bounds as score_many()).
+
+        Returns: (position, score), or (None, floor) if nothing beats floor
+        """
+        query_length = len(query)
+        query_slots = char_slots(query)
+        best_position = None
+        best_score = floor
+        for position in positions:
+            text_length = self.lengths[position]
+            # A pair can only win if its bound is strictly above the best score
+            if length_bound(query_length, text_length) <= best_score:
+                continue
+            shared = len(query_slots & self._char_slots(position))
+            total = query_length + text_length
+            if total and 2.0 * shared / total <= best_score:
+                continue
+            score = self._matcher(position, query).ratio()
+            if score > best_score:
+                best_score = score
+                best_position = position
+        return best_position, best_score
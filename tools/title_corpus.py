@@ -0,0 +1,176 @@
+"""Precompiled corpus of database titles for fuzzy matching.
+
+Normalizes every `items.title` once, interns its words and stores each title's
+meaningful words as an integer bitmask, so word-overlap checks against the
+corpus are a single integer AND instead of Unicode normalization and set
+building per comparison.
+
+Usage:
+    corpus = TitleCorpus.from_db(db_path)
+    query = normalize_text("Καλόγερος")
+    mask = corpus.encode(query)
+    for position in corpus.candidates(mask):
+        if corpus.overlaps(mask, len(query), position):
+            ...
+"""
+
+import sqlite3
+import unicodedata
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+from similarity import SimilarityEngine
+
+# Common filler words to ignore in fuzzy matching
+COMMON_WORDS = {"και", "αν", "για", "να", "με", "στο", "της", "του", "η", "ο"}
+
+# Titles shorter than this must share at least MIN_SHARED_CHARS characters of words
+SHORT_TITLE_LENGTH = 15
+MIN_SHARED_CHARS = 3
+
+
+def normalize_text(text: str) -> str:
+    """Normalize Greek text for matching (remove accents, lowercase)."""
+    if not text:
+        return ""
+    nfd = unicodedata.normalize("NFD", text)
+    text = "".join(c for c in nfd if unicodedata.category(c) != "Mn")
+    return text.lower().strip()
+
+
+def meaningful_words(text: str) -> set[str]:
+    """Words of normalized text that count towards an overlap (no filler words)."""
+    return set(text.split()) - COMMON_WORDS
+
+
+def load_title_rows(db_path: Path | str) -> list[tuple[str, str]]:
+    """Load (id, title) for every item, ordered by title."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, title FROM items ORDER BY title").fetchall()
+    conn.close()
+    return rows
+
+
+@dataclass
+class TitleCorpus:
+    """Normalized titles with interned word IDs, bitmasks and word postings.
+
+    Positions follow the order of `titles`; callers that break ties by "first
+    title wins" get the same result as a linear scan by visiting candidates in
+    position order.
+    """
+
+    titles: list[str]
+    ids: list[str | None]
+    normalized: list[str]
+    token_masks: list[int]
+    vocabulary: dict[str, int]
+    token_lengths: list[int]
+    postings: list[list[int]]
+
+    @classmethod
+    def from_titles(cls, titles: list[str], ids: list[str | None] | None = None) -> "TitleCorpus":
+        """Build a corpus from a list of titles (and optional parallel item IDs)."""
+        normalized: list[str] = []
+        token_masks: list[int] = []
+        vocabulary: dict[str, int] = {}
+        token_lengths: list[int] = []
+        postings: list[list[int]] = []
+
+        for position, title in enumerate(titles):
+            norm_title = normalize_text(title)
+            mask = 0
+            for word in meaningful_words(norm_title):
+                token_id = vocabulary.get(word)
+                if token_id is None:
+                    token_id = len(token_lengths)
+                    vocabulary[word] = token_id
+                    token_lengths.append(len(word))
+                    postings.append([])
+                mask |= 1 << token_id
+                postings[token_id].append(position)
+            normalized.append(norm_title)
+            token_masks.append(mask)
+
+        return cls(
+            titles=list(titles),
+            ids=list(ids) if ids is not None else [None] * len(titles),
+            normalized=normalized,
+            token_masks=token_masks,
+            vocabulary=vocabulary,
+            token_lengths=token_lengths,
+            postings=postings,
+        )
+
+    @classmethod
+    def from_db(cls, db_path: Path | str) -> "TitleCorpus":
+        """Build a corpus from `items.title`, ordered by title."""
+        rows = load_title_rows(db_path)
+        return cls.from_titles([row[1] for row in rows], [row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    @cached_property
+    def title_to_id(self) -> dict[str, str | None]:
+        """Map title to item ID (the last item wins for duplicate titles)."""
+        return dict(zip(self.titles, self.ids, strict=True))
+
+    @cached_property
+    def engine(self) -> SimilarityEngine:
+        """Similarity engine over the normalized titles (positions match the corpus)."""
+        return SimilarityEngine(self.normalized)
+
+    def overlaps_any(self, norm_text: str) -> bool:
+        """Whether any title in the corpus passes the overlap check against norm_text."""
+        mask = self.encode(norm_text)
+        return any(
+            self.overlaps(mask, len(norm_text), position) for position in self.candidates(mask)
+        )
+
+    def encode(self, norm_text: str) -> int:
+        """Bitmask of the meaningful words of norm_text known to the corpus.
+
+        Words missing from the vocabulary cannot overlap with any title, so
+        they are simply left out.
+        """
+        mask = 0
+        for word in meaningful_words(norm_text):
+            token_id = self.vocabulary.get(word)
+            if token_id is not None:
+                mask |= 1 << token_id
+        return mask
+
+    def candidates(self, mask: int) -> list[int]:
+        """Positions of titles sharing at least one word with mask, in title order."""
+        positions: set[int] = set()
+        while mask:
+            low_bit = mask & -mask
+            positions.update(self.postings[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return sorted(positions)
+
+    def shared_chars(self, mask: int) -> int:
+        """Total length of the words in mask."""
+        total = 0
+        while mask:
+            low_bit = mask & -mask
+            total += self.token_lengths[low_bit.bit_length() - 1]
+            mask ^= low_bit
+        return total
+
+    def overlaps(self, mask: int, text_length: int, position: int) -> bool:
+        """Integer version of match_lyrics.has_meaningful_overlap against one title.
+
+        Args:
+            mask: Encoded query (see encode())
+            text_length: Length of the normalized query text
+            position: Title position in the corpus
+        """
+        common = mask & self.token_masks[position]
+        if not common:
+            return False
+        if min(text_length, len(self.normalized[position])) < SHORT_TITLE_LENGTH:
+            return self.shared_chars(common) >= MIN_SHARED_CHARS
+        return True